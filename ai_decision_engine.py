@@ -4,19 +4,32 @@ Implements weighted scoring algorithm with risk and confidence calculations
 """
 
 import time
+import numpy as np
+import pandas as pd
 from config import (
     FEATURE_WEIGHTS, CASH_FLOW_RISK, PRIORITY_RISK,
     DECISION_RULES
 )
+from decision_policy import load_policy
 
 
 class AIDecisionEngine:
     """AI engine for making payment extension decisions"""
     
-    def __init__(self):
-        """Initialize the AI decision engine"""
+    def __init__(self, policy=None, vendor_profiles=None):
+        """
+        Initialize the AI decision engine
+        
+        Args:
+            policy: Optional CompiledPolicy (defaults to decision_policy.json
+                compiled against DECISION_RULES)
+            vendor_profiles: Optional VendorProfiles; each decision then carries
+                its vendor's decayed history (informational, not scored)
+        """
         self.weights = FEATURE_WEIGHTS
         self.rules = DECISION_RULES
+        self.policy = policy or load_policy(params=self.rules)
+        self.vendor_profiles = vendor_profiles
     
     def make_decision(self, request_data):
         """
@@ -54,7 +67,9 @@ class AIDecisionEngine:
         
         # Determine decision
         decision = self._determine_decision(
-            confidence_score, risk_score, amount
+            confidence_score, risk_score, amount,
+            extension_days=extension_days, vendor_reliability=vendor_reliability,
+            payment_history=payment_history, cash_flow=cash_flow, priority=priority
         )
         
         # Generate reasoning
@@ -80,9 +95,16 @@ class AIDecisionEngine:
             'reasoning': reasoning,
             'processing_time': round(processing_time, 2),
             'factor_details': factor_details,
-            'normalized_features': normalized_features
+            'normalized_features': normalized_features,
+            'vendor_profile': self.vendor_profile(request_data.get('vendor_name'))
         }
     
+    def vendor_profile(self, vendor_name):
+        """Decayed decision history of a vendor (O(1)), or None without profiles or history"""
+        if self.vendor_profiles is None or vendor_name is None:
+            return None
+        return self.vendor_profiles.lookup(vendor_name)
+    
     def _normalize_features(self, amount, extension_days, vendor_reliability,
                            payment_history, cash_flow, priority):
         """Normalize all features to 0-1 scale"""
@@ -144,35 +166,165 @@ class AIDecisionEngine:
         
         return confidence
     
-    def _determine_decision(self, confidence, risk, amount):
+    def _determine_decision(self, confidence, risk, amount, **request_fields):
         """
         Determine final decision based on confidence and risk scores
         
-        Decision Logic:
+        The rules live in decision_policy.json and are compiled once in
+        __init__. The default policy encodes:
         - If confidence ≥ 0.80 and risk < 0.4 → Approved
         - If confidence < 0.60 or risk > 0.7 (and amount > 50000) → Escalate
         - If confidence < 0.60 or risk > 0.7 (and amount ≤ 50000) → Rejected
         - If risk < 0.6 and confidence > 0.6 → Approved
         - Else → Escalate
         """
+        return self.policy.decide(confidence, risk, amount, **request_fields)
+    
+    def normalize_batch(self, requests_df):
+        """
+        Normalized features for many requests (vectorized _normalize_features)
+        
+        Args:
+            requests_df: DataFrame with REQUEST_COLUMNS
+        
+        Returns:
+            Tuple of (risk_components, policy_fields):
+            risk_components is an (n, 6) float array whose columns follow
+            FEATURE_WEIGHTS order; policy_fields maps POLICY_FIELDS (except
+            risk, which depends on the weights) to arrays.
+        """
+        return self._normalize_arrays(
+            amount=requests_df['invoice_amount'].astype(float).to_numpy(),
+            extension_days=requests_df['requested_extension_days'].astype(float).astype(int).to_numpy(),
+            vendor_reliability=requests_df['vendor_reliability_score'].astype(float).to_numpy(),
+            payment_history=requests_df['payment_history_score'].astype(float).to_numpy(),
+            cash_flow=requests_df['cash_flow_impact'].to_numpy(dtype=object),
+            priority=requests_df['priority'].to_numpy(dtype=object),
+            cash_flow_risk=requests_df['cash_flow_impact'].map(CASH_FLOW_RISK).fillna(0.5).to_numpy(dtype=float),
+            priority_risk=requests_df['priority'].map(PRIORITY_RISK).fillna(0.5).to_numpy(dtype=float)
+        )
+    
+    def normalize_records(self, records):
+        """
+        normalize_batch for a list of request dicts
+        
+        Builds the arrays straight from the dicts: for the handful of rows a
+        scoring-service call carries, DataFrame construction would cost far
+        more than the arithmetic. Missing categories default as in make_decision.
+        """
+        cash_flow = [record.get('cash_flow_impact', 'Medium') for record in records]
+        priority = [record.get('priority', 'Medium') for record in records]
+        return self._normalize_arrays(
+            amount=np.array([record['invoice_amount'] for record in records], dtype=float),
+            extension_days=np.array([record['requested_extension_days'] for record in records],
+                                    dtype=float).astype(int),
+            vendor_reliability=np.array([record['vendor_reliability_score'] for record in records], dtype=float),
+            payment_history=np.array([record['payment_history_score'] for record in records], dtype=float),
+            cash_flow=np.array(cash_flow, dtype=object),
+            priority=np.array(priority, dtype=object),
+            cash_flow_risk=np.array([CASH_FLOW_RISK.get(value, 0.5) for value in cash_flow], dtype=float),
+            priority_risk=np.array([PRIORITY_RISK.get(value, 0.5) for value in priority], dtype=float)
+        )
+    
+    def _normalize_arrays(self, amount, extension_days, vendor_reliability, payment_history,
+                          cash_flow, priority, cash_flow_risk, priority_risk):
+        """Shared arithmetic of normalize_batch and normalize_records"""
+        components = {
+            'amount': np.minimum(amount / 50000.0, 1.0),
+            'extension': np.minimum(extension_days / 30.0, 1.0),
+            'vendor': 1.0 - vendor_reliability,
+            'payment': 1.0 - payment_history,
+            'cash_flow': cash_flow_risk,
+            'priority': priority_risk
+        }
+        risk_components = np.empty((len(amount), len(FEATURE_WEIGHTS)), order='F')
+        for column, name in enumerate(FEATURE_WEIGHTS):
+            risk_components[:, column] = components[name]
+        
+        confidence = (
+            (vendor_reliability + payment_history) / 2.0 *
+            (1.0 - np.minimum(amount / 100000.0, 0.3))
+        )
+        
+        policy_fields = {
+            'confidence': confidence,
+            'amount': amount,
+            'extension_days': extension_days,
+            'vendor_reliability': vendor_reliability,
+            'payment_history': payment_history,
+            'cash_flow': cash_flow,
+            'priority': priority
+        }
+        return risk_components, policy_fields
+    
+    def risk_from_components(self, risk_components, weights=None):
+        """
+        Weighted risk score over normalized components
+        
+        Terms are summed in FEATURE_WEIGHTS order, exactly as
+        _calculate_risk_score does, so batch and per-request scores agree
+        bit for bit.
+        """
+        weights = weights or self.weights
+        risk = np.zeros(risk_components.shape[0])
+        for column, name in enumerate(FEATURE_WEIGHTS):
+            risk = risk + risk_components[:, column] * weights[name]
+        return risk
+    
+    def feature_rows(self, requests_df):
+        """
+        Rows for the FeatureStore: float32 risk components and (confidence, amount)
+        """
+        risk_components, policy_fields = self.normalize_batch(requests_df)
+        fields = np.column_stack([policy_fields['confidence'], policy_fields['amount']])
+        return risk_components.astype(np.float32), fields.astype(np.float32)
+    
+    def weight_vector(self, weights=None):
+        """Feature weights as a float32 vector in FEATURE_WEIGHTS order"""
+        weights = weights or self.weights
+        return np.array([weights[name] for name in FEATURE_WEIGHTS], dtype=np.float32)
+    
+    def risk_from_matrix(self, feature_matrix, weights=None):
+        """
+        Risk scores for stored feature rows: one matrix-vector product
+        
+        Stored rows are float32, so scores can differ from make_decision in
+        the 7th decimal; interactive decisions keep the per-request path.
+        """
+        return feature_matrix @ self.weight_vector(weights)
+    
+    def score_batch(self, requests_df):
+        """
+        Score many requests in one vectorized pass
         
-        # High confidence and low risk = Auto approve
-        if confidence >= self.rules['auto_approve_threshold'] and risk < self.rules['low_risk_threshold']:
-            return 'Approved'
+        Uses the same normalization, weights and policy as make_decision,
+        without reasoning text or factor details.
         
-        # Low confidence or high risk
-        if confidence < self.rules['min_confidence_score'] or risk > self.rules['escalate_risk_threshold']:
-            if amount > self.rules['high_risk_amount']:
-                return 'Escalate'
-            else:
-                return 'Rejected'
+        Args:
+            requests_df: DataFrame with REQUEST_COLUMNS
         
-        # Moderate confidence and moderate-low risk
-        if risk < 0.6 and confidence > self.rules['min_confidence_score']:
-            return 'Approved'
+        Returns:
+            DataFrame (same index) with risk_score, confidence_score and decision
+        """
+        return pd.DataFrame(self._score_normalized(*self.normalize_batch(requests_df)), index=requests_df.index)
+    
+    def score_records(self, records):
+        """
+        score_batch for a list of request dicts, without pandas
         
-        # Default to escalation for uncertain cases
-        return 'Escalate'
+        Returns:
+            Dict of risk_score, confidence_score and decision arrays, in record order
+        """
+        return self._score_normalized(*self.normalize_records(records))
+    
+    def _score_normalized(self, risk_components, policy_fields):
+        """Rounded scores and policy decisions for normalized requests"""
+        risk_score = self.risk_from_components(risk_components)
+        return {
+            'risk_score': np.round(risk_score, 2),
+            'confidence_score': np.round(policy_fields['confidence'], 2),
+            'decision': self.policy.evaluate_batch({**policy_fields, 'risk': risk_score})
+        }
     
     def _generate_reasoning(self, decision, confidence, risk, amount, 
                            extension_days, vendor_reliability, payment_history):
@@ -0,0 +1,299 @@
+"""
+Segmented Audit Log Storage for Invoice Payment Manager
+Rotates the audit trail into gzip-compressed segments indexed by a manifest
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+import pandas as pd
+from config import (
+    AUDIT_DIR, AUDIT_LOG_COLUMNS, AUDIT_SEGMENT_MAX_ROWS,
+    AUDIT_SEGMENT_MAX_DAYS, AUDIT_BLOOM_BITS, AUDIT_BLOOM_HASHES
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+
+ACTIVE_SEGMENT = os.path.join(AUDIT_DIR, "active.csv")
+MANIFEST_PATH = os.path.join(AUDIT_DIR, "manifest.json")
+LOCK_PATH = os.path.join(AUDIT_DIR, ".lock")
+GENESIS_HASH = "0" * 64
+
+
+class BloomFilter:
+    """Fixed-size bloom filter used to skip segments during queries"""
+
+    def __init__(self, bits=AUDIT_BLOOM_BITS, hashes=AUDIT_BLOOM_HASHES, value=0):
+        self.bits = bits
+        self.hashes = hashes
+        self.value = value
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(str(item).encode('utf-8'), digest_size=8 * self.hashes).digest()
+        for i in range(self.hashes):
+            yield int.from_bytes(digest[i * 8:(i + 1) * 8], 'little') % self.bits
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.value |= 1 << position
+
+    def might_contain(self, item):
+        return all(self.value >> position & 1 for position in self._positions(item))
+
+    def to_hex(self):
+        return format(self.value, 'x')
+
+    @classmethod
+    def from_hex(cls, hex_value):
+        return cls(value=int(hex_value, 16))
+
+
+class AuditLogStore:
+    """
+    Append-only audit log split into rotated, compressed segments
+
+    Every session has its own store on the same directory, so the manifest
+    on disk is the only source of truth: it is re-read under an exclusive
+    file lock before appending or sealing (segment ids and the active row
+    count come from it), and under a shared lock before reading.
+    """
+
+    def __init__(self):
+        """Ensure the audit directory and manifest exist"""
+        if not os.path.exists(AUDIT_DIR):
+            os.makedirs(AUDIT_DIR)
+        self.manifest = self._load_manifest()
+
+    @contextmanager
+    def _locked(self, shared=False):
+        """Hold the audit directory lock and refresh the manifest from disk (no lock where fcntl is unavailable)"""
+        if fcntl is None:
+            self.manifest = self._load_manifest()
+            yield
+            return
+        with open(LOCK_PATH, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                self.manifest = self._load_manifest()
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load_manifest(self):
+        """Load the segment manifest, creating an empty one if needed"""
+        if os.path.exists(MANIFEST_PATH):
+            with open(MANIFEST_PATH, 'r') as f:
+                return json.load(f)
+        return {
+            'segments': [],
+            'active': {'rows': 0, 'start': None, 'end': None},
+            'chain_head': GENESIS_HASH,
+            'actions': [],
+            'users': []
+        }
+
+    def _save_manifest(self):
+        """Atomically persist the manifest"""
+        tmp_path = f"{MANIFEST_PATH}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, MANIFEST_PATH)
+
+    def is_empty(self):
+        """True when no audit entries have ever been written"""
+        with self._locked(shared=True):
+            return not self.manifest['segments'] and self.manifest['active']['rows'] == 0
+
+    def append(self, entries):
+        """
+        Append audit entries to the active segment, rotating when it is full
+
+        Args:
+            entries: DataFrame (or list of dicts) with AUDIT_LOG_COLUMNS
+        """
+        df = pd.DataFrame(entries).reindex(columns=AUDIT_LOG_COLUMNS)
+        if df.empty:
+            return
+        df = df.sort_values('timestamp', kind='stable')
+        with self._locked():
+            self._append_locked(df)
+
+    def _append_locked(self, df):
+        """append() with the lock held and the manifest freshly read"""
+        timestamps = pd.to_datetime(df['timestamp'])
+
+        # Time-based rotation: seal the active segment before it spans too long
+        active = self.manifest['active']
+        if active['rows'] and active['start']:
+            age = timestamps.iloc[0] - pd.Timestamp(active['start'])
+            if age.days >= AUDIT_SEGMENT_MAX_DAYS:
+                self._seal_active_segment()
+
+        # Size-based rotation: fill the active segment in chunks
+        position = 0
+        while position < len(df):
+            room = AUDIT_SEGMENT_MAX_ROWS - self.manifest['active']['rows']
+            chunk = df.iloc[position:position + room]
+            self._append_to_active(chunk)
+            position += len(chunk)
+            if self.manifest['active']['rows'] >= AUDIT_SEGMENT_MAX_ROWS:
+                self._seal_active_segment()
+
+        self._save_manifest()
+
+    def _append_to_active(self, df):
+        """Write rows to the active segment and update its manifest entry"""
+        write_header = not os.path.exists(ACTIVE_SEGMENT) or self.manifest['active']['rows'] == 0
+        df.to_csv(ACTIVE_SEGMENT, mode='w' if write_header else 'a', header=write_header, index=False)
+
+        active = self.manifest['active']
+        timestamps = pd.to_datetime(df['timestamp'])
+        chunk_start = timestamps.min().strftime('%Y-%m-%d %H:%M:%S')
+        chunk_end = timestamps.max().strftime('%Y-%m-%d %H:%M:%S')
+        active['rows'] += len(df)
+        active['start'] = min(active['start'] or chunk_start, chunk_start)
+        active['end'] = max(active['end'] or chunk_end, chunk_end)
+
+        self.manifest['actions'] = sorted(set(self.manifest['actions']) | set(df['action'].dropna().astype(str)))
+        self.manifest['users'] = sorted(set(self.manifest['users']) | set(df['user'].dropna().astype(str)))
+
+    def _seal_active_segment(self):
+        """Compress the active segment into an archive and chain its hash"""
+        if not os.path.exists(ACTIVE_SEGMENT) or self.manifest['active']['rows'] == 0:
+            return
+
+        with open(ACTIVE_SEGMENT, 'rb') as f:
+            raw = f.read()
+        df = pd.read_csv(ACTIVE_SEGMENT)
+
+        action_bloom = BloomFilter()
+        user_bloom = BloomFilter()
+        for action in df['action'].dropna().unique():
+            action_bloom.add(action)
+        for user in df['user'].dropna().unique():
+            user_bloom.add(user)
+
+        segment_id = len(self.manifest['segments']) + 1
+        filename = f"segment_{segment_id:06d}.csv.gz"
+        with gzip.open(os.path.join(AUDIT_DIR, filename), 'wb') as f:
+            f.write(raw)
+
+        content_hash = hashlib.sha256(raw).hexdigest()
+        chain_hash = hashlib.sha256((self.manifest['chain_head'] + content_hash).encode('utf-8')).hexdigest()
+
+        active = self.manifest['active']
+        self.manifest['segments'].append({
+            'file': filename,
+            'rows': active['rows'],
+            'start': active['start'],
+            'end': active['end'],
+            'action_bloom': action_bloom.to_hex(),
+            'user_bloom': user_bloom.to_hex(),
+            'content_hash': content_hash,
+            'chain_hash': chain_hash
+        })
+        self.manifest['chain_head'] = chain_hash
+        self.manifest['active'] = {'rows': 0, 'start': None, 'end': None}
+        os.remove(ACTIVE_SEGMENT)
+
+    def _segment_matches(self, segment, start, end, actions, users):
+        """Use the manifest time range and bloom filters to skip segments"""
+        if start is not None and segment['end'] and pd.Timestamp(segment['end']) < pd.Timestamp(start):
+            return False
+        if end is not None and segment['start'] and pd.Timestamp(segment['start']) >= pd.Timestamp(end):
+            return False
+        if actions is not None and 'action_bloom' in segment:
+            bloom = BloomFilter.from_hex(segment['action_bloom'])
+            if not any(bloom.might_contain(action) for action in actions):
+                return False
+        if users is not None and 'user_bloom' in segment:
+            bloom = BloomFilter.from_hex(segment['user_bloom'])
+            if not any(bloom.might_contain(user) for user in users):
+                return False
+        return True
+
+    def load(self, start=None, end=None, actions=None, users=None):
+        """
+        Load audit entries, reading only segments that can match the query
+
+        Args:
+            start: Inclusive lower bound on timestamp (None = unbounded)
+            end: Exclusive upper bound on timestamp (None = unbounded)
+            actions: Iterable of actions to keep (None = all)
+            users: Iterable of users to keep (None = all)
+
+        Returns:
+            DataFrame of matching entries, most recent first
+        """
+        actions = list(actions) if actions is not None else None
+        users = list(users) if users is not None else None
+        with self._locked(shared=True):
+            frames = self._read_matching(start, end, actions, users)
+
+        if not frames:
+            return pd.DataFrame(columns=AUDIT_LOG_COLUMNS)
+
+        df = pd.concat(frames, ignore_index=True)
+        if start is not None:
+            df = df[df['timestamp'] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df['timestamp'] < pd.Timestamp(end)]
+        if actions is not None:
+            df = df[df['action'].isin(actions)]
+        if users is not None:
+            df = df[df['user'].isin(users)]
+        return df.sort_values('timestamp', ascending=False, kind='stable').reset_index(drop=True)
+
+    def _read_matching(self, start, end, actions, users):
+        """Frames of the segments (and active rows) the query can match, lock held"""
+        frames = []
+        for segment in self.manifest['segments']:
+            if self._segment_matches(segment, start, end, actions, users):
+                frames.append(pd.read_csv(os.path.join(AUDIT_DIR, segment['file']),
+                                          compression='gzip', parse_dates=['timestamp']))
+
+        active = dict(self.manifest['active'])
+        if active['rows'] and os.path.exists(ACTIVE_SEGMENT) and \
+                self._segment_matches(active, start, end, None, None):
+            frames.append(pd.read_csv(ACTIVE_SEGMENT, parse_dates=['timestamp']))
+        return frames
+
+    def known_values(self):
+        """Distinct actions and users seen across all segments"""
+        with self._locked(shared=True):
+            return self.manifest['actions'], self.manifest['users']
+
+    def verify_chain(self):
+        """
+        Recompute the hash chain over archived segments
+
+        Segment files on disk that the manifest does not list (e.g. left by
+        a lost manifest update) also break the chain.
+
+        Returns:
+            Tuple of (is_valid, first_broken_segment_file or None)
+        """
+        with self._locked(shared=True):
+            return self._verify_chain_locked()
+
+    def _verify_chain_locked(self):
+        listed = {segment['file'] for segment in self.manifest['segments']}
+        unlisted = sorted(name for name in os.listdir(AUDIT_DIR)
+                          if name.startswith('segment_') and name.endswith('.csv.gz') and name not in listed)
+        if unlisted:
+            return False, unlisted[0]
+
+        chain_head = GENESIS_HASH
+        for segment in self.manifest['segments']:
+            with gzip.open(os.path.join(AUDIT_DIR, segment['file']), 'rb') as f:
+                content_hash = hashlib.sha256(f.read()).hexdigest()
+            chain_head = hashlib.sha256((chain_head + content_hash).encode('utf-8')).hexdigest()
+            if content_hash != segment['content_hash'] or chain_head != segment['chain_hash']:
+                return False, segment['file']
+        return chain_head == self.manifest['chain_head'], None
@@ -0,0 +1,154 @@
+"""
+Auto-Disposition Stage for Invoice Payment Manager
+Finalizes high-confidence requests on ingest and routes the rest to human review
+"""
+
+import time
+from datetime import datetime
+from config import AUTO_DISPOSITION_RULES
+
+
+AUTO_DISPOSITION_USER = "AI Auto-Disposition"
+
+
+class AutoDisposition:
+    """Runs the AI engine over newly ingested requests and applies guard rules"""
+
+    def __init__(self, data_manager, ai_engine, rules=None):
+        """
+        Args:
+            data_manager: DataManager used for queueing and persistence
+            ai_engine: AIDecisionEngine used for scoring
+            rules: Guard overrides (defaults to AUTO_DISPOSITION_RULES)
+        """
+        self.data_manager = data_manager
+        self.ai_engine = ai_engine
+        self.rules = rules or AUTO_DISPOSITION_RULES
+
+    def evaluate(self, request, ai_result):
+        """
+        Decide whether a request can be finalized without a human
+
+        Returns:
+            'Approved' or 'Rejected' if the guards are cleared, otherwise None
+        """
+        amount = float(request.get('invoice_amount', 0))
+        confidence = ai_result['confidence_score']
+        risk = ai_result['risk_score']
+
+        if (ai_result['decision'] == 'Approved'
+                and confidence >= self.rules['approve_min_confidence']
+                and risk < self.rules['approve_max_risk']
+                and amount <= self.rules['approve_max_amount']):
+            return 'Approved'
+
+        if (ai_result['decision'] == 'Rejected'
+                and confidence <= self.rules['reject_max_confidence']
+                and risk >= self.rules['reject_min_risk']
+                and amount <= self.rules['reject_max_amount']):
+            return 'Rejected'
+
+        return None
+
+    def run(self, requests_df, worker_id):
+        """
+        Ingest pending requests: mask PII in their text, quarantine suspicious
+        ones, queue and index new ones, auto-finalize those that clear the guards, and
+        leave the remainder in the review queue
+
+        Args:
+            requests_df: Current pending requests
+            worker_id: Lease owner for auto-handled requests (unique per session,
+                so two sessions ingesting at once cannot both finalize a request)
+
+        Returns:
+            Report dict with counts (including requests quarantined by
+            screening and PII values masked), auto-handled fraction and
+            per-request latency
+        """
+        ingest_start = time.perf_counter()
+        ai_results = {}
+
+        # Nothing downstream (queue, features, search, exports) sees unmasked text
+        requests_df, pii_report = self.data_manager.mask_pending_pii(requests_df)
+
+        # Duplicates and amount outliers stay out of the queue until a person resolves them
+        requests_df, quarantined_df = self.data_manager.screen_ingest(requests_df)
+
+        def risk_scorer(request):
+            ai_results[request['request_id']] = self.ai_engine.make_decision(request)
+            return ai_results[request['request_id']]['risk_score']
+
+        new_ids = self.data_manager.sync_review_queue(requests_df, risk_scorer)
+        routed_at = time.perf_counter()
+
+        requests_by_id = {}
+        if new_ids:
+            new_df = requests_df[requests_df['request_id'].astype(str).isin(new_ids)]
+            requests_by_id = {str(request['request_id']): request for request in new_df.to_dict('records')}
+            # Normalize once on ingest; simulations and re-scoring read the stored rows
+            self.data_manager.store_request_features(new_df, self.ai_engine)
+            self.data_manager.index_pending_requests(new_df)
+
+        dispositions = {}
+        if self.rules.get('enabled', True):
+            for request_id, request in requests_by_id.items():
+                disposition = self.evaluate(request, ai_results[request['request_id']])
+                if disposition:
+                    dispositions[request_id] = disposition
+
+        # Lease before writing so a concurrent reviewer cannot also decide it
+        claimed_ids = set(self.data_manager.claim_requests_batch(list(dispositions), worker_id))
+
+        decision_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        decided_at = time.perf_counter()
+        decisions = []
+        for request_id in dispositions:
+            if request_id not in claimed_ids:
+                continue
+            request = requests_by_id[request_id]
+            ai_result = ai_results[request['request_id']]
+            decisions.append({
+                'request_id': request['request_id'],
+                'decision_date': decision_date,
+                'ai_decision': ai_result['decision'],
+                'confidence_score': ai_result['confidence_score'],
+                'human_review': False,
+                'final_decision': dispositions[request_id],
+                'processing_time_seconds': round(decided_at - ingest_start, 4),
+                'vendor_name': request['vendor_name'],
+                'invoice_amount': request['invoice_amount']
+            })
+
+        if decisions:
+            committed = self.data_manager.commit_decisions_batch(
+                decisions, user=AUTO_DISPOSITION_USER, details_prefix="Auto-disposition"
+            )
+            if not committed:
+                self.data_manager.release_request(worker_id)
+                decisions = []
+        finished_at = time.perf_counter()
+
+        # End-to-end latency: ingest start until the decision is durable (auto)
+        # or until the request is visible in the review queue (routed)
+        auto_ids = {str(decision['request_id']) for decision in decisions}
+        latencies_ms = {
+            request_id: round(((finished_at if request_id in auto_ids else routed_at) - ingest_start) * 1000, 2)
+            for request_id in requests_by_id
+        }
+
+        ingested = len(requests_by_id)
+        return {
+            'timestamp': decision_date,
+            'ingested': ingested,
+            'quarantined': len(quarantined_df),
+            'pii_masked': pii_report['values_masked'],
+            'pii_requests': pii_report['rows_with_pii'],
+            'auto_approved': sum(1 for d in decisions if d['final_decision'] == 'Approved'),
+            'auto_rejected': sum(1 for d in decisions if d['final_decision'] == 'Rejected'),
+            'routed_to_review': ingested - len(decisions),
+            'auto_fraction': len(decisions) / ingested if ingested else 0.0,
+            'latencies_ms': latencies_ms,
+            'avg_latency_ms': sum(latencies_ms.values()) / ingested if ingested else 0.0,
+            'max_latency_ms': max(latencies_ms.values()) if latencies_ms else 0.0
+        }
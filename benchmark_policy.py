@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Decision Policy Equivalence Check & Benchmark
+Verifies the compiled decision_policy.json matches the original hand-coded
+decision logic, then measures rule evaluation throughput.
+
+Run: python3 benchmark_policy.py [--rows 1000000]
+"""
+
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from config import DECISION_RULES
+from decision_policy import load_policy
+from ai_decision_engine import AIDecisionEngine
+
+
+def reference_decision(confidence, risk, amount, rules=DECISION_RULES):
+    """The original if-chain from AIDecisionEngine._determine_decision"""
+    if confidence >= rules['auto_approve_threshold'] and risk < rules['low_risk_threshold']:
+        return 'Approved'
+    if confidence < rules['min_confidence_score'] or risk > rules['escalate_risk_threshold']:
+        if amount > rules['high_risk_amount']:
+            return 'Escalate'
+        else:
+            return 'Rejected'
+    if risk < 0.6 and confidence > rules['min_confidence_score']:
+        return 'Approved'
+    return 'Escalate'
+
+
+def boundary_grid():
+    """Every combination of values on and around each threshold"""
+    eps = 1e-9
+    confidence_points, risk_points, amount_points = [0.0, 1.0], [0.0, 1.0], [0.0, 1e6]
+    for key in ['auto_approve_threshold', 'min_confidence_score']:
+        value = DECISION_RULES[key]
+        confidence_points += [value - eps, value, value + eps]
+    for key in ['low_risk_threshold', 'escalate_risk_threshold', 'moderate_risk_threshold']:
+        value = DECISION_RULES[key]
+        risk_points += [value - eps, value, value + eps]
+    value = DECISION_RULES['high_risk_amount']
+    amount_points += [value - 0.01, value, value + 0.01]
+
+    grid = np.array(np.meshgrid(confidence_points, risk_points, amount_points)).reshape(3, -1)
+    return grid[0], grid[1], grid[2]
+
+
+def random_requests(n, seed=7):
+    """Synthetic requests spanning (and exceeding) the realistic ranges"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'request_id': [f'SIM-{i}' for i in range(n)],
+        'vendor_name': 'Sim Vendor',
+        'invoice_amount': rng.uniform(1000, 120000, n).round(2),
+        'original_due_date': '2025-01-01',
+        'requested_extension_days': rng.choice([7, 14, 21, 30, 45], n),
+        'reason': '',
+        'priority': rng.choice(['High', 'Medium', 'Low'], n),
+        'vendor_reliability_score': rng.uniform(0.3, 1.0, n).round(2),
+        'payment_history_score': rng.uniform(0.3, 1.0, n).round(2),
+        'cash_flow_impact': rng.choice(['Low', 'Medium', 'High'], n),
+        'submission_date': '2025-01-01'
+    })
+
+
+def check_equivalence(policy, engine, n_random):
+    """Return a list of mismatch descriptions (empty when equivalent)"""
+    failures = []
+
+    # 1. Thresholds: boundary grid plus uniform random scores
+    rng = np.random.default_rng(11)
+    grid_conf, grid_risk, grid_amount = boundary_grid()
+    confidence = np.concatenate([grid_conf, rng.uniform(0, 1, n_random)])
+    risk = np.concatenate([grid_risk, rng.uniform(0, 1, n_random)])
+    amount = np.concatenate([grid_amount, rng.uniform(0, 120000, n_random)])
+
+    expected = np.array([reference_decision(c, r, a) for c, r, a in zip(confidence, risk, amount)], dtype=object)
+    per_row = np.array([policy.evaluate({'confidence': c, 'risk': r, 'amount': a})
+                        for c, r, a in zip(confidence, risk, amount)], dtype=object)
+    batch = policy.evaluate_batch({'confidence': confidence, 'risk': risk, 'amount': amount})
+
+    for label, actual in [('per-row', per_row), ('batch', batch)]:
+        mismatches = np.flatnonzero(actual != expected)
+        if len(mismatches):
+            i = mismatches[0]
+            failures.append(f"{label}: {len(mismatches)} mismatches, e.g. confidence={confidence[i]!r} "
+                            f"risk={risk[i]!r} amount={amount[i]!r} expected={expected[i]} got={actual[i]}")
+
+    # 2. End to end: make_decision (per row) vs score_batch on full requests
+    requests_df = random_requests(min(n_random, 20000))
+    batch_scores = engine.score_batch(requests_df)
+    for position, request in enumerate(requests_df.to_dict('records')):
+        result = engine.make_decision(request)
+        row = batch_scores.iloc[position]
+        # Scores are rounded for display; np.round and round() may differ by one
+        # step on exact .xx5 ties, decisions are taken on unrounded values
+        if (result['decision'] != row['decision']
+                or abs(result['risk_score'] - row['risk_score']) > 0.01 + 1e-9
+                or abs(result['confidence_score'] - row['confidence_score']) > 0.01 + 1e-9):
+            failures.append(f"engine: make_decision and score_batch disagree on {request['request_id']}: "
+                            f"{result} vs {row.to_dict()}")
+            break
+
+    return failures
+
+
+def benchmark(policy, n_rows):
+    """Measure rows/sec and rules/sec for reference, per-row and batch evaluation"""
+    rng = np.random.default_rng(3)
+    confidence = rng.uniform(0, 1, n_rows)
+    risk = rng.uniform(0, 1, n_rows)
+    amount = rng.uniform(0, 120000, n_rows)
+    n_rules = len(policy.rules) + 1  # + default
+
+    sample = min(n_rows, 200000)
+    rows = list(zip(confidence[:sample].tolist(), risk[:sample].tolist(), amount[:sample].tolist()))
+
+    start = time.perf_counter()
+    for c, r, a in rows:
+        reference_decision(c, r, a)
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for c, r, a in rows:
+        policy.decide(c, r, a)
+    per_row_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    policy.evaluate_batch({'confidence': confidence, 'risk': risk, 'amount': amount})
+    batch_time = time.perf_counter() - start
+
+    return [
+        ('Hand-coded if-chain', sample, reference_time),
+        ('Compiled policy (per row)', sample, per_row_time),
+        ('Compiled policy (batch)', n_rows, batch_time),
+    ], n_rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000, help='rows for the batch benchmark')
+    parser.add_argument('--random', type=int, default=200000, help='random cases for the equivalence check')
+    args = parser.parse_args()
+
+    policy = load_policy()
+    engine = AIDecisionEngine(policy=policy)
+
+    print("=" * 60)
+    print("  Decision Policy Equivalence Check")
+    print("=" * 60)
+    failures = check_equivalence(policy, engine, args.random)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print(f"✅ Policy matches the hand-coded decision logic "
+          f"({len(boundary_grid()[0]) + args.random:,} threshold cases, per-row and batch)")
+    print("✅ make_decision and score_batch agree on end-to-end scoring")
+
+    print()
+    print("=" * 60)
+    print("  Benchmark")
+    print("=" * 60)
+    results, n_rules = benchmark(policy, args.rows)
+    for label, n, seconds in results:
+        print(f"{label:<28} {n:>10,} rows  {seconds*1000:>9.1f} ms  "
+              f"{n / seconds:>14,.0f} rows/s  {n * n_rules / seconds:>16,.0f} rules/s")
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
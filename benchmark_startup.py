@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Measures what a user waits for before the app paints: the cold import of
+main_simple.py, the first run of each page in a fresh server process, and
+the first run of a new session once the server is warm.
+
+Every measurement runs in its own Python process so module caches start
+cold. Uses the data/ directory of the working directory, like the app.
+
+Run: python3 benchmark_startup.py [--repeat 3]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PAGES = ["🏠 Dashboard", "📋 Review Requests", "📊 Reports", "🔍 AI Governance", "🧪 What-If Simulator"]
+
+# Executed in a child process; prints one JSON object
+IMPORT_PROBE = """
+import json, time
+start = time.perf_counter()
+import streamlit
+streamlit_done = time.perf_counter()
+import main_simple
+done = time.perf_counter()
+print(json.dumps({'streamlit': streamlit_done - start, 'app': done - streamlit_done}))
+"""
+
+PAGE_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+def first_run(page):
+    at = AppTest.from_file('main_simple.py', default_timeout=120)
+    at.session_state['page'] = page
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise SystemExit(f"{page}: {at.exception[0].message}")
+    return elapsed
+
+page = sys.argv[1]
+cold = first_run(page)   # fresh process: imports, sample data checks, caches
+warm = first_run(page)   # another session on the same (now warm) server
+print(json.dumps({'cold': cold, 'warm': warm}))
+"""
+
+
+def run_probe(code, *args):
+    """Run a probe in a fresh interpreter and return its JSON output"""
+    result = subprocess.run([sys.executable, '-c', code, *args], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.stdout)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median_ms(samples, key):
+    return statistics.median(sample[key] for sample in samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help='fresh processes per measurement (median reported)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  Startup Benchmark")
+    print("=" * 60)
+
+    imports = [run_probe(IMPORT_PROBE) for _ in range(args.repeat)]
+    print(f"Cold import: streamlit {median_ms(imports, 'streamlit'):.0f} ms, "
+          f"main_simple.py on top {median_ms(imports, 'app'):.0f} ms")
+
+    print(f"\n{'Page':<24}{'cold first paint':>18}{'new session':>14}")
+    for page in PAGES:
+        runs = [run_probe(PAGE_PROBE, page) for _ in range(args.repeat)]
+        print(f"{page:<24}{median_ms(runs, 'cold'):>15.0f} ms{median_ms(runs, 'warm'):>11.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Change Log for Invoice Payment Manager
+Per-table version counters and a feed of appended/removed request ids
+"""
+
+import sqlite3
+from contextlib import closing
+from config import CHANGE_LOG_DB, CHANGE_FEED_RETENTION
+
+
+# Tables tracked by the log (keys are request ids in every table)
+TABLES = ['requests', 'decisions', 'archive', 'audit']
+
+
+class ChangeLog:
+    """
+    Monotonic version per table plus the keys each version touched
+
+    Every write made through DataManager bumps its table's version and
+    records the appended/removed keys in the same transaction, so any
+    process can ask "what changed since version N" instead of reloading.
+
+    Each table also remembers a stamp (sizes and mtimes of its files) as of
+    its last recorded write. When the files no longer match the stamp -
+    edited by hand, written by an older build, or a write whose log entry
+    failed - the change is logged as a 'reset', which tells readers to
+    reload that table whole.
+    """
+
+    def __init__(self, path=CHANGE_LOG_DB, retention=CHANGE_FEED_RETENTION):
+        """Open (or create) the log database"""
+        self.path = path
+        self.retention = retention
+        with self._connect() as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS table_versions (
+                    table_name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    stamp TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS changes (
+                    table_name TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    op TEXT NOT NULL,
+                    key TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_changes_version ON changes (table_name, version)")
+
+    def _connect(self):
+        """Open a short-lived connection in autocommit mode"""
+        return closing(sqlite3.connect(self.path, timeout=10, isolation_level=None))
+
+    @staticmethod
+    def _check_table(table):
+        if table not in TABLES:
+            raise ValueError(f"Unknown table: {table}")
+
+    def _bump(self, conn, table, stamp, rows):
+        """Insert one version's change rows and advance the counter (inside a transaction)"""
+        rows = rows or [('touch', None)]  # every version keeps a row, so pruning is detectable
+        row = conn.execute("SELECT version FROM table_versions WHERE table_name = ?", (table,)).fetchone()
+        version = (row[0] if row else 0) + 1
+        conn.executemany(
+            "INSERT INTO changes (table_name, version, op, key) VALUES (?, ?, ?, ?)",
+            [(table, version, op, key) for op, key in rows]
+        )
+        conn.execute(
+            "INSERT INTO table_versions (table_name, version, stamp) VALUES (?, ?, ?) "
+            "ON CONFLICT(table_name) DO UPDATE SET version = excluded.version, stamp = excluded.stamp",
+            (table, version, stamp)
+        )
+        conn.execute("DELETE FROM changes WHERE table_name = ? AND version <= ?",
+                     (table, version - self.retention))
+        return version
+
+    def record(self, table, stamp, appended=(), removed=()):
+        """
+        Log a write made by this application
+
+        Args:
+            table: One of TABLES
+            stamp: File stamp of the table after the write
+            appended: Keys added (or rewritten) by the write
+            removed: Keys removed by the write
+
+        Returns:
+            The table's new version
+        """
+        self._check_table(table)
+        rows = [('append', str(key)) for key in appended] + [('remove', str(key)) for key in removed]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            version = self._bump(conn, table, stamp, rows)
+            conn.execute("COMMIT")
+        return version
+
+    def version(self, table, stamp):
+        """
+        Current version of a table, logging a reset if its files changed unseen
+
+        Args:
+            table: One of TABLES
+            stamp: File stamp of the table as it is on disk now
+        """
+        self._check_table(table)
+        with self._connect() as conn:
+            row = conn.execute("SELECT version, stamp FROM table_versions WHERE table_name = ?",
+                               (table,)).fetchone()
+            if row is not None and row[1] == stamp:
+                return row[0]
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT version, stamp FROM table_versions WHERE table_name = ?",
+                               (table,)).fetchone()
+            if row is not None and row[1] == stamp:
+                version = row[0]  # another process logged it first
+            else:
+                version = self._bump(conn, table, stamp, [('reset', None)])
+            conn.execute("COMMIT")
+        return version
+
+    def changes_since(self, table, since, stamp):
+        """
+        Net key-level changes to a table after a given version
+
+        The last operation on a key wins: a key removed and appended again
+        is reported as appended, one appended and then removed as removed.
+
+        Args:
+            table: One of TABLES
+            since: Version the reader last saw (0 = never read)
+            stamp: File stamp of the table as it is on disk now
+
+        Returns:
+            Dict with 'version' (current), 'appended' and 'removed' key lists,
+            and 'reset' - True when the reader must reload the table whole
+            (its files changed outside the app, or `since` is not covered by
+            the retained feed)
+        """
+        version = self.version(table, stamp)
+        result = {'version': version, 'appended': [], 'removed': [], 'reset': False}
+        if since == version:
+            return result
+
+        with self._connect() as conn:
+            oldest = conn.execute("SELECT MIN(version) FROM changes WHERE table_name = ?",
+                                  (table,)).fetchone()[0]
+            rows = conn.execute(
+                "SELECT op, key FROM changes WHERE table_name = ? AND version > ? AND version <= ? "
+                "ORDER BY version, rowid",
+                (table, since, version)
+            ).fetchall()
+
+        # since > version means the log was recreated underneath the reader
+        if (since <= 0 or since > version or oldest is None or oldest > since + 1
+                or any(op == 'reset' for op, _ in rows)):
+            result['reset'] = True
+            return result
+
+        last_op = {}
+        for op, key in rows:
+            if op == 'touch':
+                continue
+            last_op.pop(key, None)
+            last_op[key] = op
+        result['appended'] = [key for key, op in last_op.items() if op == 'append']
+        result['removed'] = [key for key, op in last_op.items() if op == 'remove']
+        return result
@@ -31,6 +31,31 @@ DECISION_RULES = {
     "escalate_confidence_threshold": 0.6,
     "escalate_risk_threshold": 0.7,
     "low_risk_threshold": 0.4,
+    "moderate_risk_threshold": 0.6,
+}
+
+# Decision outcomes; decision codes (What-If, policy optimizer, risk audit) index this list
+DECISION_LABELS = ['Approved', 'Rejected', 'Escalate']
+
+# Declarative decision policy (ordered rules; "$name" values resolve from DECISION_RULES)
+DECISION_POLICY_FILE = "decision_policy.json"
+
+# Auto-Disposition Guards (applied on ingest; anything not cleared goes to human review)
+AUTO_DISPOSITION_RULES = {
+    "enabled": True,
+    "approve_min_confidence": DECISION_RULES["auto_approve_threshold"],
+    "approve_max_risk": DECISION_RULES["low_risk_threshold"],
+    "approve_max_amount": 20000,
+    "reject_max_confidence": DECISION_RULES["auto_reject_threshold"],
+    "reject_min_risk": DECISION_RULES["escalate_risk_threshold"],
+    "reject_max_amount": 20000,
+}
+
+# Ingest Screening (duplicates and amount outliers are quarantined instead of queued)
+INGEST_SCREENING = {
+    "enabled": True,
+    "outlier_zscore": 4.0,        # |log amount - vendor mean| in vendor standard deviations
+    "outlier_min_history": 5,     # Vendor amounts needed before outliers are flagged
 }
 
 # Risk Assessment Thresholds
@@ -80,8 +105,103 @@ PRIORITY_RISK = {
 # Data Paths
 DATA_DIR = "data"
 REQUESTS_CSV = f"{DATA_DIR}/invoice_requests.csv"
-DECISIONS_CSV = f"{DATA_DIR}/decisions.csv"
-AUDIT_LOG_CSV = f"{DATA_DIR}/audit_log.csv"
+REQUESTS_ARROW = f"{DATA_DIR}/invoice_requests.arrow"  # Memory-mapped mirror of the CSV (derived)
+DECISIONS_CSV = f"{DATA_DIR}/decisions.csv"  # Legacy single-file history, migrated on startup
+DECISIONS_DIR = f"{DATA_DIR}/decisions"      # Monthly partitions: decisions/YYYY-MM.csv
+DECISION_PARTITION_FORMAT = "%Y-%m"
+AUDIT_LOG_CSV = f"{DATA_DIR}/audit_log.csv"  # Legacy single-file log, migrated on startup
+AUDIT_DIR = f"{DATA_DIR}/audit"              # Rotated, gzip-compressed segments + manifest
+SEARCH_INDEX_DB = f"{DATA_DIR}/search_index.db"  # SQLite FTS5 full-text index (derived)
+REVIEW_QUEUE_DB = f"{DATA_DIR}/review_queue.db"  # Priority-ordered review queue (derived)
+REQUEST_ARCHIVE_DIR = f"{DATA_DIR}/archive"  # Decided requests with their features: archive/YYYY-MM.csv
+FEATURE_STORE_DIR = f"{DATA_DIR}/features"  # Memory-mapped float32 normalized features (derived)
+CHANGE_LOG_DB = f"{DATA_DIR}/change_log.db"  # Per-table version counters and change feed
+QUARANTINE_DB = f"{DATA_DIR}/quarantine.db"  # Requests held back by ingest screening
+RISK_AUDIT_FILE = f"{DATA_DIR}/risk_audit.json"  # Last C2 risk-classification audit and its data-version key
+
+# Audit Log Rotation
+AUDIT_SEGMENT_MAX_ROWS = 10000   # Seal the active segment after this many entries
+AUDIT_SEGMENT_MAX_DAYS = 30      # ...or once it spans this many days
+AUDIT_BLOOM_BITS = 2048          # Per-segment action/user bloom filter size
+AUDIT_BLOOM_HASHES = 4
+AUDIT_DEFAULT_WINDOW_DAYS = 30   # Recent activity loaded into the session
+
+# Change Feed
+CHANGE_FEED_RETENTION = 1000  # Versions of key-level changes kept per table; older readers reload whole
+DATA_WATCH_DEBOUNCE_SECONDS = 0.25  # Let a burst of file events settle before re-reading versions
+DATA_WATCH_POLL_SECONDS = 2.0       # Version polling interval when file events are unavailable
+
+# What-If Simulator (population scopes -> source filter)
+SIMULATION_SCOPES = {
+    "History + Pending": None,
+    "History": "History",
+    "Pending": "Pending"
+}
+
+# Model Metrics (engine vs final decisions)
+METRICS_SCORE_BINS = 100  # Confidence histogram resolution for the binned AUC
+METRICS_WINDOWS = {
+    "Last 7 days": 7,
+    "Last 30 days": 30,
+    "Last 90 days": 90,
+    "All time": None
+}
+METRICS_DEFAULT_WINDOW = "Last 30 days"
+
+# Policy Optimizer (optimize_policy.py)
+# Candidate values per setting; FEATURE_WEIGHTS candidates are rescaled to sum to 1
+OPTIMIZER_SEARCH_SPACE = {
+    "weights": {
+        "amount": [0.15, 0.25, 0.35],
+        "extension": [0.10, 0.20, 0.30],
+        "vendor": [0.10, 0.20, 0.30],
+        "payment": [0.05, 0.15, 0.25],
+        "cash_flow": [0.05, 0.15, 0.25],
+        "priority": [0.0, 0.05, 0.10]
+    },
+    "rules": {
+        "auto_approve_threshold": [0.70, 0.75, 0.80, 0.85],
+        "low_risk_threshold": [0.30, 0.35, 0.40, 0.45],
+        "min_confidence_score": [0.50, 0.55, 0.60, 0.65],
+        "escalate_risk_threshold": [0.60, 0.65, 0.70, 0.75],
+        "moderate_risk_threshold": [0.50, 0.55, 0.60],
+        "high_risk_amount": [40000, 50000, 60000]
+    }
+}
+
+# Cost of an engine decision (outer key) when the final human decision was the inner key
+DECISION_COST_MATRIX = {
+    "Approved": {"Approved": 0.0, "Rejected": 5.0},  # Extending credit a reviewer refused
+    "Rejected": {"Approved": 2.0, "Rejected": 0.0},  # Refusing a vendor a reviewer accepted
+    "Escalate": {"Approved": 1.0, "Rejected": 1.0}   # Reviewer time
+}
+
+# Vendor Risk Profiles (vendor_profiles.py)
+VENDOR_PROFILE_HALF_LIFE_DAYS = 90  # A decision's weight in its vendor's profile halves every this many days
+
+# Scoring Service (scoring_service.py)
+SCORING_HOST = "127.0.0.1"
+SCORING_PORT = 8502
+SCORING_WORKERS = 4               # Threads running AIDecisionEngine.score_records
+SCORING_MAX_BATCH_ROWS = 256      # Rows scored together in one micro-batch
+SCORING_MAX_WAIT_MS = 0           # How long a micro-batch waits for more requests (0 = take only what is queued)
+SCORING_QUEUE_SIZE = 1024         # Jobs waiting for a worker before requests get 503
+SCORING_KEEPALIVE_SECONDS = 30    # Idle keep-alive connections are closed after this
+SCORING_MAX_BODY_BYTES = 10 * 1024 * 1024
+SCORING_LATENCY_WINDOW = 10000    # Recent requests per endpoint kept for p50/p99
+
+# Full-Text Search
+SEARCH_RESULT_LIMIT = 200
+
+# Review Queue Ordering (label -> indexed sort column, ascending = most urgent first)
+REVIEW_QUEUE_ORDERS = {
+    "Due date urgency": "due_key",
+    "Risk score": "risk_key",
+    "Invoice amount": "amount_key",
+    "Priority": "priority_key"
+}
+REVIEW_QUEUE_DEFAULT_ORDER = "Due date urgency"
+REVIEW_LEASE_TTL_SECONDS = 300  # A reviewer's claim lapses unless renewed by a heartbeat
 
 # CSV Column Definitions
 REQUEST_COLUMNS = [
@@ -90,6 +210,8 @@ REQUEST_COLUMNS = [
     "payment_history_score", "cash_flow_impact", "submission_date"
 ]
 
+ARCHIVE_COLUMNS = REQUEST_COLUMNS + ["archived_at"]
+
 DECISION_COLUMNS = [
     "request_id", "decision_date", "ai_decision", "confidence_score",
     "human_review", "final_decision", "processing_time_seconds",
@@ -100,6 +222,14 @@ AUDIT_LOG_COLUMNS = [
     "timestamp", "action", "user", "request_id", "details", "ip_address"
 ]
 
+# Data Profiling (governance rule C22; rules in data_profiling.py)
+DATA_PROFILING_MAX_FAILURE_RATE = 0.05  # A rule failing on more rows than this is Non-Compliant
+
+# Risk Classification Audit (governance rule C2; see risk_audit.py)
+RISK_AUDIT_MIN_ACCURACY = 0.85         # Re-scored automatic decisions matching the final outcome, else Non-Compliant
+RISK_AUDIT_MIN_REPRODUCIBILITY = 0.90  # Re-scored decisions matching the recorded AI decision, else Warning
+RISK_AUDIT_MIN_COVERAGE = 0.50        # Decisions that could be re-scored, else Insufficient Data (no verdict)
+
 # AI Governance Rules
 AI_GOVERNANCE_RULES = {
     "C2": {
@@ -5,43 +5,154 @@ Handles all CSV file operations for requests, decisions, and audit logs
 
 import pandas as pd
 import os
+import io
+import re
+import hashlib
+import threading
+import time
+from collections import Counter
 from datetime import datetime, timedelta
+from functools import cached_property
 import numpy as np
+from audit_store import AuditLogStore
+from search_index import SearchIndex
+from work_queue import ReviewQueue
+from model_metrics import DecisionMetrics, partition_stat
+from vendor_profiles import VendorProfiles
+from data_profiling import profile_tables
+from pii_masking import MaskingLog, mask_frame, mask_text, PII_TEXT_COLUMNS
+from risk_audit import audit_history, audit_status, config_fingerprint, load_report, save_report
+from ingest_screening import IngestScreen, QuarantineStore, QUARANTINE_COLUMNS, flag_reasons
+from feature_store import FeatureStore, row_stamps
+from pending_store import PendingStore
+from change_log import ChangeLog, TABLES
 from config import (
-    DATA_DIR, REQUESTS_CSV, DECISIONS_CSV, AUDIT_LOG_CSV,
-    REQUEST_COLUMNS, DECISION_COLUMNS, AUDIT_LOG_COLUMNS
+    DATA_DIR, REQUESTS_CSV, DECISIONS_CSV, DECISIONS_DIR, AUDIT_LOG_CSV, AUDIT_DIR, REQUEST_ARCHIVE_DIR,
+    DECISION_PARTITION_FORMAT, REQUEST_COLUMNS, DECISION_COLUMNS, AUDIT_LOG_COLUMNS, ARCHIVE_COLUMNS,
+    INGEST_SCREENING, RISK_AUDIT_FILE
 )
 
 
+PARTITION_FILE_PATTERN = re.compile(r'^(\d{4}-\d{2})\.csv$')
+
+INGEST_SCREENING_USER = "Ingest Screening"
+PII_MASKING_USER = "PII Masking"
+QUARANTINE_REPORT_COLUMNS = ['request_id', 'vendor_name', 'invoice_amount', 'reasons', 'amount_zscore']
+
+
 class DataManager:
     """Manages data persistence through CSV files"""
     
+    # Shared by every session in the process: data directories already checked
+    # for sample files, legacy migrations and the search index backfill, the
+    # last statistics, data profile, PII scan and risk audit (keyed by data
+    # directory and table versions), PII masking totals, and the ingest
+    # screening state and pending request ids already counted in the ingest
+    # masking totals per data directory (guarded by its lock)
+    _initialized_dirs = set()
+    _statistics_cache = (None, None)
+    _profile_cache = (None, None)
+    _pii_scan_cache = (None, None)
+    _risk_audit_cache = (None, None)
+    _masking_log = MaskingLog()
+    _ingest_screens = {}
+    _ingest_masked = {}
+    _ingest_screen_lock = threading.Lock()
+    
     def __init__(self):
-        """Initialize data manager and ensure data directory exists"""
+        """
+        Initialize data manager and ensure data directory exists
+        
+        The stores below open their files (SQLite databases, manifests,
+        locks) on first use, so a session only pays for the ones its pages
+        touch.
+        """
         self._ensure_data_dir()
-        self._initialize_csv_files()
+        data_dir = os.path.abspath(DATA_DIR)
+        if data_dir not in DataManager._initialized_dirs:
+            self._initialize_csv_files()
+            self._initialize_search_index()
+            DataManager._initialized_dirs.add(data_dir)
+    
+    @cached_property
+    def audit_store(self):
+        return AuditLogStore()
+    
+    @cached_property
+    def search_index(self):
+        return SearchIndex()
+    
+    @cached_property
+    def review_queue(self):
+        return ReviewQueue()
+    
+    @cached_property
+    def decision_metrics(self):
+        return DecisionMetrics()
+    
+    @cached_property
+    def vendor_profiles(self):
+        return VendorProfiles(extension_days=self._requested_extension_days)
+    
+    @cached_property
+    def quarantine(self):
+        return QuarantineStore()
+    
+    @cached_property
+    def feature_store(self):
+        return FeatureStore()
+    
+    @cached_property
+    def pending_store(self):
+        return PendingStore()
+    
+    @cached_property
+    def change_log(self):
+        return ChangeLog()
     
     def _ensure_data_dir(self):
         """Create data directory if it doesn't exist"""
         if not os.path.exists(DATA_DIR):
             os.makedirs(DATA_DIR)
+        for directory in [DECISIONS_DIR, REQUEST_ARCHIVE_DIR]:
+            if not os.path.exists(directory):
+                os.makedirs(directory)
     
     def _initialize_csv_files(self):
         """Create CSV files with headers if they don't exist"""
         if not os.path.exists(REQUESTS_CSV):
             self._generate_sample_requests()
         
-        if not os.path.exists(DECISIONS_CSV):
+        if os.path.exists(DECISIONS_CSV):
+            self._migrate_legacy_decisions()
+        
+        if not self._list_decision_partitions():
             self._generate_sample_decisions()
         
-        if not os.path.exists(AUDIT_LOG_CSV):
+        if os.path.exists(AUDIT_LOG_CSV):
+            self._migrate_legacy_audit_log()
+        
+        if self.audit_store.is_empty():
             self._generate_sample_audit_log()
     
+    def _initialize_search_index(self):
+        """Backfill the full-text index the first time it is opened"""
+        try:
+            if self.search_index.available and not self.search_index.is_built():
+                self.search_index.rebuild(self.load_requests(), self.load_audit_log())
+        except Exception as e:
+            print(f"Error building search index: {e}")
+    
     def load_requests(self):
-        """Load pending invoice requests from CSV"""
+        """
+        Load pending invoice requests
+        
+        Served from the memory-mapped Arrow mirror of the CSV (rebuilt when the
+        CSV changed), so repeated loads neither parse text nor copy columns.
+        The returned frame's numeric columns are read-only views.
+        """
         try:
-            df = pd.read_csv(REQUESTS_CSV, parse_dates=['original_due_date', 'submission_date'])
-            return df
+            return self.pending_store.load()
         except FileNotFoundError:
             # Return empty dataframe with correct columns
             return pd.DataFrame(columns=REQUEST_COLUMNS)
@@ -49,10 +160,34 @@ class DataManager:
             print(f"Error loading requests: {e}")
             return pd.DataFrame(columns=REQUEST_COLUMNS)
     
+    def _write_pending(self, df, previous_df=None, rewritten=()):
+        """
+        Write the pending CSV, refresh its binary mirror and log the change
+        
+        Args:
+            df: New pending requests
+            previous_df: Pending requests before the write, when the caller
+                only removed or edited rows; without it every request in df
+                is logged as rewritten
+            rewritten: Requests edited in place (with previous_df)
+        """
+        new_ids = df['request_id'].astype(str)
+        if previous_df is None:
+            previous_ids = set(self.load_requests()['request_id'].astype(str))
+            appended = new_ids.tolist()
+        else:
+            previous_ids = set(previous_df['request_id'].astype(str))
+            appended = new_ids[~new_ids.isin(previous_ids) | new_ids.isin(set(rewritten))].tolist()
+        
+        df.to_csv(REQUESTS_CSV, index=False)
+        self.pending_store.write(df)
+        self._record_change('requests', appended=appended, removed=previous_ids - set(new_ids))
+    
     def save_requests(self, df):
-        """Save pending requests back to CSV"""
+        """Save pending requests back to CSV and index their text fields"""
         try:
-            df.to_csv(REQUESTS_CSV, index=False)
+            self._write_pending(df)
+            self.search_index.index_requests(df)
             return True
         except Exception as e:
             print(f"Error saving requests: {e}")
@@ -62,84 +197,854 @@ class DataManager:
         """Remove a request from the pending list"""
         try:
             df = self.load_requests()
-            df = df[df['request_id'] != request_id]
-            self.save_requests(df)
+            self._archive_requests(df[df['request_id'] == request_id])
+            # Processed requests stay searchable, so the index is left untouched
+            self._write_pending(df[df['request_id'] != request_id], previous_df=df)
+            self.review_queue.complete(request_id)
             return True
         except Exception as e:
             print(f"Error removing request {request_id}: {e}")
             return False
     
-    def load_decisions(self):
-        """Load decision history from CSV"""
+    def _list_partitions(self, directory):
+        """Return {month_key: path} for the monthly partitions in a directory"""
+        if not os.path.exists(directory):
+            return {}
+        partitions = {}
+        for filename in os.listdir(directory):
+            match = PARTITION_FILE_PATTERN.match(filename)
+            if match:
+                partitions[match.group(1)] = os.path.join(directory, filename)
+        return dict(sorted(partitions.items()))
+    
+    def _list_decision_partitions(self):
+        """Return {month_key: path} for all decision partitions on disk"""
+        return self._list_partitions(DECISIONS_DIR)
+    
+    def _decision_partition_path(self, decision_date):
+        """Path of the monthly partition a decision timestamp belongs to"""
+        month_key = pd.Timestamp(decision_date).strftime(DECISION_PARTITION_FORMAT)
+        return os.path.join(DECISIONS_DIR, f"{month_key}.csv")
+    
+    def _append_partitions(self, df, directory, date_column, columns):
+        """Append a frame to the monthly partitions of its date column"""
+        df = df.reindex(columns=columns)
+        month_keys = pd.to_datetime(df[date_column]).dt.strftime(DECISION_PARTITION_FORMAT)
+        for month_key, month_df in df.groupby(month_keys, sort=True):
+            path = os.path.join(directory, f"{month_key}.csv")
+            month_df.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+    
+    def _write_decision_partitions(self, df):
+        """Append a frame of decisions to their monthly partitions"""
+        self._append_partitions(df, DECISIONS_DIR, 'decision_date', DECISION_COLUMNS)
+        self._record_change('decisions', appended=df['request_id'])
+    
+    def _archive_requests(self, requests_df, archived_at=None):
+        """
+        Keep the features of requests leaving the pending list
+        
+        Decision records only carry vendor and amount; the archive keeps the
+        full request so past decisions can be replayed (what-if simulation).
+        """
+        if requests_df.empty:
+            return
+        archived = requests_df.reindex(columns=REQUEST_COLUMNS).copy()
+        archived['archived_at'] = (datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                                   if archived_at is None else archived_at)
+        self._append_partitions(archived, REQUEST_ARCHIVE_DIR, 'archived_at', ARCHIVE_COLUMNS)
+        self._record_change('archive', appended=archived['request_id'])
+    
+    def load_request_archive(self):
+        """Load every archived (decided) request"""
         try:
-            df = pd.read_csv(DECISIONS_CSV, parse_dates=['decision_date'])
-            return df
-        except FileNotFoundError:
-            return pd.DataFrame(columns=DECISION_COLUMNS)
+            frames = [pd.read_csv(path) for path in self._list_partitions(REQUEST_ARCHIVE_DIR).values()]
+            if not frames:
+                return pd.DataFrame(columns=ARCHIVE_COLUMNS)
+            return pd.concat(frames, ignore_index=True)
+        except Exception as e:
+            print(f"Error loading request archive: {e}")
+            return pd.DataFrame(columns=ARCHIVE_COLUMNS)
+    
+    def _table_files(self, table):
+        """Files backing a change-logged table"""
+        if table == 'requests':
+            return [REQUESTS_CSV]
+        if table == 'decisions':
+            return list(self._list_partitions(DECISIONS_DIR).values())
+        if table == 'archive':
+            return list(self._list_partitions(REQUEST_ARCHIVE_DIR).values())
+        if not os.path.exists(AUDIT_DIR):
+            return []
+        return [os.path.join(AUDIT_DIR, filename) for filename in sorted(os.listdir(AUDIT_DIR))]
+    
+    def _table_stamp(self, table):
+        """Digest of the names, sizes and modification times of a table's files"""
+        digest = hashlib.blake2b(digest_size=16)
+        for path in self._table_files(table):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()
+    
+    def _record_change(self, table, appended=(), removed=()):
+        """
+        Log a completed write in the change feed
+        
+        A failure here is not fatal: the table's files no longer match the
+        last logged stamp, so the next reader sees a reset and reloads.
+        """
+        try:
+            self.change_log.record(table, self._table_stamp(table), appended, removed)
+        except Exception as e:
+            print(f"Error logging change to {table}: {e}")
+    
+    def get_data_version(self, table):
+        """
+        Current version of a table (requests, decisions, archive or audit)
+        
+        Versions only grow, and grow on every write - including edits made
+        outside the app, which are detected from the files on the next call.
+        Falls back to the file stamp if the change log cannot be read.
+        """
+        try:
+            return self.change_log.version(table, self._table_stamp(table))
+        except Exception as e:
+            print(f"Error reading {table} version: {e}")
+            return self._table_stamp(table)
+    
+    def get_data_versions(self, tables=TABLES):
+        """{table: version} for several tables"""
+        return {table: self.get_data_version(table) for table in tables}
+    
+    def get_changes(self, table, since):
+        """
+        Request ids appended to / removed from a table after version `since`
+        
+        Returns:
+            Dict with 'version', 'appended', 'removed' and 'reset' (True when
+            the caller must reload the table whole instead of applying keys)
+        """
+        try:
+            return self.change_log.changes_since(table, since, self._table_stamp(table))
+        except Exception as e:
+            print(f"Error reading {table} changes: {e}")
+            return {'version': self._table_stamp(table), 'appended': [], 'removed': [], 'reset': True}
+    
+    def get_data_signature(self):
+        """
+        Change token for requests, decisions and the request archive
+        
+        Made of their table versions, so caches of derived data can tell
+        when to rebuild without reading the files.
+        """
+        return tuple(self.get_data_versions(['requests', 'decisions', 'archive']).values())
+    
+    def _migrate_legacy_decisions(self):
+        """
+        Split a single-file decisions.csv into monthly partitions
+        
+        Legacy decisions predate the request archive. Those whose request
+        row is still in the pending file are archived from it, so they can
+        be replayed; the rest have no features to recover.
+        """
+        try:
+            df = pd.read_csv(DECISIONS_CSV)
+            if not df.empty:
+                self._write_decision_partitions(df)
+                self._backfill_request_archive(df)
+            os.replace(DECISIONS_CSV, f"{DECISIONS_CSV}.migrated")
+            print(f"✅ Migrated {len(df)} decisions into monthly partitions")
+        except Exception as e:
+            print(f"Error migrating legacy decisions: {e}")
+    
+    def _backfill_request_archive(self, decisions_df):
+        """Archive the pending rows of decided requests, dated by their decision"""
+        requests_df = self.load_requests()
+        decided = decisions_df.drop_duplicates('request_id', keep='last')
+        decided = decided[decided['request_id'].astype(str).isin(set(requests_df['request_id'].astype(str)))]
+        if decided.empty:
+            return
+        archive_df = requests_df.astype({'request_id': str}).merge(
+            decided[['request_id', 'decision_date']].astype({'request_id': str}), on='request_id'
+        )
+        self._archive_requests(archive_df.drop(columns='decision_date'),
+                               archived_at=archive_df['decision_date'].to_numpy())
+        print(f"✅ Archived request features for {len(archive_df)} migrated decisions")
+    
+    def sync_review_queue(self, requests_df, risk_scorer):
+        """Queue newly pending requests and drop ones that were processed; returns new ids"""
+        try:
+            return self.review_queue.sync(requests_df, risk_scorer)
+        except Exception as e:
+            print(f"Error syncing review queue: {e}")
+            return []
+    
+    def get_review_queue(self, order, reviewer=None):
+        """Pending requests in priority order as (request_id, label, claimed_by)"""
+        try:
+            return self.review_queue.list_ordered(order, reviewer)
+        except Exception as e:
+            print(f"Error reading review queue: {e}")
+            return []
+    
+    def claim_next_request(self, reviewer, order):
+        """Lease the best available request to a reviewer"""
+        try:
+            return self.review_queue.claim_next(reviewer, order)
+        except Exception as e:
+            print(f"Error claiming next request: {e}")
+            return None
+    
+    def claim_request(self, request_id, reviewer):
+        """Lease a specific request to a reviewer; False if someone else holds it"""
+        try:
+            return self.review_queue.claim(request_id, reviewer)
+        except Exception as e:
+            print(f"Error claiming request {request_id}: {e}")
+            return False
+    
+    def heartbeat_request(self, request_id, reviewer):
+        """Renew a reviewer's lease; False if the lease was lost"""
+        try:
+            return self.review_queue.heartbeat(request_id, reviewer)
+        except Exception as e:
+            print(f"Error renewing lease on {request_id}: {e}")
+            return False
+    
+    def release_request(self, reviewer, request_id=None):
+        """Give up a reviewer's lease so others can pick the request up"""
+        try:
+            self.review_queue.release(reviewer, request_id)
+            return True
+        except Exception as e:
+            print(f"Error releasing lease: {e}")
+            return False
+    
+    def _get_ingest_screen(self):
+        """
+        The process-wide screening state of this data directory (call with the lock held)
+        
+        Seeded once per process from the decided ids, the archived requests
+        and the pending requests already queued or released; ingests from
+        every session keep it up to date afterwards.
+        """
+        data_dir = os.path.abspath(DATA_DIR)
+        screen = DataManager._ingest_screens.get(data_dir)
+        if screen is None:
+            screen = IngestScreen()
+            requests_df = self.load_requests()
+            released_ids = {request_id for request_id, status in self.quarantine.statuses().items()
+                            if status == 'released'}
+            accepted_ids = self.review_queue.queued_ids() | released_ids
+            screen.seed(
+                self.load_decisions()['request_id'],
+                self.load_request_archive(),
+                requests_df[requests_df['request_id'].astype(str).isin(accepted_ids)]
+            )
+            DataManager._ingest_screens[data_dir] = screen
+        return screen
+    
+    def _record_decided_ids(self, request_ids):
+        """Tell the screening state about new decisions, if it was built in this process"""
+        with DataManager._ingest_screen_lock:
+            screen = DataManager._ingest_screens.get(os.path.abspath(DATA_DIR))
+            if screen is not None:
+                screen.record_decided(request_ids)
+    
+    def screen_ingest(self, requests_df):
+        """
+        Hold back pending requests that look like duplicates or amount outliers
+        
+        Requests not screened before are checked (see IngestScreen.screen);
+        flagged ones are quarantined with their reasons and an audit entry.
+        Requests in quarantine are left out of the returned frame, so they
+        never reach the review queue or auto-disposition.
+        
+        Args:
+            requests_df: Current pending requests
+        
+        Returns:
+            Tuple of (requests to queue, DataFrame of newly quarantined requests)
+        """
+        newly_quarantined = pd.DataFrame(columns=QUARANTINE_REPORT_COLUMNS)
+        try:
+            if requests_df.empty:
+                return requests_df, newly_quarantined
+            statuses = self.quarantine.statuses()
+            request_ids = requests_df['request_id'].astype(str)
+            
+            if INGEST_SCREENING.get('enabled', True):
+                candidates = requests_df[~request_ids.isin(set(statuses))]
+                candidate_ids = request_ids[candidates.index]
+                with DataManager._ingest_screen_lock:
+                    screen = self._get_ingest_screen()
+                    result = screen.screen(candidates)
+                    # Every copy of a flagged request_id is held back together
+                    held = candidate_ids.isin(set(candidate_ids[result['flags'].to_numpy() != 0]))
+                    accepted = ~held.to_numpy() & result['new'].to_numpy()
+                    screen.accept(candidates[accepted], result[accepted])
+                
+                if held.any():
+                    held_df = candidates[held.to_numpy()].assign(
+                        request_id=candidate_ids[held], flags=result['flags'][held],
+                        amount_zscore=result['amount_zscore'][held]
+                    )
+                    rows = held_df.groupby('request_id', sort=False).agg(
+                        vendor_name=('vendor_name', 'first'),
+                        invoice_amount=('invoice_amount', 'first'),
+                        original_due_date=('original_due_date', 'first'),
+                        flags=('flags', np.bitwise_or.reduce),
+                        amount_zscore=('amount_zscore', 'first')
+                    ).reset_index()
+                    rows['reasons'] = rows['flags'].map(flag_reasons)
+                    added = set(self.quarantine.add(rows))
+                    newly_quarantined = rows[rows['request_id'].isin(added)][QUARANTINE_REPORT_COLUMNS]
+                    self._audit_quarantined(newly_quarantined)
+                    statuses.update(dict.fromkeys(added, 'quarantined'))
+            
+            held_ids = {request_id for request_id, status in statuses.items() if status == 'quarantined'}
+            return requests_df[~request_ids.isin(held_ids)], newly_quarantined
+        except Exception as e:
+            print(f"Error screening ingested requests: {e}")
+            return requests_df, newly_quarantined
+    
+    def _audit_quarantined(self, quarantined_df):
+        """One audit entry per newly quarantined request, in one segment write"""
+        if quarantined_df.empty:
+            return
+        audit_entries = [
+            self._make_audit_entry(
+                action="Request Quarantined",
+                user=INGEST_SCREENING_USER,
+                request_id=request_id,
+                details=f"Held back from review: {reasons}"
+            )
+            for request_id, reasons in zip(quarantined_df['request_id'], quarantined_df['reasons'])
+        ]
+        self.audit_store.append(audit_entries)
+        self._record_change('audit', appended=quarantined_df['request_id'])
+        self.search_index.index_audit_entries(audit_entries)
+    
+    def mask_pending_pii(self, requests_df):
+        """
+        Mask PII in the free text of pending requests before they are queued
+        
+        Requests whose text changed are rewritten in the pending file and
+        re-indexed for search, so the unmasked text is kept nowhere; one
+        audit entry records the counts. Only requests not seen before, or
+        actually masked, are added to the ingest masking totals, so every
+        session re-reading the same pending file does not inflate them.
+        
+        Args:
+            requests_df: Current pending requests
+        
+        Returns:
+            Tuple of (masked requests, mask_frame report)
+        """
+        masked_df, report = mask_frame(requests_df, PII_TEXT_COLUMNS['requests'])
+        changed = np.zeros(len(requests_df), dtype=bool)
+        for column in report['columns']:
+            changed |= (masked_df[column].astype(object).to_numpy()
+                        != requests_df[column].astype(object).to_numpy())
+        request_ids = requests_df['request_id'].astype(str)
+        with DataManager._ingest_screen_lock:
+            scanned = DataManager._ingest_masked.setdefault(os.path.abspath(DATA_DIR), set())
+            new = ~request_ids.isin(scanned).to_numpy()
+            scanned.update(request_ids[new])
+        if new.any() or changed.any():
+            self._masking_log.record_report('ingest', dict(report, rows=int((new | changed).sum())))
+        if not report['rows_with_pii']:
+            return requests_df, report
+        try:
+            rewritten = masked_df['request_id'].astype(str)[changed]
+            self._write_pending(masked_df, previous_df=requests_df, rewritten=rewritten)
+            self.search_index.index_requests(masked_df[changed])
+            found = ", ".join(f"{count} {pii_type}" for pii_type, count in report['matches'].items() if count)
+            self.add_audit_entry(
+                action="PII Masked",
+                user=PII_MASKING_USER,
+                request_id=None,
+                details=f"Masked {found} in {len(rewritten)} pending request(s)"
+            )
+        except Exception as e:
+            print(f"Error masking pending requests: {e}")
+        return masked_df, report
+    
+    def mask_export(self, df, table):
+        """
+        Copy of a frame about to leave the app (downloads) with PII masked
+        
+        Args:
+            df: Frame to export
+            table: 'requests' or 'audit' (selects the text columns to mask)
+        """
+        masked_df, report = mask_frame(df, PII_TEXT_COLUMNS[table])
+        self._masking_log.record_report('export', report)
+        return masked_df
+    
+    def mask_export_text(self, text):
+        """Text about to leave the app (e.g. downloaded emails) with PII masked"""
+        start = time.perf_counter()
+        matches = Counter()
+        text = mask_text(text, matches)
+        self._masking_log.record('export', 1, matches, int(bool(matches)), time.perf_counter() - start)
+        return text
+    
+    def get_masking_totals(self):
+        """PII masking totals per stage since the server started (pii_masking.MASKING_STAGE_COLUMNS)"""
+        return self._masking_log.frame()
+    
+    def get_pii_scan(self):
+        """
+        Look for unmasked PII in the stored pending requests and audit log
+        
+        Nothing is modified: audit segments are hash-chained, so entries
+        written before masking existed stay as they are (exports mask them).
+        Cached until the requests or audit version changes.
+        
+        Returns:
+            Dict with one mask_frame report per table ('requests', 'audit'),
+            'rows_scanned', 'pii_found', 'elapsed_ms', 'rows_per_second',
+            'scanned_at' and 'data_versions'; None if the scan failed
+        """
+        try:
+            versions = self.get_data_versions(['requests', 'audit'])
+            key = (os.path.abspath(DATA_DIR), versions['requests'], versions['audit'])
+            if self._pii_scan_cache[0] == key:
+                return self._pii_scan_cache[1]
+            
+            reports = {
+                'requests': mask_frame(self.load_requests(), PII_TEXT_COLUMNS['requests'])[1],
+                'audit': mask_frame(self.load_audit_log(), PII_TEXT_COLUMNS['audit'])[1]
+            }
+            rows = sum(report['rows'] for report in reports.values())
+            elapsed_ms = sum(report['elapsed_ms'] for report in reports.values())
+            scan = {
+                **reports,
+                'rows_scanned': rows,
+                'pii_found': sum(report['values_masked'] for report in reports.values()),
+                'elapsed_ms': elapsed_ms,
+                'rows_per_second': rows / (elapsed_ms / 1000) if elapsed_ms > 0 else 0.0,
+                'scanned_at': datetime.now(),
+                'data_versions': versions
+            }
+            DataManager._pii_scan_cache = (key, scan)
+            return scan
+        except Exception as e:
+            print(f"Error scanning for PII: {e}")
+            return None
+    
+    def get_quarantined_requests(self):
+        """Requests currently held back by ingest screening, most recent first"""
+        try:
+            return self.quarantine.load()
+        except Exception as e:
+            print(f"Error loading quarantine: {e}")
+            return pd.DataFrame(columns=QUARANTINE_COLUMNS)
+    
+    def release_quarantined(self, request_id, user="Current User"):
+        """
+        Send a quarantined request on to review
+        
+        If the request_id was repeated, only its first pending copy is kept.
+        The request is then ingested like any new request.
+        """
+        try:
+            if not self.quarantine.resolve(request_id, 'released', user):
+                return False
+            requests_df = self.load_requests()
+            copies = requests_df.index[requests_df['request_id'].astype(str) == str(request_id)]
+            if len(copies) > 1:
+                self._write_pending(requests_df.drop(index=copies[1:]), previous_df=requests_df)
+            with DataManager._ingest_screen_lock:
+                self._get_ingest_screen().accept(requests_df.loc[copies[:1]])
+            self.add_audit_entry("Quarantine Released", user, request_id, "Released to review")
+            return True
+        except Exception as e:
+            print(f"Error releasing quarantined request {request_id}: {e}")
+            return False
+    
+    def discard_quarantined(self, request_id, user="Current User"):
+        """Remove a quarantined request from the pending requests without a decision"""
+        try:
+            if not self.quarantine.resolve(request_id, 'discarded', user):
+                return False
+            requests_df = self.load_requests()
+            # Never decided, so nothing is archived
+            self._write_pending(requests_df[requests_df['request_id'].astype(str) != str(request_id)],
+                                previous_df=requests_df)
+            self.review_queue.complete(request_id)
+            self.add_audit_entry("Quarantine Discarded", user, request_id, "Discarded as duplicate or invalid")
+            return True
+        except Exception as e:
+            print(f"Error discarding quarantined request {request_id}: {e}")
+            return False
+    
+    def index_pending_requests(self, requests_df):
+        """Add newly pending requests to the full-text search index"""
+        try:
+            self.search_index.index_requests(requests_df)
+        except Exception as e:
+            print(f"Error indexing requests: {e}")
+    
+    def store_request_features(self, requests_df, ai_engine):
+        """
+        Normalize and persist features of requests the feature store has no
+        current row for (new, edited, or a reused request_id)
+        
+        Returns:
+            Number of requests added
+        """
+        try:
+            if requests_df.empty:
+                return 0
+            stamps = row_stamps(requests_df)
+            missing_ids = set(self.feature_store.missing(requests_df['request_id'], stamps))
+            if not missing_ids:
+                return 0
+            is_missing = requests_df['request_id'].astype(str).isin(missing_ids).to_numpy()
+            new_df = requests_df[is_missing]
+            matrix, fields = ai_engine.feature_rows(new_df)
+            return self.feature_store.append(new_df['request_id'], matrix, fields,
+                                             [stamp for stamp, flag in zip(stamps, is_missing) if flag])
+        except Exception as e:
+            print(f"Error storing request features: {e}")
+            return 0
+    
+    def load_request_features(self, requests_df, ai_engine):
+        """
+        Feature rows (risk component matrix, confidence/amount fields) for requests, in row order
+        
+        Rows are stored first if missing or stale. If the store cannot
+        serve them, they are normalized directly instead.
+        """
+        self.store_request_features(requests_df, ai_engine)
+        try:
+            return self.feature_store.gather(requests_df['request_id'], row_stamps(requests_df))
+        except Exception as e:
+            print(f"Error reading request features, normalizing instead: {e!r}")
+            return ai_engine.feature_rows(requests_df)
+    
+    def load_decisions(self, start=None, end=None):
+        """
+        Load decision history, opening only the partitions in range
+        
+        Args:
+            start: Inclusive lower bound on decision_date (None = unbounded)
+            end: Exclusive upper bound on decision_date (None = unbounded)
+        
+        Returns:
+            DataFrame of decisions within [start, end)
+        """
+        try:
+            start_key = pd.Timestamp(start).strftime(DECISION_PARTITION_FORMAT) if start is not None else None
+            end_key = pd.Timestamp(end).strftime(DECISION_PARTITION_FORMAT) if end is not None else None
+            
+            frames = [
+                pd.read_csv(path, parse_dates=['decision_date'])
+                for month_key, path in self._list_decision_partitions().items()
+                if (start_key is None or month_key >= start_key)
+                and (end_key is None or month_key <= end_key)
+            ]
+            if not frames:
+                return pd.DataFrame(columns=DECISION_COLUMNS)
+            
+            df = pd.concat(frames, ignore_index=True)
+            if start is not None:
+                df = df[df['decision_date'] >= pd.Timestamp(start)]
+            if end is not None:
+                df = df[df['decision_date'] < pd.Timestamp(end)]
+            return df.reset_index(drop=True)
         except Exception as e:
             print(f"Error loading decisions: {e}")
             return pd.DataFrame(columns=DECISION_COLUMNS)
     
+    def read_new_decisions(self, positions=None):
+        """
+        Decisions appended since a previous read, by tailing the partitions
+        
+        Partitions are append-only, so only the bytes past the previous read
+        position are parsed. A trailing partial line (a write in progress) is
+        left for the next call.
+        
+        Args:
+            positions: {month_key: bytes already read} returned by the previous
+                call (None = read the whole history)
+        
+        Returns:
+            Tuple of (DataFrame, positions, is_full). is_full is True when the
+            frame is the whole history - on the first read, or because a
+            partition shrank or disappeared - and replaces what the caller holds.
+        """
+        partitions = self._list_decision_partitions()
+        is_full = (positions is None
+                   or any(key not in partitions or os.path.getsize(partitions[key]) < position
+                          for key, position in positions.items()))
+        if is_full:
+            positions = {}
+        
+        frames = []
+        new_positions = {}
+        for month_key, path in partitions.items():
+            with open(path, 'rb') as f:
+                header = f.readline()
+                start = max(positions.get(month_key, 0), len(header))
+                f.seek(start)
+                tail = f.read()
+            complete = tail[:tail.rfind(b'\n') + 1]
+            if complete:
+                frames.append(pd.read_csv(io.BytesIO(header + complete), parse_dates=['decision_date']))
+            new_positions[month_key] = start + len(complete)
+        
+        if not frames:
+            return pd.DataFrame(columns=DECISION_COLUMNS), new_positions, is_full
+        return pd.concat(frames, ignore_index=True), new_positions, is_full
+    
+    def _decision_partition_stats(self):
+        """Change stamp of every decision partition, taken before appending to them"""
+        stats = {}
+        for month_key, path in self._list_decision_partitions().items():
+            try:
+                stats[month_key] = partition_stat(path)
+            except FileNotFoundError:
+                continue
+        return stats
+    
     def add_decision(self, decision_data):
-        """Append a new decision to the decisions CSV"""
+        """Append a new decision to its monthly partition"""
         try:
-            df = self.load_decisions()
-            new_row = pd.DataFrame([decision_data])
-            df = pd.concat([df, new_row], ignore_index=True)
-            df.to_csv(DECISIONS_CSV, index=False)
+            path = self._decision_partition_path(decision_data['decision_date'])
+            new_row = pd.DataFrame([decision_data], columns=DECISION_COLUMNS)
+            previous_stats = self._decision_partition_stats()
+            new_row.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+            self._record_change('decisions', appended=new_row['request_id'])
+            partitions = self._list_decision_partitions()
+            self.decision_metrics.record(new_row, partitions, previous_stats)
+            self.vendor_profiles.record(new_row, partitions, previous_stats)
+            self._record_decided_ids(new_row['request_id'])
             return True
         except Exception as e:
             print(f"Error adding decision: {e}")
             return False
     
-    def load_audit_log(self):
-        """Load audit log from CSV"""
+    def get_model_metrics(self, start=None):
+        """
+        Engine performance against final decisions since start
+        
+        Served from incrementally maintained daily aggregates, so the cost
+        does not grow with the size of the history.
+        """
         try:
-            df = pd.read_csv(AUDIT_LOG_CSV, parse_dates=['timestamp'])
-            return df
-        except FileNotFoundError:
-            return pd.DataFrame(columns=AUDIT_LOG_COLUMNS)
+            self.decision_metrics.sync(self._list_decision_partitions())
+            return self.decision_metrics.summary(start)
+        except Exception as e:
+            print(f"Error computing model metrics: {e}")
+            return DecisionMetrics().summary()
+    
+    def _requested_extension_days(self, request_ids):
+        """
+        Requested extension days of decided requests, joined on request_id
+        
+        A decision is written while its request is still pending, and the
+        request is archived right after, so pending requests are looked up
+        first and the request archive is read only for the rest.
+        
+        Returns:
+            Array of days aligned with request_ids, NaN where not found
+        """
+        request_ids = pd.Index(pd.Series(request_ids).astype(str))
+        days = pd.Series(np.nan, index=request_ids)
+        for load in (self.load_requests, self.load_request_archive):
+            missing = days.isna().to_numpy()
+            if not missing.any():
+                break
+            df = load()
+            found = pd.Series(pd.to_numeric(df['requested_extension_days'], errors='coerce').to_numpy(),
+                              index=df['request_id'].astype(str))
+            found = found[~found.index.duplicated(keep='last')]
+            days[missing] = found.reindex(request_ids[missing]).to_numpy()
+        return days.to_numpy()
+    
+    def sync_vendor_profiles(self):
+        """
+        Bring the vendor risk profiles up to date with the decision history
+        
+        Only partitions changed since the last sync are re-read; decisions
+        written through this manager are already folded in. Lookups on
+        self.vendor_profiles are in-memory afterwards.
+        """
+        try:
+            self.vendor_profiles.sync(self._list_decision_partitions())
+        except Exception as e:
+            print(f"Error syncing vendor profiles: {e}")
+        return self.vendor_profiles
+    
+    def _migrate_legacy_audit_log(self):
+        """Move a single-file audit_log.csv into the segmented audit store"""
+        try:
+            df = pd.read_csv(AUDIT_LOG_CSV)
+            self.audit_store.append(df)
+            self._record_change('audit', appended=df['request_id'])
+            os.replace(AUDIT_LOG_CSV, f"{AUDIT_LOG_CSV}.migrated")
+            print(f"✅ Migrated {len(df)} audit entries into segmented storage")
+        except Exception as e:
+            print(f"Error migrating legacy audit log: {e}")
+    
+    def load_audit_log(self, start=None, end=None, actions=None, users=None):
+        """
+        Load audit log entries, skipping segments that cannot match
+        
+        Args:
+            start: Inclusive lower bound on timestamp (None = unbounded)
+            end: Exclusive upper bound on timestamp (None = unbounded)
+            actions: Actions to keep (None = all)
+            users: Users to keep (None = all)
+        
+        Returns:
+            DataFrame of matching entries, most recent first
+        """
+        try:
+            return self.audit_store.load(start=start, end=end, actions=actions, users=users)
         except Exception as e:
             print(f"Error loading audit log: {e}")
             return pd.DataFrame(columns=AUDIT_LOG_COLUMNS)
     
+    def get_audit_filter_options(self):
+        """Distinct actions and users available for audit log filters"""
+        return self.audit_store.known_values()
+    
+    def verify_audit_chain(self):
+        """Check the hash chain across archived audit segments"""
+        try:
+            return self.audit_store.verify_chain()
+        except Exception as e:
+            print(f"Error verifying audit chain: {e}")
+            return False, None
+    
+    def _make_audit_entry(self, action, user, request_id, details, ip_address="127.0.0.1"):
+        """Build an audit log row stamped with the current time (PII in details is masked)"""
+        start = time.perf_counter()
+        matches = Counter()
+        details = mask_text(details, matches)
+        self._masking_log.record('audit', 1, matches, int(bool(matches)), time.perf_counter() - start)
+        return {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'action': action,
+            'user': user,
+            'request_id': request_id,
+            'details': details,
+            'ip_address': ip_address
+        }
+    
     def add_audit_entry(self, action, user, request_id, details, ip_address="127.0.0.1"):
         """Add an entry to the audit log"""
         try:
-            df = self.load_audit_log()
-            new_entry = {
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'action': action,
-                'user': user,
-                'request_id': request_id,
-                'details': details,
-                'ip_address': ip_address
-            }
-            new_row = pd.DataFrame([new_entry])
-            df = pd.concat([df, new_row], ignore_index=True)
-            df.to_csv(AUDIT_LOG_CSV, index=False)
+            new_entry = self._make_audit_entry(action, user, request_id, details, ip_address)
+            self.audit_store.append([new_entry])
+            self._record_change('audit', appended=[request_id])
+            self.search_index.index_audit_entries([new_entry])
             return True
         except Exception as e:
             print(f"Error adding audit entry: {e}")
             return False
     
+    def commit_decisions_batch(self, decisions, user="Current User", details_prefix="Bulk review"):
+        """
+        Record many decisions with one write per table
+        
+        Decisions are appended to their partitions, audit entries are appended
+        as one segment write, and the pending file is rewritten once. The
+        pending file is written last, so a failure part-way leaves requests
+        pending (and re-reviewable) rather than silently dropped.
+        
+        Args:
+            decisions: List of decision dicts with DECISION_COLUMNS keys
+            user: User recorded in the audit log
+            details_prefix: Label prepended to each audit entry's details
+        
+        Returns:
+            True if all writes succeeded
+        """
+        if not decisions:
+            return True
+        try:
+            decisions_df = pd.DataFrame(decisions, columns=DECISION_COLUMNS)
+            previous_stats = self._decision_partition_stats()
+            self._write_decision_partitions(decisions_df)
+            partitions = self._list_decision_partitions()
+            self.decision_metrics.record(decisions_df, partitions, previous_stats)
+            self.vendor_profiles.record(decisions_df, partitions, previous_stats)
+            self._record_decided_ids(decisions_df['request_id'])
+            
+            audit_entries = [
+                self._make_audit_entry(
+                    action=f"Decision: {decision['final_decision']}",
+                    user=user,
+                    request_id=decision['request_id'],
+                    details=f"{details_prefix}: email sent to vendor, request {decision['final_decision'].lower()}"
+                )
+                for decision in decisions
+            ]
+            self.audit_store.append(audit_entries)
+            self._record_change('audit', appended=decisions_df['request_id'])
+            self.search_index.index_audit_entries(audit_entries)
+            
+            decided_ids = set(decisions_df['request_id'])
+            requests_df = self.load_requests()
+            self._archive_requests(requests_df[requests_df['request_id'].isin(decided_ids)])
+            self._write_pending(requests_df[~requests_df['request_id'].isin(decided_ids)], previous_df=requests_df)
+            self.review_queue.complete_batch(decided_ids)
+            return True
+        except Exception as e:
+            print(f"Error committing bulk decisions: {e}")
+            return False
+    
+    def claim_requests_batch(self, request_ids, reviewer):
+        """Lease several requests at once; returns the ids actually claimed"""
+        try:
+            return self.review_queue.claim_batch(request_ids, reviewer)
+        except Exception as e:
+            print(f"Error claiming requests: {e}")
+            return []
+    
+    def search(self, text, sources=None):
+        """
+        Full-text search over request reasons, vendor names and audit details
+        
+        Returns:
+            Tuple of (results DataFrame, query time in milliseconds)
+        """
+        try:
+            return self.search_index.search(text, sources=sources)
+        except Exception as e:
+            print(f"Error searching: {e}")
+            return pd.DataFrame(), 0.0
+    
     def get_today_processed(self):
         """Get decisions processed today"""
         try:
-            df = self.load_decisions()
-            if df.empty:
-                return df
-            today = datetime.now().date()
-            df['decision_date'] = pd.to_datetime(df['decision_date'])
-            df_today = df[df['decision_date'].dt.date == today]
-            return df_today
+            today_start = datetime.combine(datetime.now().date(), datetime.min.time())
+            return self.load_decisions(start=today_start)
         except Exception as e:
             print(f"Error getting today's processed: {e}")
             return pd.DataFrame(columns=DECISION_COLUMNS)
     
     def get_statistics(self):
-        """Calculate aggregate statistics"""
+        """
+        Calculate aggregate statistics
+        
+        Cached until the requests or decisions version (or the day) changes,
+        so reruns - and new sessions - that changed nothing do not re-read
+        the history.
+        """
         try:
+            key = (os.path.abspath(DATA_DIR), self.get_data_version('requests'),
+                   self.get_data_version('decisions'), datetime.now().date())
+            if self._statistics_cache[0] == key:
+                return dict(self._statistics_cache[1])
+            
             requests_df = self.load_requests()
             decisions_df = self.load_decisions()
             today_df = self.get_today_processed()
@@ -153,13 +1058,81 @@ class DataManager:
                 'avg_amount': requests_df['invoice_amount'].mean() if not requests_df.empty else 0,
                 'high_priority_count': len(requests_df[requests_df['priority'] == 'High']) if not requests_df.empty else 0,
                 'total_pending_value': requests_df['invoice_amount'].sum() if not requests_df.empty else 0,
-                'approval_rate': (len(decisions_df[decisions_df['final_decision'] == 'Approved']) / len(decisions_df) * 100) if len(decisions_df) > 0 else 0
+                'approval_rate': (len(decisions_df[decisions_df['final_decision'] == 'Approved']) / len(decisions_df) * 100) if len(decisions_df) > 0 else 0,
+                'auto_handled_rate': (len(decisions_df[decisions_df['human_review'].astype(str) == 'False']) / len(decisions_df) * 100) if len(decisions_df) > 0 else 0
             }
-            return stats
+            DataManager._statistics_cache = (key, stats)
+            return dict(stats)
         except Exception as e:
             print(f"Error calculating statistics: {e}")
             return {}
     
+    def get_data_profile(self):
+        """
+        Data-quality profile of the pending requests and the decision history
+        
+        Runs the data_profiling rules; cached until the requests or decisions
+        version changes, so its elapsed_ms is the time of the run that
+        produced it.
+        """
+        try:
+            versions = self.get_data_versions(['requests', 'decisions'])
+            key = (os.path.abspath(DATA_DIR), versions['requests'], versions['decisions'])
+            if self._profile_cache[0] == key:
+                return self._profile_cache[1]
+            
+            profile = profile_tables(self.load_requests(), self.load_decisions())
+            profile['data_versions'] = versions
+            DataManager._profile_cache = (key, profile)
+            return profile
+        except Exception as e:
+            print(f"Error profiling data: {e}")
+            return None
+    
+    def get_risk_audit(self, ai_engine):
+        """
+        Risk-classification audit of the decision history (see risk_audit.audit_history)
+        
+        Every archived, decided request is re-scored with the engine's current
+        settings. The report is saved to RISK_AUDIT_FILE under a key made of
+        the decisions and archive versions and the engine's configuration, so
+        it is recomputed only when the history or the configuration changes,
+        and survives restarts.
+        
+        Args:
+            ai_engine: AIDecisionEngine whose settings are audited
+        
+        Returns:
+            Report dict with its 'key' and 'data_versions', or None if the
+            audit failed
+        """
+        try:
+            versions = self.get_data_versions(['decisions', 'archive'])
+            key = {'decisions': versions['decisions'], 'archive': versions['archive'],
+                   'config': config_fingerprint(ai_engine)}
+            cache_key = (os.path.abspath(DATA_DIR), tuple(key.values()))
+            if self._risk_audit_cache[0] == cache_key:
+                return self._risk_audit_cache[1]
+            
+            report = load_report(RISK_AUDIT_FILE, key)
+            if report is None:
+                decisions = self.load_decisions()[['request_id', 'ai_decision', 'final_decision']]
+                decisions = decisions.drop_duplicates('request_id', keep='last')
+                archive = self.load_request_archive().drop_duplicates('request_id', keep='last')
+                history = archive.merge(decisions, on='request_id', how='inner')
+                report = audit_history(history, ai_engine, decisions_total=len(decisions))
+                report['key'] = key
+                report['data_versions'] = versions
+                save_report(RISK_AUDIT_FILE, report)
+            else:
+                # Thresholds are not part of the key; judge saved results by the current ones
+                report['status'] = audit_status(report)
+            DataManager._risk_audit_cache = (cache_key, report)
+            return report
+        except Exception as e:
+            print(f"Error auditing risk classification: {e}")
+            return None
+    
     def _generate_sample_requests(self):
         """Generate 30 sample pending requests"""
         np.random.seed(42)
@@ -268,9 +1241,34 @@ class DataManager:
             })
         
         df = pd.DataFrame(decisions)
-        df.to_csv(DECISIONS_CSV, index=False)
+        self._write_decision_partitions(df)
+        self._generate_sample_archive(df)
         print(f"✅ Generated {len(decisions)} sample decisions")
     
+    def _generate_sample_archive(self, decisions_df):
+        """Archive plausible request features for the sample decisions"""
+        rng = np.random.default_rng(45)
+        approved = (decisions_df['ai_decision'] == 'Approved').to_numpy()
+        n = len(decisions_df)
+        
+        archive_df = pd.DataFrame({
+            'request_id': decisions_df['request_id'],
+            'vendor_name': decisions_df['vendor_name'],
+            'invoice_amount': decisions_df['invoice_amount'],
+            'original_due_date': (pd.to_datetime(decisions_df['decision_date'])
+                                  + pd.to_timedelta(rng.integers(2, 60, n), unit='D')).dt.strftime('%Y-%m-%d'),
+            'requested_extension_days': rng.choice([7, 14, 21, 30], n),
+            'reason': "Cash flow constraints due to delayed client payments",
+            'priority': rng.choice(['High', 'Medium', 'Low'], n, p=[0.25, 0.45, 0.30]),
+            'vendor_reliability_score': np.where(approved, rng.uniform(0.80, 0.97, n),
+                                                 rng.uniform(0.45, 0.70, n)).round(2),
+            'payment_history_score': np.where(approved, rng.uniform(0.80, 0.96, n),
+                                              rng.uniform(0.50, 0.72, n)).round(2),
+            'cash_flow_impact': rng.choice(['Low', 'Medium', 'High'], n, p=[0.30, 0.45, 0.25]),
+            'submission_date': pd.to_datetime(decisions_df['decision_date']).dt.strftime('%Y-%m-%d')
+        })
+        self._archive_requests(archive_df, archived_at=decisions_df['decision_date'].to_numpy())
+    
     def _generate_sample_audit_log(self):
         """Generate sample audit log entries"""
         np.random.seed(44)
@@ -312,7 +1310,6 @@ class DataManager:
             })
         
         df = pd.DataFrame(logs)
-        df = df.sort_values('timestamp', ascending=False)
-        df.to_csv(AUDIT_LOG_CSV, index=False)
+        self.audit_store.append(df)
         print(f"✅ Generated {len(logs)} audit log entries")
 
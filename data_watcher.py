@@ -0,0 +1,152 @@
+"""
+Data Directory Watcher for Invoice Payment Manager
+Notices writes made by other sessions and jobs, and tells open sessions to refresh
+"""
+
+import os
+import threading
+from config import DATA_DIR, FEATURE_STORE_DIR, DATA_WATCH_DEBOUNCE_SECONDS, DATA_WATCH_POLL_SECONDS
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # No watchdog: poll the table versions instead
+    FileSystemEventHandler, Observer = object, None
+
+
+# File events that never move a table version (indexes, queues, derived stores)
+IGNORED_SUFFIXES = ('.db', '.db-journal', '.db-wal', '.db-shm', '.tmp', '.lock')
+IGNORED_DIRS = {os.path.basename(FEATURE_STORE_DIR)}
+
+
+class _DataDirHandler(FileSystemEventHandler):
+    """Forwards file events to the watcher"""
+
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+
+class DataWatcher:
+    """
+    Background thread tracking DataManager table versions
+
+    With watchdog installed the data directory is watched through inotify
+    (or the platform's equivalent) and versions are re-read only after a
+    write, once a burst of events has settled. Without it, or when the
+    watch cannot be set up, versions are polled every
+    DATA_WATCH_POLL_SECONDS. A check costs a few stats and one SQLite read;
+    sessions only compare version dicts in memory.
+
+    Sessions register the versions their data reflects; when the data moves
+    past them, the on_stale callback is invoked so the session can be told
+    to refresh.
+    """
+
+    def __init__(self, version_reader, directory=DATA_DIR,
+                 debounce=DATA_WATCH_DEBOUNCE_SECONDS, poll_interval=DATA_WATCH_POLL_SECONDS):
+        """
+        Args:
+            version_reader: Callable returning {table: version} (DataManager.get_data_versions)
+            directory: Directory to watch
+            debounce: Seconds to wait after a file event before re-reading versions
+            poll_interval: Seconds between version reads when polling
+        """
+        self.version_reader = version_reader
+        self.directory = directory
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.versions = version_reader()
+        self.mode = None
+        self._sessions = {}  # session_id -> versions the session's data reflects
+        self._on_stale = None
+        self._observer = None
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self, on_stale=None):
+        """
+        Start watching in daemon threads
+
+        Args:
+            on_stale: Callable(session_id) run on the watcher thread for each
+                registered session the data has moved past; returning False
+                unregisters the session (e.g. it has disconnected)
+        """
+        self._on_stale = on_stale
+        if Observer is not None:
+            try:
+                observer = Observer()
+                observer.schedule(_DataDirHandler(self), self.directory, recursive=True)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+            except OSError as e:
+                # e.g. the inotify watch limit is exhausted
+                print(f"File watching unavailable, polling for changes instead: {e}")
+        self.mode = 'file events' if self._observer is not None else 'polling'
+        threading.Thread(target=self._run, name='data-watcher', daemon=True).start()
+
+    def stop(self):
+        """Stop the watcher threads"""
+        self._stop.set()
+        self._dirty.set()
+        if self._observer is not None:
+            self._observer.stop()
+
+    def notify(self, path):
+        """Note a changed file (called from the observer thread)"""
+        relative = os.path.relpath(path, self.directory)
+        if relative.split(os.sep)[0] in IGNORED_DIRS or path.endswith(IGNORED_SUFFIXES):
+            return
+        self._dirty.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._observer is not None:
+                if not self._dirty.wait(timeout=1.0):
+                    continue
+                self._stop.wait(self.debounce)
+                self._dirty.clear()
+            elif self._stop.wait(self.poll_interval):
+                break
+            self.check()
+
+    def check(self):
+        """
+        Re-read the table versions and notify sessions that fell behind
+
+        Returns:
+            True if any version changed since the last check
+        """
+        try:
+            versions = self.version_reader()
+        except Exception as e:
+            print(f"Error reading data versions: {e}")
+            return False
+
+        with self._lock:
+            changed = versions != self.versions
+            self.versions = versions
+            stale = [session_id for session_id, seen in self._sessions.items() if seen != versions]
+
+        if changed and self._on_stale is not None:
+            for session_id in stale:
+                if self._on_stale(session_id) is False:
+                    self.unregister(session_id)
+        return changed
+
+    def register(self, session_id, versions):
+        """Record the versions a session's data reflects (call on every rerun)"""
+        with self._lock:
+            self._sessions[session_id] = dict(versions)
+
+    def unregister(self, session_id):
+        """Stop notifying a session"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
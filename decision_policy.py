@@ -0,0 +1,214 @@
+"""
+Declarative Decision Policy for Invoice Payment Manager
+Compiles ordered JSON rules once into per-row and vectorized evaluators
+"""
+
+import json
+import os
+import numpy as np
+from config import DECISION_POLICY_FILE, DECISION_RULES
+
+
+OPERATORS = ['<', '<=', '>', '>=', '==', '!=', 'in', 'not_in']
+
+VECTOR_OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+    'in': lambda values, options: np.isin(values, list(options)),
+    'not_in': lambda values, options: ~np.isin(values, list(options)),
+}
+
+# Features a policy may reference; engine results and request fields map onto these
+POLICY_FIELDS = [
+    'confidence', 'risk', 'amount', 'extension_days',
+    'vendor_reliability', 'payment_history', 'cash_flow', 'priority'
+]
+
+
+class PolicyError(ValueError):
+    """Raised when a policy file is malformed"""
+
+
+class CompiledPolicy:
+    """Ordered rule list compiled to a Python if-chain (per-row) and ufuncs (batch)"""
+
+    def __init__(self, spec, params):
+        """
+        Args:
+            spec: Parsed policy dict (see decision_policy.json)
+            params: Threshold values used to resolve "$name" references
+        """
+        self.spec = spec
+        self.name = spec.get('name', 'policy')
+        self.default = spec['default']
+        self.params = dict(params)
+        self.parameters = []  # DECISION_RULES keys referenced by the policy, in order of use
+        self.fields = set()   # POLICY_FIELDS referenced by the policy
+        self.rules = [self._compile_rule(rule) for rule in spec['rules']]
+        self.decisions = np.array([rule['decision'] for rule in self.rules] + [self.default], dtype=object)
+        # The per-row function is generated on first use; batch-only policies
+        # (what-if runs, optimizer candidates) never pay for it
+        self._decide = self._compile_and_decide
+
+    def _resolve(self, value):
+        if isinstance(value, str) and value.startswith('$'):
+            key = value[1:]
+            if key not in self.params:
+                raise PolicyError(f"Unknown policy parameter: {value}")
+            if key not in self.parameters:
+                self.parameters.append(key)
+            return self.params[key]
+        if isinstance(value, list):
+            return frozenset(value)
+        return value
+
+    def _compile_condition(self, condition):
+        field, op = condition['field'], condition['op']
+        if field not in POLICY_FIELDS:
+            raise PolicyError(f"Unknown policy field: {field}")
+        if op not in OPERATORS:
+            raise PolicyError(f"Unknown policy operator: {op}")
+        self.fields.add(field)
+        return field, op, self._resolve(condition['value'])
+
+    def _compile_rule(self, rule):
+        if 'decision' not in rule or not (rule.get('all') or rule.get('any')):
+            raise PolicyError(f"Rule needs a decision and at least one condition: {rule}")
+        return {
+            'name': rule.get('name', rule['decision']),
+            'decision': rule['decision'],
+            'all': [self._compile_condition(c) for c in rule.get('all', [])],
+            'any': [self._compile_condition(c) for c in rule.get('any', [])],
+        }
+
+    def _generate_function(self):
+        """
+        Compile the rules into a plain Python if-chain
+
+        Field names are validated against POLICY_FIELDS and values are
+        embedded via repr(), so the generated source only contains
+        comparisons between known variables and literals.
+        """
+        def expression(field, op, value):
+            if op in ('in', 'not_in'):
+                return f"{field} {'in' if op == 'in' else 'not in'} {set(value)!r}"
+            return f"{field} {op} {value!r}"
+
+        lines = [f"def decide({', '.join(f'{field}=None' for field in POLICY_FIELDS)}):"]
+        for rule in self.rules:
+            parts = []
+            if rule['any']:
+                parts.append('(' + ' or '.join(expression(*c) for c in rule['any']) + ')')
+            parts.extend(expression(*c) for c in rule['all'])
+            lines.append(f"    if {' and '.join(parts)}:")
+            lines.append(f"        return {rule['decision']!r}")
+        lines.append(f"    return {self.default!r}")
+
+        namespace = {}
+        exec(compile("\n".join(lines), f"<policy {self.name}>", 'exec'), namespace)
+        return namespace['decide']
+
+    def _compile_and_decide(self, *args, **kwargs):
+        self._decide = self._generate_function()
+        return self._decide(*args, **kwargs)
+
+    def evaluate(self, features):
+        """
+        Evaluate one request
+
+        Args:
+            features: Dict keyed by POLICY_FIELDS (only referenced fields needed)
+
+        Returns:
+            Decision string of the first matching rule, else the default
+        """
+        return self._decide(**features)
+
+    def decide(self, confidence, risk, amount, **request_fields):
+        """Positional fast path of evaluate() for per-row scoring"""
+        return self._decide(confidence, risk, amount, **request_fields)
+
+    def with_params(self, params):
+        """Recompile the same rules against different threshold values"""
+        return CompiledPolicy(self.spec, params)
+
+    def evaluate_batch(self, features):
+        """
+        Evaluate many requests at once
+
+        Args:
+            features: Mapping (dict of arrays or DataFrame) keyed by POLICY_FIELDS
+
+        Returns:
+            NumPy array of decision strings
+        """
+        return self.decisions[self.evaluate_codes(features)]
+
+    def evaluate_codes(self, features):
+        """
+        Index of the first matching rule for each request
+
+        Returns:
+            Integer array; len(self.rules) means the default applied.
+            self.decisions maps codes to decision strings.
+        """
+        columns = {}
+
+        def column(field):
+            if field not in columns:
+                columns[field] = np.asarray(features[field])
+            return columns[field]
+
+        conditions = []
+        for rule in self.rules:
+            mask = None
+            if rule['any']:
+                mask = np.logical_or.reduce([VECTOR_OPERATORS[op](column(field), value)
+                                             for field, op, value in rule['any']])
+            for field, op, value in rule['all']:
+                result = VECTOR_OPERATORS[op](column(field), value)
+                mask = result if mask is None else mask & result
+            conditions.append(mask)
+
+        if not conditions:
+            return np.full(len(next(iter(features.values()))), len(self.rules))
+        return np.select(conditions, list(range(len(conditions))), default=len(self.rules))
+
+    def describe(self):
+        """Human-readable listing of the compiled rules"""
+        lines = [f"# Policy: {self.name} (first matching rule wins)"]
+        for index, rule in enumerate(self.rules, start=1):
+            parts = []
+            if rule['any']:
+                parts.append('(' + ' or '.join(f"{f} {op} {v}" for f, op, v in rule['any']) + ')')
+            parts.extend(f"{f} {op} {v}" for f, op, v in rule['all'])
+            lines.append(f"{index}. if {' and '.join(parts)}: return '{rule['decision']}'  # {rule['name']}")
+        lines.append(f"{len(self.rules) + 1}. otherwise: return '{self.default}'")
+        return "\n".join(lines)
+
+
+def policy_path(path=DECISION_POLICY_FILE):
+    """Resolve a policy file relative to the application directory"""
+    if os.path.isabs(path) or os.path.exists(path):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+def load_policy(path=DECISION_POLICY_FILE, params=None):
+    """
+    Load and compile a decision policy
+
+    Args:
+        path: JSON policy file
+        params: Threshold overrides (defaults to DECISION_RULES)
+
+    Returns:
+        CompiledPolicy
+    """
+    with open(policy_path(path), 'r') as f:
+        spec = json.load(f)
+    return CompiledPolicy(spec, params if params is not None else DECISION_RULES)
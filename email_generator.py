@@ -4,11 +4,12 @@ Creates formatted emails for vendor communication
 """
 
 from datetime import datetime, timedelta
+from pii_masking import mask_text
 
 
 def format_original_email(request):
     """
-    Format the original vendor request email
+    Format the original vendor request email (sender address and reason masked)
     
     Args:
         request: Dictionary containing request information
@@ -21,14 +22,15 @@ def format_original_email(request):
     amount = float(request.get('invoice_amount', 0))
     due_date = request.get('original_due_date', 'N/A')
     extension_days = request.get('requested_extension_days', 0)
-    reason = request.get('reason', 'No reason provided')
+    reason = mask_text(request.get('reason', 'No reason provided'))
     submission_date = request.get('submission_date', datetime.now().strftime('%Y-%m-%d'))
+    sender = mask_text(f"vendor@{vendor_name.lower().replace(' ', '')}.com")
     
     email = f"""━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 ORIGINAL REQUEST FROM VENDOR
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-From: {vendor_name} <vendor@{vendor_name.lower().replace(' ', '')}.com>
+From: {vendor_name} <{sender}>
 To: accounts@company.com
 Date: {submission_date}
 Subject: Payment Extension Request - Invoice #{request_id}
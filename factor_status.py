@@ -0,0 +1,184 @@
+"""
+Factor Status Classification for Invoice Payment Manager
+Color-coded status of each decision factor, for one request or the whole queue
+"""
+
+from bisect import bisect_left, bisect_right
+import numpy as np
+import pandas as pd
+from config import RISK_THRESHOLDS
+
+
+# Status colors by level: 0 = favorable, 2 = risky
+STATUS_COLORS = ['green', 'yellow', 'red']
+STATUS_EMOJI = {'green': '🟢', 'yellow': '🟡', 'red': '🔴'}
+
+# Factor key (as in FEATURE_WEIGHTS) -> how its request column maps to a level.
+# Numeric factors are binned with np.digitize (bisect for a single value):
+# 'right' makes a value equal to an edge fall in the lower bin, and
+# higher-is-better factors count down from red. Categorical factors map
+# values to levels; anything else is red.
+FACTOR_STATUS_RULES = {
+    'amount': {
+        'name': 'Invoice Amount',
+        'short_name': 'Amount',
+        'column': 'invoice_amount',
+        'edges': [RISK_THRESHOLDS['amount']['low'], RISK_THRESHOLDS['amount']['high']],
+        'right': False,
+        'higher_is_better': False,
+        'labels': ['LOW RISK', 'MEDIUM', 'HIGH RISK']
+    },
+    'extension': {
+        'name': 'Extension Period',
+        'short_name': 'Extension',
+        'column': 'requested_extension_days',
+        'edges': [RISK_THRESHOLDS['extension_days']['low'], RISK_THRESHOLDS['extension_days']['high']],
+        'right': True,
+        'higher_is_better': False,
+        'labels': ['SHORT', 'MODERATE', 'LONG PERIOD']
+    },
+    'vendor': {
+        'name': 'Vendor Reliability',
+        'short_name': 'Vendor',
+        'column': 'vendor_reliability_score',
+        'edges': [RISK_THRESHOLDS['vendor_reliability']['good'], RISK_THRESHOLDS['vendor_reliability']['excellent']],
+        'right': True,
+        'higher_is_better': True,
+        'labels': ['EXCELLENT', 'GOOD', 'CONCERNING']
+    },
+    'payment': {
+        'name': 'Payment History',
+        'short_name': 'Payment',
+        'column': 'payment_history_score',
+        'edges': [RISK_THRESHOLDS['payment_history']['good'], RISK_THRESHOLDS['payment_history']['excellent']],
+        'right': True,
+        'higher_is_better': True,
+        'labels': ['EXCELLENT', 'GOOD', 'NEEDS REVIEW']
+    },
+    'cash_flow': {
+        'name': 'Cash Flow Impact',
+        'short_name': 'Cash Flow',
+        'column': 'cash_flow_impact',
+        'levels': {'Low': 0, 'Medium': 1},
+        'labels': ['LOW IMPACT', 'MEDIUM IMPACT', 'HIGH IMPACT']
+    },
+    'priority': {
+        'name': 'Priority Level',
+        'short_name': 'Priority',
+        'column': 'priority',
+        'levels': {'Low': 0, 'Medium': 1},
+        'labels': ['LOW', 'MEDIUM', 'HIGH']
+    }
+}
+
+FACTOR_KEYS_BY_NAME = {rule['name']: key for key, rule in FACTOR_STATUS_RULES.items()}
+
+
+def factor_levels(key, values):
+    """
+    Status level (0 green, 1 yellow, 2 red) of a factor for many values
+
+    Args:
+        key: Factor key in FACTOR_STATUS_RULES
+        values: Array-like or Series of the factor's column
+
+    Returns:
+        int8 array of levels; missing or unreadable values are red
+    """
+    rule = FACTOR_STATUS_RULES[key]
+    if 'levels' in rule:
+        values = pd.Series(values, copy=False)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Map the few categories, then gather by code (code -1, missing, takes the last entry)
+            category_levels = [rule['levels'].get(category, 2) for category in values.cat.categories]
+            return np.array(category_levels + [2], dtype=np.int8)[values.cat.codes.to_numpy()]
+        return values.map(rule['levels']).fillna(2).to_numpy(dtype=np.int8)
+
+    values = pd.to_numeric(pd.Series(values, copy=False), errors='coerce').to_numpy(dtype=float)
+    bins = np.digitize(values, rule['edges'], right=rule['right'])
+    if rule['higher_is_better']:
+        bins = 2 - bins
+    bins[np.isnan(values)] = 2
+    return bins.astype(np.int8)
+
+
+def classify_factors(requests_df):
+    """
+    Status of every factor for every request, in one vectorized pass
+
+    Args:
+        requests_df: DataFrame with the factor columns (e.g. the pending queue)
+
+    Returns:
+        DataFrame on the same index with, per factor key, '<key>_level' (int8),
+        '<key>_status' (color) and '<key>_label' (status text) columns; the
+        last two are categoricals built from the level codes, so no
+        per-row strings are created
+    """
+    columns = {}
+    for key, rule in FACTOR_STATUS_RULES.items():
+        levels = factor_levels(key, requests_df[rule['column']])
+        columns[f'{key}_level'] = levels
+        columns[f'{key}_status'] = pd.Categorical.from_codes(levels, STATUS_COLORS)
+        columns[f'{key}_label'] = pd.Categorical.from_codes(levels, rule['labels'])
+    return pd.DataFrame(columns, index=requests_df.index)
+
+
+def factor_badges(status_df, key):
+    """Emoji badge ("🔴 HIGH RISK") of one factor for each classified request"""
+    labels = FACTOR_STATUS_RULES[key]['labels']
+    badges = [f"{STATUS_EMOJI[color]} {label}" for color, label in zip(STATUS_COLORS, labels)]
+    return pd.Categorical.from_codes(status_df[f'{key}_level'], badges)
+
+
+def red_flag_counts(status_df):
+    """Number of factors in red per classified request"""
+    levels = status_df[[f'{key}_level' for key in FACTOR_STATUS_RULES]].to_numpy()
+    return (levels == 2).sum(axis=1)
+
+
+def status_counts(status_df):
+    """
+    Queue-wide count of requests per factor and status
+
+    Returns:
+        DataFrame with one row per factor name and a column per status color
+    """
+    return pd.DataFrame(
+        [np.bincount(status_df[f'{key}_level'], minlength=len(STATUS_COLORS)) for key in FACTOR_STATUS_RULES],
+        index=[rule['name'] for rule in FACTOR_STATUS_RULES.values()],
+        columns=STATUS_COLORS
+    )
+
+
+def get_factor_status(factor_name, value):
+    """
+    Determine color status for a single factor value
+
+    Args:
+        factor_name: Factor display name (e.g. "Invoice Amount")
+        value: Raw factor value
+
+    Returns:
+        Tuple of (color, status text); unknown factors are ('yellow', 'MODERATE')
+    """
+    key = FACTOR_KEYS_BY_NAME.get(factor_name)
+    if key is None:
+        return 'yellow', 'MODERATE'
+    rule = FACTOR_STATUS_RULES[key]
+    level = _scalar_level(rule, value)
+    return STATUS_COLORS[level], rule['labels'][level]
+
+
+def _scalar_level(rule, value):
+    """factor_levels for one value, without building arrays"""
+    if 'levels' in rule:
+        return rule['levels'].get(value, 2)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 2
+    if np.isnan(value):
+        return 2
+    level = (bisect_left if rule['right'] else bisect_right)(rule['edges'], value)
+    return 2 - level if rule['higher_is_better'] else level
@@ -0,0 +1,220 @@
+"""
+Feature Store for Invoice Payment Manager
+Persisted, memory-mapped float32 matrix of normalized request features
+"""
+
+import json
+import os
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from config import FEATURE_STORE_DIR, FEATURE_WEIGHTS, CASH_FLOW_RISK, PRIORITY_RISK
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+
+# Bump when AIDecisionEngine.normalize_batch changes in a way config cannot express
+FEATURE_STORE_VERSION = 2
+
+FEATURE_COLUMNS = list(FEATURE_WEIGHTS)   # Risk components, in weight order
+FIELD_COLUMNS = ['confidence', 'amount']  # Policy inputs that do not depend on the weights
+DTYPE = np.dtype('<f4')
+
+# Request columns the stored features are computed from; a row is stale once they change
+STAMP_COLUMNS = ['invoice_amount', 'requested_extension_days', 'vendor_reliability_score',
+                 'payment_history_score', 'cash_flow_impact', 'priority']
+NUMERIC_STAMP_COLUMNS = {'invoice_amount', 'requested_extension_days', 'vendor_reliability_score',
+                         'payment_history_score'}
+
+
+def row_stamps(requests_df):
+    """Content hash of each request's feature inputs, as hex strings"""
+    inputs = pd.DataFrame({
+        column: (pd.to_numeric(requests_df[column], errors='coerce').astype(float)
+                 if column in NUMERIC_STAMP_COLUMNS else requests_df[column].astype(str))
+        for column in STAMP_COLUMNS
+    })
+    return [f"{stamp:016x}" for stamp in pd.util.hash_pandas_object(inputs, index=False).tolist()]
+
+
+class FeatureStore:
+    """
+    Append-only feature rows keyed by request id and content stamp
+
+    matrix.f32  rows x FEATURE_COLUMNS risk components (row-major float32)
+    fields.f32  rows x FIELD_COLUMNS confidence and amount
+    ids.txt     "request_id<TAB>stamp" of each row; its line count is the row count of record
+
+    The stamp (row_stamps) hashes the request's feature inputs. When a
+    request is edited, or its id is reused, the stamp changes and a new row
+    is appended, so rows are looked up by (request id, stamp).
+
+    Row data is written before the ids, so an interrupted append leaves only
+    trailing bytes, which the next append truncates. Rows are read through
+    read-only memory maps, so opening the store costs nothing up front.
+    """
+
+    def __init__(self, directory=FEATURE_STORE_DIR):
+        """Open (or create) the store, discarding it if the feature schema changed"""
+        self.directory = directory
+        self.matrix_path = os.path.join(directory, "matrix.f32")
+        self.fields_path = os.path.join(directory, "fields.f32")
+        self.ids_path = os.path.join(directory, "ids.txt")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.lock_path = os.path.join(directory, ".lock")
+        os.makedirs(directory, exist_ok=True)
+
+        self.ids = []
+        self.row_of = {}  # (request id, stamp) -> row
+        self._ids_offset = 0
+        self._maps = {}
+        with self._locked():
+            self._check_schema()
+
+    def _schema(self):
+        return {
+            'version': FEATURE_STORE_VERSION,
+            'feature_columns': FEATURE_COLUMNS,
+            'field_columns': FIELD_COLUMNS,
+            'cash_flow_risk': CASH_FLOW_RISK,
+            'priority_risk': PRIORITY_RISK,
+            'dtype': DTYPE.str
+        }
+
+    def _check_schema(self):
+        """The store is derived data: rebuild it from scratch when its definition changes"""
+        schema = self._schema()
+        try:
+            with open(self.meta_path, 'r') as f:
+                if json.load(f) == schema:
+                    return
+        except (FileNotFoundError, ValueError):
+            pass
+        for path in [self.matrix_path, self.fields_path, self.ids_path]:
+            if os.path.exists(path):
+                os.remove(path)
+        with open(self.meta_path, 'w') as f:
+            json.dump(schema, f, indent=2)
+
+    @contextmanager
+    def _locked(self):
+        """Serialize writers across processes (no-op where fcntl is unavailable)"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """Pick up rows appended since the last call (by this or another process)"""
+        if not os.path.exists(self.ids_path):
+            if self.ids:
+                self._reset()
+            return
+        size = os.path.getsize(self.ids_path)
+        if size < self._ids_offset:
+            # Store was rebuilt underneath us
+            self._reset()
+        if size == self._ids_offset:
+            return
+        with open(self.ids_path, 'r') as f:
+            f.seek(self._ids_offset)
+            tail = f.read()
+        complete = tail[:tail.rfind('\n') + 1]
+        new_ids = complete.split('\n')[:-1]
+        self.row_of.update(zip((tuple(line.split('\t')) for line in new_ids),
+                               range(len(self.ids), len(self.ids) + len(new_ids))))
+        self.ids.extend(new_ids)
+        self._ids_offset += len(complete.encode())
+        self._maps = {}
+
+    def _reset(self):
+        self.ids, self.row_of, self._ids_offset, self._maps = [], {}, 0, {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def missing(self, request_ids, stamps):
+        """Request ids (as strings) with no stored row for their current stamp"""
+        self.refresh()
+        return [request_id for request_id, stamp in zip(map(str, request_ids), stamps)
+                if (request_id, stamp) not in self.row_of]
+
+    def append(self, request_ids, matrix, fields, stamps):
+        """
+        Persist rows for requests not stored yet under their stamp
+
+        Args:
+            request_ids: Sequence of request ids, one per row
+            matrix: (n, len(FEATURE_COLUMNS)) risk components
+            fields: (n, len(FIELD_COLUMNS)) confidence and amount
+            stamps: row_stamps() of the requests
+
+        Returns:
+            Number of rows appended
+        """
+        request_ids = [str(request_id) for request_id in request_ids]
+        with self._locked():
+            self.refresh()
+            first_position = {}
+            for position, key in enumerate(zip(request_ids, stamps)):
+                first_position.setdefault(key, position)
+            positions = [position for key, position in first_position.items() if key not in self.row_of]
+            if not positions:
+                return 0
+
+            rows = len(self.ids)
+            for path, array in [(self.matrix_path, matrix), (self.fields_path, fields)]:
+                expected = rows * array.shape[1] * DTYPE.itemsize
+                if os.path.exists(path) and os.path.getsize(path) != expected:
+                    os.truncate(path, expected)
+                with open(path, 'ab') as f:
+                    f.write(np.ascontiguousarray(array[positions], dtype=DTYPE).tobytes())
+            if os.path.exists(self.ids_path) and os.path.getsize(self.ids_path) != self._ids_offset:
+                os.truncate(self.ids_path, self._ids_offset)  # partial line from an interrupted append
+            with open(self.ids_path, 'a') as f:
+                f.write(''.join([f"{request_ids[position]}\t{stamps[position]}\n" for position in positions]))
+
+            self.refresh()
+        return len(positions)
+
+    def _map(self, path, width):
+        """Read-only memory map over the committed rows of a file"""
+        if path not in self._maps:
+            rows = len(self.ids)
+            if rows == 0:
+                self._maps[path] = np.empty((0, width), dtype=DTYPE)
+            else:
+                self._maps[path] = np.memmap(path, dtype=DTYPE, mode='r', shape=(rows, width))
+        return self._maps[path]
+
+    @property
+    def matrix(self):
+        """Memory-mapped (rows, len(FEATURE_COLUMNS)) feature matrix"""
+        self.refresh()
+        return self._map(self.matrix_path, len(FEATURE_COLUMNS))
+
+    @property
+    def fields(self):
+        """Memory-mapped (rows, len(FIELD_COLUMNS)) confidence/amount matrix"""
+        self.refresh()
+        return self._map(self.fields_path, len(FIELD_COLUMNS))
+
+    def gather(self, request_ids, stamps):
+        """
+        Stored rows for the given requests, in the given order
+
+        Raises:
+            KeyError: if a request has no stored row for its stamp (call missing()/append first)
+        """
+        self.refresh()
+        rows = np.fromiter((self.row_of[(str(request_id), stamp)] for request_id, stamp in zip(request_ids, stamps)),
+                           dtype=np.int64, count=len(stamps))
+        return np.asarray(self.matrix[rows]), np.asarray(self.fields[rows])
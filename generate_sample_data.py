@@ -4,7 +4,9 @@ Run this before first use if data files don't exist
 """
 
 import csv
+import os
 import random
+import shutil
 from datetime import datetime, timedelta
 
 def generate_invoice_requests():
@@ -203,10 +205,27 @@ def generate_audit_log():
     print(f"✅ Generated {len(logs)} audit log entries")
 
 
+def clear_stored_data():
+    """
+    Remove the partitioned decisions, audit segments and derived stores
+    
+    The app migrates the legacy CSVs written below into its own layout on
+    first launch; without this, regenerated decisions and audit entries
+    would be added to the ones already stored.
+    """
+    for directory in ['decisions', 'audit', 'archive', 'features']:
+        shutil.rmtree(os.path.join('data', directory), ignore_errors=True)
+    for name in os.listdir('data'):
+        if name.endswith(('.db', '.arrow', '.migrated')) or name == 'risk_audit.json':
+            os.remove(os.path.join('data', name))
+
+
 if __name__ == "__main__":
     print("Generating sample data...")
     print("=" * 50)
     
+    os.makedirs('data', exist_ok=True)
+    clear_stored_data()
     generate_invoice_requests()
     generate_decisions()
     generate_audit_log()
@@ -0,0 +1,364 @@
+"""
+Ingest Screening for Invoice Payment Manager
+Duplicate and amount-outlier checks on newly pending requests, with a quarantine
+"""
+
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config import INGEST_SCREENING, QUARANTINE_DB
+
+
+# Screening flags (bit values) and the reason recorded for each
+FLAG_DECIDED_ID = 1      # request_id already has a decision
+FLAG_REPEATED_ID = 2     # request_id appears more than once in the pending file
+FLAG_DUPLICATE_INVOICE = 4  # same vendor, amount and due date as an earlier request
+FLAG_AMOUNT_OUTLIER = 8  # amount far outside the vendor's usual range
+
+FLAG_REASONS = {
+    FLAG_DECIDED_ID: "request_id already decided",
+    FLAG_REPEATED_ID: "request_id repeated in pending requests",
+    FLAG_DUPLICATE_INVOICE: "same vendor, amount and due date as an earlier request",
+    FLAG_AMOUNT_OUTLIER: "amount unusual for this vendor",
+}
+
+QUARANTINE_COLUMNS = [
+    "request_id", "vendor_name", "invoice_amount", "original_due_date", "reasons",
+    "amount_zscore", "status", "quarantined_at", "resolved_by", "resolved_at"
+]
+
+
+def flag_reasons(flags):
+    """Reason text ("a; b") for one row's flag bits"""
+    return "; ".join(reason for bit, reason in FLAG_REASONS.items() if flags & bit)
+
+
+def hash_request_ids(request_ids):
+    """uint64 hash of each request_id (compared as text)"""
+    # Ids are mostly distinct, so hashing each directly beats factorizing first
+    return pd.util.hash_array(pd.Series(request_ids, copy=False).astype(str).to_numpy(dtype=object),
+                              categorize=False)
+
+
+def hash_vendors(vendor_names):
+    """
+    uint64 hash of each vendor name, ignoring case and surrounding spaces
+
+    Names are normalized and hashed once per distinct value, then gathered
+    by code, so the per-row cost is a factorize and a take.
+    """
+    codes, uniques = pd.factorize(pd.Series(vendor_names, copy=False), use_na_sentinel=False)
+    normalized = pd.Index(uniques).astype(str).str.strip().str.casefold()
+    return pd.util.hash_array(normalized.to_numpy(dtype=object))[codes]
+
+
+def hash_invoices(requests_df, vendor_hashes=None):
+    """uint64 hash of (vendor, amount in cents, due date) for each request"""
+    if vendor_hashes is None:
+        vendor_hashes = hash_vendors(requests_df['vendor_name'])
+    cents = np.round(pd.to_numeric(requests_df['invoice_amount'], errors='coerce').to_numpy(dtype=float) * 100)
+    due_days = pd.to_datetime(requests_df['original_due_date'], errors='coerce').to_numpy().astype('datetime64[D]')
+    return pd.util.hash_pandas_object(pd.DataFrame({
+        'vendor': vendor_hashes,
+        'cents': np.nan_to_num(cents, nan=-1).astype(np.int64),
+        'due': due_days.view(np.int64)
+    }), index=False).to_numpy()
+
+
+class HashSet:
+    """
+    Sorted array of uint64 hashes: vectorized membership by binary search
+
+    Queries are sorted before the search, so a large batch walks the keys
+    in order instead of jumping around memory once per hash.
+    """
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def contains(self, hashes):
+        """Boolean array: which hashes are in the set"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(self.keys):
+            return np.zeros(len(hashes), dtype=bool)
+        order = np.argsort(hashes)
+        sorted_hashes = hashes[order]
+        positions = np.minimum(np.searchsorted(self.keys, sorted_hashes), len(self.keys) - 1)
+        found = np.empty(len(hashes), dtype=bool)
+        found[order] = self.keys[positions] == sorted_hashes
+        return found
+
+    def add(self, hashes):
+        """Insert hashes (a merge into the sorted array, not a re-sort)"""
+        hashes = np.unique(np.asarray(hashes, dtype=np.uint64))
+        hashes = hashes[~self.contains(hashes)]
+        if len(hashes):
+            self.keys = np.insert(self.keys, np.searchsorted(self.keys, hashes), hashes)
+
+
+class VendorAmountStats:
+    """
+    Streaming count, mean and sum of squared deviations of log amounts per vendor
+
+    Batches are folded in with the parallel form of Welford's update (Chan
+    et al.), so the statistics equal a single pass over every amount seen,
+    without keeping the amounts. Log amounts make the spread comparable
+    between small and large vendors.
+    """
+
+    def __init__(self):
+        self.stats = pd.DataFrame({'count': pd.Series(dtype=float), 'mean': pd.Series(dtype=float),
+                                   'm2': pd.Series(dtype=float)})
+
+    @staticmethod
+    def _log_amounts(amounts):
+        amounts = pd.to_numeric(pd.Series(amounts, copy=False), errors='coerce').to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(amounts > 0, np.log(amounts), np.nan)
+
+    def update(self, vendor_hashes, amounts):
+        """Fold a batch of (vendor, amount) observations into the statistics"""
+        values = pd.Series(self._log_amounts(amounts), index=pd.Index(vendor_hashes, dtype=np.uint64))
+        values = values.dropna()
+        if values.empty:
+            return
+        grouped = values.groupby(level=0)
+        batch = pd.DataFrame({'count': grouped.count().astype(float), 'mean': grouped.mean()})
+        batch['m2'] = grouped.var(ddof=0).fillna(0.0) * batch['count']
+
+        index = self.stats.index.union(batch.index)
+        old = self.stats.reindex(index, fill_value=0.0)
+        new = batch.reindex(index, fill_value=0.0)
+        count = old['count'] + new['count']
+        delta = new['mean'] - old['mean']
+        self.stats = pd.DataFrame({
+            'count': count,
+            'mean': old['mean'] + delta * new['count'] / count,
+            'm2': old['m2'] + new['m2'] + delta ** 2 * old['count'] * new['count'] / count
+        })
+
+    def zscores(self, vendor_hashes, amounts, min_history):
+        """
+        How many standard deviations each log amount is from its vendor's mean
+
+        Returns:
+            float array; NaN where the vendor has fewer than min_history
+            amounts, no spread yet, or the amount is not positive
+        """
+        prior = self.stats.reindex(pd.Index(vendor_hashes, dtype=np.uint64))
+        count = prior['count'].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(prior['m2'].to_numpy() / (count - 1))
+            z = (self._log_amounts(amounts) - prior['mean'].to_numpy()) / std
+        z[~(count >= min_history) | ~(std > 0)] = np.nan
+        return z
+
+
+class IngestScreen:
+    """
+    Flags newly pending requests that look like duplicates or amount outliers
+
+    Keeps hash sets of decided request ids, of request ids already screened
+    and accepted, and of the invoice keys (vendor, amount, due date) of
+    accepted and decided requests, plus per-vendor amount statistics. All
+    checks are vectorized array operations, so screening grows linearly
+    with the batch; membership tests are binary searches.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = rules or INGEST_SCREENING
+        self.decided_ids = HashSet()
+        self.accepted_ids = HashSet()
+        self.invoice_keys = HashSet()
+        self.vendor_stats = VendorAmountStats()
+
+    def seed(self, decided_ids, archive_df, accepted_df):
+        """
+        Start from existing data
+
+        Args:
+            decided_ids: request_ids that already have a decision
+            archive_df: Decided requests (invoice keys and amounts only)
+            accepted_df: Pending requests already screened (queued or released)
+        """
+        self.decided_ids.add(hash_request_ids(decided_ids))
+        if not archive_df.empty:
+            vendor_hashes = hash_vendors(archive_df['vendor_name'])
+            self.invoice_keys.add(hash_invoices(archive_df, vendor_hashes))
+            self.vendor_stats.update(vendor_hashes, archive_df['invoice_amount'])
+        self.accept(accepted_df)
+
+    def record_decided(self, request_ids):
+        """Remember decided request ids (they may not be resubmitted)"""
+        self.decided_ids.add(hash_request_ids(request_ids))
+
+    def accept(self, requests_df, screened=None):
+        """
+        Fold requests that passed screening (or were released) into the history
+
+        Args:
+            requests_df: Requests to accept
+            screened: Their rows of the screen() result, whose hashes are
+                reused instead of computed again (optional)
+        """
+        if requests_df.empty:
+            return
+        if screened is None:
+            request_hashes = hash_request_ids(requests_df['request_id'])
+            vendor_hashes = hash_vendors(requests_df['vendor_name'])
+            invoice_hashes = hash_invoices(requests_df, vendor_hashes)
+        else:
+            request_hashes = screened['request_hash'].to_numpy()
+            vendor_hashes = screened['vendor_hash'].to_numpy()
+            invoice_hashes = screened['invoice_hash'].to_numpy()
+        self.accepted_ids.add(request_hashes)
+        self.invoice_keys.add(invoice_hashes)
+        self.vendor_stats.update(vendor_hashes, requests_df['invoice_amount'])
+
+    def screen(self, requests_df):
+        """
+        Check pending requests
+
+        Every request is checked for a decided or repeated request_id.
+        Requests not accepted before are also checked against the invoice
+        keys of earlier requests (and of earlier rows in this batch) and
+        their vendor's amount statistics.
+
+        Returns:
+            DataFrame on the request index with 'flags' (FLAG_* bits, 0 =
+            clean), 'amount_zscore', 'new' (not accepted before) and the
+            request, vendor and invoice hashes (the last two for new rows only)
+        """
+        request_hashes = hash_request_ids(requests_df['request_id'])
+        flags = np.zeros(len(requests_df), dtype=np.uint8)
+        flags[self.decided_ids.contains(request_hashes)] |= FLAG_DECIDED_ID
+        flags[pd.Series(request_hashes).duplicated(keep=False).to_numpy()] |= FLAG_REPEATED_ID
+
+        new = ~self.accepted_ids.contains(request_hashes)
+        zscores = np.full(len(requests_df), np.nan)
+        row_vendor_hashes = np.zeros(len(requests_df), dtype=np.uint64)
+        row_invoice_hashes = np.zeros(len(requests_df), dtype=np.uint64)
+        if new.any():
+            new_df = requests_df[new]
+            vendor_hashes = hash_vendors(new_df['vendor_name'])
+            invoice_hashes = hash_invoices(new_df, vendor_hashes)
+            new_flags = np.zeros(len(new_df), dtype=np.uint8)
+            duplicate = (self.invoice_keys.contains(invoice_hashes)
+                         | pd.Series(invoice_hashes).duplicated(keep='first').to_numpy())
+            new_flags[duplicate] |= FLAG_DUPLICATE_INVOICE
+            new_z = self.vendor_stats.zscores(vendor_hashes, new_df['invoice_amount'],
+                                              self.rules['outlier_min_history'])
+            new_flags[np.abs(new_z) > self.rules['outlier_zscore']] |= FLAG_AMOUNT_OUTLIER
+            flags[new] |= new_flags
+            zscores[new] = new_z
+            row_vendor_hashes[new] = vendor_hashes
+            row_invoice_hashes[new] = invoice_hashes
+
+        return pd.DataFrame({
+            'flags': flags, 'amount_zscore': zscores, 'new': new, 'request_hash': request_hashes,
+            'vendor_hash': row_vendor_hashes, 'invoice_hash': row_invoice_hashes
+        }, index=requests_df.index)
+
+
+class QuarantineStore:
+    """
+    Requests held back from review by ingest screening
+
+    One row per request_id with its status: 'quarantined' (held),
+    'released' (sent to review by a person) or 'discarded' (removed from
+    the pending requests). Rows are kept after resolution so a request is
+    screened only once.
+    """
+
+    def __init__(self, path=QUARANTINE_DB):
+        """Open (or create) the quarantine database"""
+        self.path = path
+        with self._connect() as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS quarantine (
+                    request_id TEXT PRIMARY KEY,
+                    vendor_name TEXT,
+                    invoice_amount REAL,
+                    original_due_date TEXT,
+                    reasons TEXT NOT NULL,
+                    amount_zscore REAL,
+                    status TEXT NOT NULL DEFAULT 'quarantined',
+                    quarantined_at TEXT NOT NULL,
+                    resolved_by TEXT,
+                    resolved_at TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_quarantine_status ON quarantine (status)")
+
+    def _connect(self):
+        """Open a short-lived connection in autocommit mode"""
+        return closing(sqlite3.connect(self.path, timeout=10, isolation_level=None))
+
+    def statuses(self):
+        """{request_id: status} of every request screened into the quarantine"""
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT request_id, status FROM quarantine"))
+
+    def add(self, rows):
+        """
+        Quarantine requests (ids quarantined before keep their existing row)
+
+        Args:
+            rows: DataFrame with request_id, vendor_name, invoice_amount,
+                original_due_date, reasons and amount_zscore
+
+        Returns:
+            request_ids newly quarantined
+        """
+        if rows.empty:
+            return []
+        quarantined_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        records = [
+            (str(request_id), str(vendor), float(amount), str(due_date), reasons,
+             None if pd.isna(zscore) else float(zscore), quarantined_at)
+            for request_id, vendor, amount, due_date, reasons, zscore in zip(
+                rows['request_id'], rows['vendor_name'], rows['invoice_amount'],
+                rows['original_due_date'], rows['reasons'], rows['amount_zscore'])
+        ]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            known = {row[0] for row in conn.execute("SELECT request_id FROM quarantine")}
+            records = [record for record in records if record[0] not in known]
+            conn.executemany(
+                "INSERT INTO quarantine (request_id, vendor_name, invoice_amount, original_due_date, "
+                "reasons, amount_zscore, quarantined_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                records
+            )
+            conn.execute("COMMIT")
+        return [record[0] for record in records]
+
+    def load(self, status='quarantined'):
+        """Quarantine rows with a status (None = all), most recent first"""
+        sql = f"SELECT {', '.join(QUARANTINE_COLUMNS)} FROM quarantine"
+        params = []
+        if status is not None:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY quarantined_at DESC, request_id"
+        with self._connect() as conn:
+            return pd.DataFrame(conn.execute(sql, params).fetchall(), columns=QUARANTINE_COLUMNS)
+
+    def resolve(self, request_id, status, user):
+        """
+        Release or discard a quarantined request
+
+        Returns:
+            True if the request was still quarantined
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE quarantine SET status = ?, resolved_by = ?, resolved_at = ? "
+                "WHERE request_id = ? AND status = 'quarantined'",
+                (status, user, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), str(request_id))
+            )
+            return cursor.rowcount == 1
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Scoring Service Load Test
+Drives scoring_service.py over keep-alive connections from many client
+threads and reports throughput plus client- and server-side latency.
+
+Run: python3 loadtest_scoring.py [--start-server] [--concurrency 32] [--requests 20000] [--batch-size 0]
+     (--batch-size 0 calls POST /score; N > 0 sends N requests per POST /score/batch)
+"""
+
+import argparse
+import http.client
+import json
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+import numpy as np
+
+from config import SCORING_HOST, SCORING_PORT
+from benchmark_policy import random_requests
+
+
+def wait_for_service(host, port, timeout=30.0):
+    """Poll /health until the service answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def run_client(host, port, bodies, path, latencies, errors):
+    """Send bodies one after another over a single keep-alive connection"""
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    for body in bodies:
+        start = time.perf_counter()
+        try:
+            connection.request('POST', path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+        latencies.append((time.perf_counter() - start) * 1000)
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=f"http://{SCORING_HOST}:{SCORING_PORT}")
+    parser.add_argument('--start-server', action='store_true', help='launch scoring_service.py for the run')
+    parser.add_argument('--concurrency', type=int, default=32, help='client threads (one connection each)')
+    parser.add_argument('--requests', type=int, default=20000, help='HTTP requests to send in total')
+    parser.add_argument('--batch-size', type=int, default=0, help='requests per /score/batch call (0 = /score)')
+    parser.add_argument('--max-wait-ms', type=float, default=None,
+                        help='micro-batch wait for the started server (default: config)')
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    host, port = url.hostname, url.port or 80
+
+    print("=" * 60)
+    print("  Scoring Service Load Test")
+    print("=" * 60)
+
+    server = None
+    if args.start_server:
+        command = [sys.executable, 'scoring_service.py', '--host', host, '--port', str(port)]
+        if args.max_wait_ms is not None:
+            command += ['--max-wait-ms', str(args.max_wait_ms)]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    try:
+        if not wait_for_service(host, port):
+            print(f"❌ No scoring service at {args.url} (start it or pass --start-server)")
+            return 1
+
+        rows_per_call = max(args.batch_size, 1)
+        records = random_requests(min(args.requests * rows_per_call, 100000)).to_dict('records')
+        if args.batch_size:
+            path = '/score/batch'
+            bodies = [json.dumps({'requests': [records[(i * rows_per_call + j) % len(records)]
+                                               for j in range(rows_per_call)]}).encode()
+                      for i in range(args.requests)]
+        else:
+            path = '/score'
+            bodies = [json.dumps(records[i % len(records)]).encode() for i in range(args.requests)]
+
+        latencies, errors = [], []
+        threads = [
+            threading.Thread(target=run_client,
+                             args=(host, port, bodies[i::args.concurrency], path, latencies, errors))
+            for i in range(args.concurrency)
+        ]
+        print(f"Sending {args.requests:,} requests to {path} "
+              f"({rows_per_call} row(s) each) from {args.concurrency} connections...")
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"Done in {elapsed:.2f}s: {args.requests / elapsed:,.0f} requests/s, "
+              f"{args.requests * rows_per_call / elapsed:,.0f} scored rows/s, {len(errors)} errors")
+        print(f"Client latency: p50 {p50:.2f} ms  p95 {p95:.2f} ms  p99 {p99:.2f} ms  max {max(latencies):.2f} ms")
+
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.request('GET', '/metrics')
+        metrics = json.loads(connection.getresponse().read())
+        endpoint = metrics['endpoints'].get(path, {})
+        batching = metrics['batching']
+        print(f"Server latency: p50 {endpoint.get('p50_ms', 0):.2f} ms  p99 {endpoint.get('p99_ms', 0):.2f} ms "
+              f"({endpoint.get('requests', 0):,} requests served)")
+        print(f"Micro-batching: {batching['batches']:,} batches on {batching['workers']} workers "
+              f"(wait {batching['max_wait_ms']:g} ms): avg {batching['avg_batch_rows']:.1f} rows, "
+              f"p50 {batching['p50_batch_rows']:g}, p95 {batching['p95_batch_rows']:g}, "
+              f"{batching['full_batches']:,} full")
+        print("Batch rows histogram: " + ", ".join(f"{size}: {count:,}"
+                                                   for size, count in batching['batch_rows_histogram'].items()))
+        return 0 if not errors else 1
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,16 +4,37 @@ Streamlit-based AI-powered invoice extension request review system
 """
 
 import streamlit as st
+try:  # Streamlit internals behind live refresh; without them sessions refresh on their next rerun
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    Runtime = get_script_run_ctx = None
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from collections import Counter
 from datetime import datetime, timedelta
 import base64
+import uuid
+# plotly.express takes ~0.1 s to import; chart builders import it on first use,
+# so sessions that open a page without charts never load it
 
-from config import KEBOOLA_COLORS, APP_TITLE, APP_SUBTITLE, RISK_THRESHOLDS, FEATURE_WEIGHTS, AI_GOVERNANCE_RULES
+from config import (
+    KEBOOLA_COLORS, APP_TITLE, APP_SUBTITLE, RISK_THRESHOLDS, FEATURE_WEIGHTS,
+    AI_GOVERNANCE_RULES, AUDIT_DEFAULT_WINDOW_DAYS, REVIEW_QUEUE_ORDERS,
+    REVIEW_QUEUE_DEFAULT_ORDER, DECISION_RULES, SIMULATION_SCOPES, METRICS_WINDOWS,
+    METRICS_DEFAULT_WINDOW, VENDOR_PROFILE_HALF_LIFE_DAYS, RISK_AUDIT_MIN_ACCURACY, RISK_AUDIT_MIN_REPRODUCIBILITY,
+    RISK_AUDIT_MIN_COVERAGE, AUDIT_LOG_COLUMNS, DECISION_LABELS
+)
 from data_manager import DataManager
 from ai_decision_engine import AIDecisionEngine
+from auto_disposition import AutoDisposition
+from whatif_simulator import WhatIfSimulator
+from data_watcher import DataWatcher
 from email_generator import format_original_email, generate_email_response
+from factor_status import (
+    FACTOR_STATUS_RULES, FACTOR_KEYS_BY_NAME, STATUS_COLORS, STATUS_EMOJI, classify_factors, factor_badges,
+    red_flag_counts, status_counts, get_factor_status
+)
+from pii_masking import PII_TEXT_COLUMNS
 from styles import (
     load_custom_css, render_metric_card, render_colored_badge,
     render_factor_indicator, render_header_with_logo, 
@@ -35,32 +56,325 @@ st.set_page_config(
 )
 
 
+# Pages refreshed in place when another session or job writes data; other
+# pages pick changes up on their next rerun, so forms are never interrupted
+LIVE_REFRESH_PAGES = ["🏠 Dashboard", "📊 Reports"]
+
+
+def _active_session_lookup():
+    """
+    Streamlit's lookup of an open session by id, or None when unavailable
+    
+    Streamlit has no public API for server-initiated reruns; this is the
+    session manager its own source file watcher uses. It is private, so a
+    Streamlit upgrade may move it: live refresh is then turned off and
+    sessions apply new data on their next rerun (sync_session_data).
+    """
+    if Runtime is None or get_script_run_ctx is None or not Runtime.exists():
+        return None
+    session_mgr = getattr(Runtime.instance(), '_session_mgr', None)
+    return getattr(session_mgr, 'get_active_session_info', None)
+
+
+def live_refresh_available():
+    """True when open sessions can be rerun from the data watcher"""
+    return _active_session_lookup() is not None
+
+
+def request_session_rerun(session_id):
+    """
+    Rerun an open session so it applies new data (called from the watcher thread)
+    
+    Returns:
+        False if the session is gone or sessions cannot be rerun
+    """
+    try:
+        get_session_info = _active_session_lookup()
+        if get_session_info is None:
+            return False
+        session_info = get_session_info(session_id)
+        if session_info is None:
+            return False
+        session_info.session.request_rerun(None)
+        return True
+    except Exception as e:
+        print(f"Error requesting rerun of session {session_id}: {e}")
+        return False
+
+
+@st.cache_resource
+def get_data_watcher(_data_manager):
+    """One data directory watcher per server process, shared by all sessions"""
+    watcher = DataWatcher(_data_manager.get_data_versions)
+    watcher.start(on_stale=request_session_rerun)
+    return watcher
+
+
 def initialize_session_state():
     """Initialize session state variables on first run"""
     if 'initialized' not in st.session_state:
         st.session_state.initialized = True
         st.session_state.data_manager = DataManager()
-        st.session_state.ai_engine = AIDecisionEngine()
+        st.session_state.ai_engine = AIDecisionEngine(
+            vendor_profiles=st.session_state.data_manager.vendor_profiles
+        )
         st.session_state.session_start_time = datetime.now()
+        st.session_state.reviewer_id = f"reviewer-{uuid.uuid4().hex[:8]}"
         st.session_state.processed_count = 0
         st.session_state.approved_count = 0
         st.session_state.selected_request = None
         st.session_state.pending_decision = None
         st.session_state.current_ai_result = None
+        st.session_state.ai_results = {}
+        st.session_state.figure_cache = {}
+        st.session_state.data_watcher = get_data_watcher(st.session_state.data_manager)
+        st.session_state.last_ingest_report = None
         
-        # Load data
-        st.session_state.requests_df = st.session_state.data_manager.load_requests()
-        st.session_state.decisions_df = st.session_state.data_manager.load_decisions()
-        st.session_state.audit_log_df = st.session_state.data_manager.load_audit_log()
+        # Tables are read when a page first asks for them
+        load_session_data()
         
         st.session_state.data_loaded = True
 
 
+# Session frames and the state that belongs with each (dropped together)
+SESSION_FRAMES = {
+    'requests': ['requests_df'],
+    'decisions': ['decisions_df', 'decision_positions'],
+    'audit': ['audit_log_df']
+}
+
+
+def load_session_data():
+    """
+    Record the current table versions and drop the session's working frames
+    
+    Frames are re-read on first access (get_requests_df, get_decisions_df,
+    get_audit_log_df), so a page only pays for the tables it shows - the
+    Governance and What-If pages read none of them.
+    """
+    # Read versions first: a write landing before a frame is read then shows up as a newer version
+    st.session_state.data_version = st.session_state.data_manager.get_data_versions()
+    for table in SESSION_FRAMES:
+        drop_session_frame(table)
+
+
+def drop_session_frame(table):
+    """Forget a session frame so its next access re-reads it"""
+    for key in SESSION_FRAMES[table]:
+        st.session_state.pop(key, None)
+
+
+def get_requests_df():
+    """Pending requests, read on first use (newly arrived ones are ingested first)"""
+    if 'requests_df' not in st.session_state:
+        requests_df = st.session_state.data_manager.load_requests()
+        if ingest_pending_requests(requests_df):
+            # Auto-finalized requests left the queue and joined the decision history
+            load_session_data()
+            requests_df = st.session_state.data_manager.load_requests()
+        st.session_state.requests_df = requests_df
+    return st.session_state.requests_df
+
+
+def get_decisions_df():
+    """Decision history, read on first use and extended from the partition tails afterwards"""
+    if 'decisions_df' not in st.session_state:
+        st.session_state.decisions_df, st.session_state.decision_positions, _ = (
+            st.session_state.data_manager.read_new_decisions()
+        )
+    return st.session_state.decisions_df
+
+
+def get_audit_log_df():
+    """Recent audit window, read on first use"""
+    if 'audit_log_df' not in st.session_state:
+        st.session_state.audit_log_df = load_recent_audit_log()
+    return st.session_state.audit_log_df
+
+
+def sync_session_data():
+    """
+    Apply writes made by other sessions or jobs since this session loaded its data
+    
+    Only tables whose version moved are touched, and only by their deltas:
+    new decisions are read from the tail of their partitions, pending
+    requests apply the appended/removed ids of the change feed, and the
+    audit window reads the entries newer than the ones it holds. A table
+    is re-read whole only when the feed reports a reset (files changed
+    outside the app, or the feed no longer covers this session's version).
+    Frames the session never read stay unread.
+    """
+    data_manager = st.session_state.data_manager
+    seen = st.session_state.data_version
+    if st.session_state.data_watcher.versions == seen:
+        return
+    
+    # The watcher may lag this session's own writes; ask for the current versions
+    versions = data_manager.get_data_versions()
+    changed = {table for table, version in versions.items() if seen.get(table) != version}
+    if not changed:
+        return
+    
+    if 'requests' in changed:
+        versions['requests'] = apply_request_changes(data_manager.get_changes('requests', seen.get('requests', 0)))
+    if 'decisions' in changed and 'decisions_df' in st.session_state:
+        decisions_df, positions, is_full = data_manager.read_new_decisions(st.session_state.decision_positions)
+        if not is_full and not decisions_df.empty:
+            decisions_df = pd.concat([st.session_state.decisions_df, decisions_df], ignore_index=True)
+        if is_full or not decisions_df.empty:
+            st.session_state.decisions_df = decisions_df
+        st.session_state.decision_positions = positions
+    if 'audit' in changed:
+        versions['audit'] = apply_audit_changes(data_manager.get_changes('audit', seen.get('audit', 0)))
+    st.session_state.data_version = versions
+
+
+def apply_request_changes(changes):
+    """
+    Update the session's pending requests from a change-feed delta
+    
+    Removed ids are dropped; appended (new or rewritten) ids are taken from
+    the memory-mapped pending store and replace their old rows.
+    
+    Returns:
+        The requests version the frame now reflects
+    """
+    if 'requests_df' not in st.session_state:
+        return changes['version']
+    if changes['reset']:
+        drop_session_frame('requests')
+        return changes['version']
+    
+    touched = set(changes['appended']) | set(changes['removed'])
+    if touched:
+        requests_df = st.session_state.requests_df
+        frames = [requests_df[~requests_df['request_id'].astype(str).isin(touched)]]
+        if changes['appended']:
+            current = st.session_state.data_manager.load_requests()
+            frames.append(current[current['request_id'].astype(str).isin(set(changes['appended']))])
+        st.session_state.requests_df = pd.concat(frames, ignore_index=True)
+    return changes['version']
+
+
+def apply_audit_changes(changes):
+    """
+    Extend the session's audit window with entries written since it was read
+    
+    The audit log is append-only, so only entries at or after the newest
+    timestamp held are read (segments before it are skipped); entries
+    already held at that timestamp are not added twice.
+    
+    Returns:
+        The audit version the frame now reflects
+    """
+    audit_df = st.session_state.get('audit_log_df')
+    if audit_df is None:
+        return changes['version']
+    if changes['reset'] or audit_df.empty:
+        drop_session_frame('audit')
+        return changes['version']
+    
+    timestamps = pd.to_datetime(audit_df['timestamp'])
+    newest = timestamps.max()
+    tail = st.session_state.data_manager.load_audit_log(start=newest)
+    # Entries stamped with the newest held second may already be in the window
+    held = Counter(map(tuple, audit_df.loc[timestamps == newest, AUDIT_LOG_COLUMNS].astype(str).to_numpy().tolist()))
+    at_newest = pd.to_datetime(tail['timestamp']) == newest
+    keep = []
+    for row, is_newest in zip(tail[AUDIT_LOG_COLUMNS].astype(str).to_numpy().tolist(), at_newest):
+        key = tuple(row)
+        keep.append(not (is_newest and held[key] > 0))
+        if not keep[-1]:
+            held[key] -= 1
+    new_entries = tail[keep]
+    if not new_entries.empty:
+        cutoff = datetime.now() - timedelta(days=AUDIT_DEFAULT_WINDOW_DAYS)
+        audit_df = pd.concat([new_entries, audit_df[timestamps >= cutoff]], ignore_index=True)
+        st.session_state.audit_log_df = audit_df
+    return changes['version']
+
+
+def get_cached_figure(name, build, df):
+    """
+    Plotly figure built once per session data version
+    
+    Charts only depend on the session frames, which are replaced (never
+    mutated) by load_session_data together with their table versions, so a
+    rerun with unchanged data reuses the figure and skips Plotly Express.
+    """
+    cached = st.session_state.figure_cache.get(name)
+    if cached is None or cached[0] != st.session_state.data_version:
+        cached = (st.session_state.data_version, build(df))
+        st.session_state.figure_cache[name] = cached
+    return cached[1]
+
+
+def load_recent_audit_log():
+    """Load only the recent audit window; older segments are read on demand"""
+    cutoff = datetime.now() - timedelta(days=AUDIT_DEFAULT_WINDOW_DAYS)
+    return st.session_state.data_manager.load_audit_log(start=cutoff)
+
+
+def ingest_pending_requests(requests_df):
+    """
+    Score newly pending requests once: auto-finalize clear cases, queue the rest
+    
+    Returns:
+        True if the pending file changed (requests auto-finalized or their text masked)
+    """
+    report = AutoDisposition(
+        st.session_state.data_manager, get_ai_engine()
+    ).run(requests_df, f"auto-{st.session_state.reviewer_id}")
+    
+    if report['ingested'] or report['quarantined'] or report['pii_masked']:
+        st.session_state.last_ingest_report = report
+    
+    return bool(report['auto_approved'] or report['auto_rejected'] or report['pii_requests'])
+
+
+def get_ai_engine():
+    """The session's engine, with vendor profiles synced to the decisions version seen by this run"""
+    decisions_version = st.session_state.data_version.get('decisions')
+    if st.session_state.get('vendor_profiles_version') != decisions_version:
+        st.session_state.data_manager.sync_vendor_profiles()
+        st.session_state.vendor_profiles_version = decisions_version
+    return st.session_state.ai_engine
+
+
+def get_ai_result(request):
+    """Engine result for a request, scored once per session (engine settings are fixed at startup)"""
+    request_id = request['request_id']
+    if request_id not in st.session_state.ai_results:
+        st.session_state.ai_results[request_id] = get_ai_engine().make_decision(request)
+    return st.session_state.ai_results[request_id]
+
+
+def get_queue_factor_status():
+    """
+    Factor statuses of the whole pending queue, classified once per data version
+    
+    Rows follow get_requests_df() order and are indexed by request_id.
+    """
+    requests_df = get_requests_df()
+    cached = st.session_state.get('queue_factor_status')
+    if cached is None or cached[0] != st.session_state.data_version:
+        cached = (st.session_state.data_version, classify_factors(requests_df.set_index('request_id')))
+        st.session_state.queue_factor_status = cached
+    return cached[1]
+
+
+def get_request_factor_status(request_id):
+    """(color, status text) per factor key for a pending request, or None if it is not queued"""
+    queue_status = get_queue_factor_status()
+    if request_id not in queue_status.index:
+        return None
+    row = queue_status.loc[request_id]
+    return {key: (row[f'{key}_status'], row[f'{key}_label']) for key in FACTOR_STATUS_RULES}
+
+
 def reload_data():
     """Manually reload data from CSV files"""
-    st.session_state.requests_df = st.session_state.data_manager.load_requests()
-    st.session_state.decisions_df = st.session_state.data_manager.load_decisions()
-    st.session_state.audit_log_df = st.session_state.data_manager.load_audit_log()
+    load_session_data()
     st.success("✅ Data reloaded from CSV files!")
 
 
@@ -98,7 +412,8 @@ def render_sidebar():
         st.markdown("### 🧭 Navigation")
         page = st.radio(
             "Select Page",
-            ["🏠 Dashboard", "📋 Review Requests", "📊 Reports", "🔍 AI Governance"],
+            ["🏠 Dashboard", "📋 Review Requests", "📊 Reports", "🔍 AI Governance", "🧪 What-If Simulator"],
+            key="page",
             label_visibility="collapsed"
         )
         
@@ -120,6 +435,10 @@ def render_sidebar():
         st.markdown("### 💾 Data Status")
         if st.session_state.data_loaded:
             st.success("✓ Data loaded")
+        if live_refresh_available():
+            st.caption(f"Live updates via {st.session_state.data_watcher.mode}")
+        else:
+            st.caption("Changes from other sessions appear on your next interaction")
         
         if st.button("🔄 Refresh from CSV"):
             reload_data()
@@ -127,6 +446,56 @@ def render_sidebar():
         return page
 
 
+def build_amount_histogram(requests_df):
+    """Dashboard chart: distribution of pending invoice amounts"""
+    import plotly.express as px
+    
+    fig = px.histogram(
+        requests_df,
+        x='invoice_amount',
+        nbins=15,
+        title="",
+        color_discrete_sequence=[KEBOOLA_COLORS['primary_blue']]
+    )
+    fig.update_layout(
+        xaxis_title="Invoice Amount ($)",
+        yaxis_title="Count",
+        height=300,
+        showlegend=False,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color=KEBOOLA_COLORS['text_dark'])
+    )
+    return fig
+
+
+def build_priority_pie(requests_df):
+    """Dashboard chart: pending requests by priority"""
+    import plotly.express as px
+    
+    priority_counts = requests_df['priority'].value_counts()
+    colors_map = {
+        'High': KEBOOLA_COLORS['danger_red'],
+        'Medium': KEBOOLA_COLORS['warning_yellow'],
+        'Low': KEBOOLA_COLORS['success_green']
+    }
+    colors = [colors_map.get(p, KEBOOLA_COLORS['primary_blue']) for p in priority_counts.index]
+    
+    fig = px.pie(
+        values=priority_counts.values,
+        names=priority_counts.index,
+        title="",
+        color_discrete_sequence=colors
+    )
+    fig.update_layout(
+        height=300,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color=KEBOOLA_COLORS['text_dark'])
+    )
+    return fig
+
+
 def render_dashboard():
     """Render the main dashboard page"""
     
@@ -205,68 +574,66 @@ def render_dashboard():
             unsafe_allow_html=True
         )
     
+    # Auto-disposition summary
+    report = st.session_state.last_ingest_report
+    auto_rate = stats.get('auto_handled_rate', 0)
+    if report:
+        st.info(
+            f"🤖 **Auto-disposition:** {report['auto_approved'] + report['auto_rejected']} of "
+            f"{report['ingested']} newly ingested requests handled automatically "
+            f"({report['auto_fraction']*100:.0f}%: {report['auto_approved']} approved, "
+            f"{report['auto_rejected']} rejected), {report['routed_to_review']} routed to review. "
+            f"Avg end-to-end latency {report['avg_latency_ms']:.1f} ms (max {report['max_latency_ms']:.1f} ms). "
+            f"All-time auto-handled: {auto_rate:.0f}%."
+        )
+        if report.get('quarantined'):
+            st.warning(
+                f"🚧 **Ingest screening:** {report['quarantined']} request(s) quarantined as possible "
+                f"duplicates or unusual amounts. Resolve them on the Review Requests page."
+            )
+        if report.get('pii_masked'):
+            st.info(
+                f"🔒 **PII masking:** {report['pii_masked']} email address(es), phone number(s) or account "
+                f"number(s) masked in {report['pii_requests']} pending request(s) before review."
+            )
+    
     # Charts
     st.markdown("### 📊 Analytics")
     chart_col1, chart_col2 = st.columns(2)
     
     with chart_col1:
         st.markdown("#### Amount Distribution")
-        if not st.session_state.requests_df.empty:
-            fig = px.histogram(
-                st.session_state.requests_df,
-                x='invoice_amount',
-                nbins=15,
-                title="",
-                color_discrete_sequence=[KEBOOLA_COLORS['primary_blue']]
-            )
-            fig.update_layout(
-                xaxis_title="Invoice Amount ($)",
-                yaxis_title="Count",
-                height=300,
-                showlegend=False,
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font=dict(color=KEBOOLA_COLORS['text_dark'])
-            )
+        if not get_requests_df().empty:
+            fig = get_cached_figure('dashboard_amounts', build_amount_histogram, get_requests_df())
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No pending requests to display")
     
     with chart_col2:
         st.markdown("#### Priority Breakdown")
-        if not st.session_state.requests_df.empty:
-            priority_counts = st.session_state.requests_df['priority'].value_counts()
-            colors_map = {
-                'High': KEBOOLA_COLORS['danger_red'],
-                'Medium': KEBOOLA_COLORS['warning_yellow'],
-                'Low': KEBOOLA_COLORS['success_green']
-            }
-            colors = [colors_map.get(p, KEBOOLA_COLORS['primary_blue']) for p in priority_counts.index]
-            
-            fig = px.pie(
-                values=priority_counts.values,
-                names=priority_counts.index,
-                title="",
-                color_discrete_sequence=colors
-            )
-            fig.update_layout(
-                height=300,
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font=dict(color=KEBOOLA_COLORS['text_dark'])
-            )
+        if not get_requests_df().empty:
+            fig = get_cached_figure('dashboard_priorities', build_priority_pie, get_requests_df())
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No pending requests to display")
     
+    # Factor statuses across the whole queue
+    st.markdown("### 🚦 Risk Factors Across the Queue")
+    if not get_requests_df().empty:
+        counts = status_counts(get_queue_factor_status())
+        counts.columns = [f"{STATUS_EMOJI[color]} {color.title()}" for color in STATUS_COLORS]
+        st.dataframe(counts.rename_axis('Factor').reset_index(), use_container_width=True, hide_index=True)
+    else:
+        st.info("No pending requests to classify")
+    
     # Tables
     st.markdown("### 📋 Request Overview")
     table_col1, table_col2 = st.columns(2)
     
     with table_col1:
         st.markdown("#### Pending Requests")
-        if not st.session_state.requests_df.empty:
-            display_df = st.session_state.requests_df.head(10)[
+        if not get_requests_df().empty:
+            display_df = get_requests_df().head(10)[
                 ['request_id', 'vendor_name', 'invoice_amount', 'priority', 'original_due_date']
             ].copy()
             display_df['invoice_amount'] = display_df['invoice_amount'].apply(lambda x: f"${x:,.2f}")
@@ -276,8 +643,8 @@ def render_dashboard():
     
     with table_col2:
         st.markdown("#### Recently Processed")
-        if not st.session_state.decisions_df.empty:
-            recent_df = st.session_state.decisions_df.sort_values('decision_date', ascending=False).head(10)[
+        if not get_decisions_df().empty:
+            recent_df = get_decisions_df().sort_values('decision_date', ascending=False).head(10)[
                 ['request_id', 'vendor_name', 'final_decision', 'confidence_score', 'decision_date']
             ].copy()
             st.dataframe(recent_df, use_container_width=True, hide_index=True)
@@ -285,59 +652,6 @@ def render_dashboard():
             st.info("No processed requests yet")
 
 
-def get_factor_status(factor_name, value):
-    """Determine color status for a factor"""
-    if factor_name == "Invoice Amount":
-        if value < RISK_THRESHOLDS['amount']['low']:
-            return 'green', 'LOW RISK'
-        elif value < RISK_THRESHOLDS['amount']['high']:
-            return 'yellow', 'MEDIUM'
-        else:
-            return 'red', 'HIGH RISK'
-    
-    elif factor_name == "Extension Period":
-        if value <= RISK_THRESHOLDS['extension_days']['low']:
-            return 'green', 'SHORT'
-        elif value <= RISK_THRESHOLDS['extension_days']['high']:
-            return 'yellow', 'MODERATE'
-        else:
-            return 'red', 'LONG PERIOD'
-    
-    elif factor_name == "Vendor Reliability":
-        if value > RISK_THRESHOLDS['vendor_reliability']['excellent']:
-            return 'green', 'EXCELLENT'
-        elif value > RISK_THRESHOLDS['vendor_reliability']['good']:
-            return 'yellow', 'GOOD'
-        else:
-            return 'red', 'CONCERNING'
-    
-    elif factor_name == "Payment History":
-        if value > RISK_THRESHOLDS['payment_history']['excellent']:
-            return 'green', 'EXCELLENT'
-        elif value > RISK_THRESHOLDS['payment_history']['good']:
-            return 'yellow', 'GOOD'
-        else:
-            return 'red', 'NEEDS REVIEW'
-    
-    elif factor_name == "Cash Flow Impact":
-        if value == 'Low':
-            return 'green', 'LOW IMPACT'
-        elif value == 'Medium':
-            return 'yellow', 'MEDIUM IMPACT'
-        else:
-            return 'red', 'HIGH IMPACT'
-    
-    elif factor_name == "Priority Level":
-        if value == 'Low':
-            return 'green', 'LOW'
-        elif value == 'Medium':
-            return 'yellow', 'MEDIUM'
-        else:
-            return 'red', 'HIGH'
-    
-    return 'yellow', 'MODERATE'
-
-
 def render_business_explanation(request, ai_result):
     """Render business-friendly AI explanation"""
     st.markdown("#### 💼 Business Explanation")
@@ -351,11 +665,19 @@ def render_business_explanation(request, ai_result):
     cash_flow = request.get('cash_flow_impact', 'Medium')
     priority = request.get('priority', 'Medium')
     
+    # Statuses come from the queue-wide classification; a request no longer
+    # in the queue is classified on its own
+    values = {'amount': amount, 'extension': extension_days, 'vendor': vendor_reliability,
+              'payment': payment_history, 'cash_flow': cash_flow, 'priority': priority}
+    statuses = get_request_factor_status(request['request_id']) or {
+        key: get_factor_status(FACTOR_STATUS_RULES[key]['name'], value) for key, value in values.items()
+    }
+    
     # Render 6 factors
     st.markdown("##### Key Decision Factors")
     
     # Factor 1: Invoice Amount
-    status, status_text = get_factor_status("Invoice Amount", amount)
+    status, status_text = statuses['amount']
     st.markdown(
         render_factor_indicator(
             "Invoice Amount",
@@ -368,7 +690,7 @@ def render_business_explanation(request, ai_result):
     )
     
     # Factor 2: Extension Period
-    status, status_text = get_factor_status("Extension Period", extension_days)
+    status, status_text = statuses['extension']
     st.markdown(
         render_factor_indicator(
             "Extension Period",
@@ -381,7 +703,7 @@ def render_business_explanation(request, ai_result):
     )
     
     # Factor 3: Vendor Reliability
-    status, status_text = get_factor_status("Vendor Reliability", vendor_reliability)
+    status, status_text = statuses['vendor']
     st.markdown(
         render_factor_indicator(
             "Vendor Reliability Score",
@@ -393,8 +715,24 @@ def render_business_explanation(request, ai_result):
         unsafe_allow_html=True
     )
     
+    # Our own decision history with this vendor (informational, not scored)
+    profile = ai_result.get('vendor_profile')
+    if profile:
+        approval_rate = f"{profile['approval_rate']*100:.0f}%" if profile['approval_rate'] is not None else "n/a"
+        extension = (f", {profile['avg_extension_days']:.0f} days extension on average"
+                     if profile['avg_extension_days'] is not None else "")
+        st.caption(
+            f"📒 Our history with {request.get('vendor_name')}: {profile['decisions']:.1f} recent decisions "
+            f"({approval_rate} approved), ${profile['exposure']:,.0f} requested, "
+            f"~{profile['requests_per_30_days']:.1f} requests per 30 days{extension}, last decided "
+            f"{profile['last_decision']:%Y-%m-%d}. Older decisions count half every "
+            f"{VENDOR_PROFILE_HALF_LIFE_DAYS} days."
+        )
+    else:
+        st.caption(f"📒 No decisions on record yet for {request.get('vendor_name')}.")
+    
     # Factor 4: Payment History
-    status, status_text = get_factor_status("Payment History", payment_history)
+    status, status_text = statuses['payment']
     st.markdown(
         render_factor_indicator(
             "Payment History Score",
@@ -407,7 +745,7 @@ def render_business_explanation(request, ai_result):
     )
     
     # Factor 5: Cash Flow Impact
-    status, status_text = get_factor_status("Cash Flow Impact", cash_flow)
+    status, status_text = statuses['cash_flow']
     st.markdown(
         render_factor_indicator(
             "Cash Flow Impact",
@@ -420,7 +758,7 @@ def render_business_explanation(request, ai_result):
     )
     
     # Factor 6: Priority Level
-    status, status_text = get_factor_status("Priority Level", priority)
+    status, status_text = statuses['priority']
     st.markdown(
         render_factor_indicator(
             "Request Priority",
@@ -603,40 +941,38 @@ Confidence = {base:.3f} × {amount_factor:.3f} = {ai_result.get('confidence_scor
     
     # Decision Logic
     st.markdown("##### Decision Tree Logic")
-    st.code("""
-def determine_decision(confidence, risk, amount):
-    # High confidence and low risk
-    if confidence >= 0.80 and risk < 0.4:
-        return 'Approved'
-    
-    # Low confidence or high risk
-    if confidence < 0.60 or risk > 0.7:
-        if amount > 50000:
-            return 'Escalate'
-        else:
-            return 'Rejected'
+    st.code(st.session_state.ai_engine.policy.describe(), language='python')
     
-    # Moderate confidence and acceptable risk
-    if risk < 0.6 and confidence > 0.6:
-        return 'Approved'
-    
-    # Default to escalation
-    return 'Escalate'
-    """, language='python')
-    
-    # Model Performance Metrics (Simulated)
+    # Model Performance Metrics (engine decision vs final decision)
     st.markdown("##### Model Performance Metrics")
-    st.markdown("*Based on historical decision patterns*")
+    col_caption, col_window = st.columns([3, 1])
+    with col_window:
+        window = st.selectbox(
+            "Window",
+            list(METRICS_WINDOWS),
+            index=list(METRICS_WINDOWS).index(METRICS_DEFAULT_WINDOW),
+            key="metrics_window",
+            label_visibility="collapsed"
+        )
+    days = METRICS_WINDOWS[window]
+    start = datetime.now().date() - timedelta(days=days) if days else None
+    metrics = st.session_state.data_manager.get_model_metrics(start)
+    with col_caption:
+        st.markdown(f"*AI decision vs final decision on {metrics['decisions']:,} requests "
+                    f"({window.lower()}); positive class = Approved, AUC ranks by confidence*")
+    
+    def format_metric(value):
+        return f"{value:.2f}" if value is not None else "n/a"
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Precision", "0.89")
+        st.metric("Precision", format_metric(metrics['precision']))
     with col2:
-        st.metric("Recall", "0.92")
+        st.metric("Recall", format_metric(metrics['recall']))
     with col3:
-        st.metric("F1 Score", "0.90")
+        st.metric("F1 Score", format_metric(metrics['f1']))
     with col4:
-        st.metric("AUC-ROC", "0.94")
+        st.metric("AUC-ROC", format_metric(metrics['auc']))
     
     # Feature Importance Chart
     st.markdown("##### Feature Importance")
@@ -644,6 +980,7 @@ def determine_decision(confidence, risk, amount):
         'Feature': ['Amount', 'Extension', 'Vendor', 'Payment', 'Cash Flow', 'Priority'],
         'Weight': [0.25, 0.20, 0.20, 0.15, 0.15, 0.05]
     }
+    import plotly.express as px
     fig = px.bar(
         importance_data,
         x='Weight',
@@ -671,19 +1008,59 @@ def render_review_requests():
     st.markdown("## 📋 Review Payment Extension Requests")
     
     # Check if there are pending requests
-    if st.session_state.requests_df.empty:
+    if get_requests_df().empty:
         st.info("🎉 No pending requests to review. All caught up!")
         return
     
-    # Request selector
-    request_options = [
-        f"{row['request_id']} - {row['vendor_name']} (${row['invoice_amount']:,.2f})"
-        for _, row in st.session_state.requests_df.iterrows()
-    ]
+    render_quarantine()
+    
+    review_mode = st.radio(
+        "Review mode:",
+        ["🔎 Single Request", "📦 Bulk Review"],
+        horizontal=True,
+        key='review_mode'
+    )
+    
+    if review_mode == "📦 Bulk Review":
+        release_lease()
+        render_bulk_review()
+        return
+    
+    # Queue ordering and "next best" claim
+    col_order, col_next = st.columns([3, 1])
+    
+    with col_order:
+        queue_order = st.selectbox(
+            "Order queue by:",
+            options=list(REVIEW_QUEUE_ORDERS.keys()),
+            index=list(REVIEW_QUEUE_ORDERS.keys()).index(REVIEW_QUEUE_DEFAULT_ORDER),
+            key='queue_order'
+        )
+    
+    # Request selector - labels are precomputed when requests are queued, and
+    # requests leased by other reviewers are left out
+    queue = st.session_state.data_manager.get_review_queue(queue_order, st.session_state.reviewer_id)
+    label_to_id = {label: request_id for request_id, label, _ in queue}
+    
+    with col_next:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("⏭️ Next Best Request", use_container_width=True):
+            next_id = st.session_state.data_manager.claim_next_request(
+                st.session_state.reviewer_id, queue_order
+            )
+            next_label = next((label for label, rid in label_to_id.items() if rid == next_id), None)
+            if next_label:
+                st.session_state.request_selector = next_label
+            else:
+                st.info("No unclaimed requests left in the queue.")
+    
+    if not label_to_id:
+        st.info("All pending requests are currently being reviewed by others.")
+        return
     
     selected_option = st.selectbox(
         "Select a request to review:",
-        options=request_options,
+        options=list(label_to_id.keys()),
         key='request_selector'
     )
     
@@ -691,13 +1068,26 @@ def render_review_requests():
         return
     
     # Get selected request
-    request_id = selected_option.split(' - ')[0]
-    selected_request = st.session_state.requests_df[
-        st.session_state.requests_df['request_id'] == request_id
+    request_id = label_to_id[selected_option]
+    
+    # Lease the request while it is on screen; every rerun renews the lease
+    if st.session_state.get('leased_request') == request_id:
+        has_lease = st.session_state.data_manager.heartbeat_request(request_id, st.session_state.reviewer_id)
+    else:
+        has_lease = st.session_state.data_manager.claim_request(request_id, st.session_state.reviewer_id)
+    
+    if not has_lease:
+        st.session_state.leased_request = None
+        st.warning(f"⏳ {request_id} was just picked up by another reviewer. Please select another request.")
+        return
+    
+    st.session_state.leased_request = request_id
+    selected_request = get_requests_df()[
+        get_requests_df()['request_id'] == request_id
     ].iloc[0].to_dict()
     
     # Get AI decision
-    ai_result = st.session_state.ai_engine.make_decision(selected_request)
+    ai_result = get_ai_result(selected_request)
     
     st.markdown("---")
     
@@ -840,15 +1230,233 @@ def render_review_requests():
         
         with col_send3:
             if st.button("❌ Cancel", use_container_width=True):
+                release_lease()
                 st.session_state.pending_decision = None
                 st.session_state.current_ai_result = None
                 st.session_state.selected_request = None
                 st.rerun()
 
 
+def render_quarantine():
+    """Requests held back by ingest screening, with release and discard actions"""
+    quarantined = st.session_state.data_manager.get_quarantined_requests()
+    quarantined = quarantined[quarantined['request_id'].isin(get_requests_df()['request_id'].astype(str))]
+    if quarantined.empty:
+        return
+    
+    with st.expander(f"🚧 Quarantined Requests ({len(quarantined)})"):
+        st.caption("Held back from review on ingest as possible duplicates or unusual amounts. "
+                   "Release a request to send it on to review, or discard it from the pending list.")
+        display_df = pd.DataFrame({
+            'Request ID': quarantined['request_id'],
+            'Vendor': quarantined['vendor_name'],
+            'Amount': quarantined['invoice_amount'].map('${:,.2f}'.format),
+            'Due Date': quarantined['original_due_date'],
+            'Reasons': quarantined['reasons'],
+            'Amount z-score': quarantined['amount_zscore'].round(1),
+            'Quarantined': quarantined['quarantined_at']
+        })
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
+        
+        col_select, col_release, col_discard = st.columns([2, 1, 1])
+        with col_select:
+            request_id = st.selectbox("Quarantined request:", quarantined['request_id'].tolist(),
+                                      key='quarantine_selector')
+        with col_release:
+            st.markdown("<br>", unsafe_allow_html=True)
+            release = st.button("✅ Release to Review", use_container_width=True)
+        with col_discard:
+            st.markdown("<br>", unsafe_allow_html=True)
+            discard = st.button("🗑️ Discard", use_container_width=True)
+        
+        if release or discard:
+            data_manager = st.session_state.data_manager
+            resolve = data_manager.release_quarantined if release else data_manager.discard_quarantined
+            if resolve(request_id, "Current User"):
+                load_session_data()
+                st.rerun()
+            else:
+                st.warning(f"{request_id} was already resolved by someone else.")
+
+
+def render_bulk_review():
+    """Render bulk review: filter, multi-select, preview emails, commit at once"""
+    st.markdown("### 📦 Bulk Review")
+    st.markdown("*Select many requests, preview the vendor emails, and record all decisions in one write.*")
+    
+    queue_order = st.session_state.get('queue_order', REVIEW_QUEUE_DEFAULT_ORDER)
+    queue = st.session_state.data_manager.get_review_queue(queue_order, st.session_state.reviewer_id)
+    queue_rank = {request_id: rank for rank, (request_id, _, _) in enumerate(queue)}
+    
+    requests_df = get_requests_df()
+    candidates = requests_df[requests_df['request_id'].isin(queue_rank)]
+    if candidates.empty:
+        st.info("All pending requests are currently being reviewed by others.")
+        return
+    
+    requests_by_id = {request['request_id']: request for request in candidates.to_dict('records')}
+    ai_results = {
+        request_id: get_ai_result(request)
+        for request_id, request in requests_by_id.items()
+    }
+    
+    # Filters
+    col_f1, col_f2, col_f3 = st.columns(3)
+    
+    with col_f1:
+        ai_filter = st.multiselect(
+            "AI Recommendation",
+            options=['Approved', 'Rejected', 'Escalate'],
+            default=['Approved']
+        )
+    
+    with col_f2:
+        max_amount = st.number_input("Max Invoice Amount ($)", min_value=0, value=20000, step=1000)
+    
+    with col_f3:
+        bulk_decision = st.radio("Decision for selected", ['Approved', 'Rejected'], horizontal=True)
+    
+    matching_ids = sorted(
+        (
+            request_id for request_id, request in requests_by_id.items()
+            if ai_results[request_id]['decision'] in ai_filter
+            and float(request['invoice_amount']) <= max_amount
+        ),
+        key=queue_rank.get
+    )
+    
+    if not matching_ids:
+        st.info("No requests match the current filters.")
+        return
+    
+    queue_status = get_queue_factor_status()
+    red_flags = pd.Series(red_flag_counts(queue_status), index=queue_status.index)
+    
+    selection_df = pd.DataFrame({
+        'Select': True,
+        'request_id': matching_ids,
+        'vendor_name': [requests_by_id[rid]['vendor_name'] for rid in matching_ids],
+        'invoice_amount': [requests_by_id[rid]['invoice_amount'] for rid in matching_ids],
+        'red_flags': red_flags.loc[matching_ids].to_numpy(),
+        'ai_decision': [ai_results[rid]['decision'] for rid in matching_ids],
+        'confidence_score': [ai_results[rid]['confidence_score'] for rid in matching_ids],
+        'risk_score': [ai_results[rid]['risk_score'] for rid in matching_ids]
+    })
+    
+    edited_df = st.data_editor(
+        selection_df,
+        use_container_width=True,
+        hide_index=True,
+        disabled=[col for col in selection_df.columns if col != 'Select'],
+        key=f"bulk_editor_{hash(tuple(matching_ids))}"
+    )
+    selected_ids = edited_df.loc[edited_df['Select'], 'request_id'].tolist()
+    
+    col_m1, col_m2 = st.columns(2)
+    with col_m1:
+        st.metric("Selected Requests", len(selected_ids))
+    with col_m2:
+        selected_total = sum(float(requests_by_id[rid]['invoice_amount']) for rid in selected_ids)
+        st.metric("Selected Value", f"${selected_total:,.2f}")
+    
+    if not selected_ids:
+        return
+    
+    # Aggregated email preview
+    emails = [
+        generate_email_response(requests_by_id[rid], bulk_decision, ai_results[rid])
+        for rid in selected_ids
+    ]
+    with st.expander(f"📨 Email Preview ({len(emails)} emails)", expanded=False):
+        for email in emails[:3]:
+            st.markdown(render_email_preview(email), unsafe_allow_html=True)
+        if len(emails) > 3:
+            st.caption(f"... and {len(emails) - 3} more. Download the batch to review all of them.")
+        st.download_button(
+            label="📥 Download All Emails",
+            data=st.session_state.data_manager.mask_export_text("\n\n".join(emails)),
+            file_name=f"bulk_emails_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+            mime="text/plain"
+        )
+    
+    if st.button(f"📤 Send {len(selected_ids)} Emails & Complete", type="primary"):
+        process_bulk_decisions(
+            [requests_by_id[rid] for rid in selected_ids],
+            bulk_decision,
+            ai_results
+        )
+
+
+def process_bulk_decisions(requests, decision, ai_results):
+    """Lease, record and remove a batch of requests with one write per table"""
+    
+    # Lease the whole batch first so no other reviewer decides the same request
+    request_ids = [request['request_id'] for request in requests]
+    claimed_ids = set(st.session_state.data_manager.claim_requests_batch(
+        request_ids, st.session_state.reviewer_id
+    ))
+    skipped_ids = [rid for rid in request_ids if rid not in claimed_ids]
+    
+    decision_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    decisions = [
+        {
+            'request_id': request['request_id'],
+            'decision_date': decision_date,
+            'ai_decision': ai_results[request['request_id']]['decision'],
+            'confidence_score': ai_results[request['request_id']]['confidence_score'],
+            'human_review': True,
+            'final_decision': decision,
+            'processing_time_seconds': ai_results[request['request_id']]['processing_time'],
+            'vendor_name': request['vendor_name'],
+            'invoice_amount': request['invoice_amount']
+        }
+        for request in requests
+        if request['request_id'] in claimed_ids
+    ]
+    
+    if not st.session_state.data_manager.commit_decisions_batch(decisions):
+        st.session_state.data_manager.release_request(st.session_state.reviewer_id)
+        st.error("❌ Bulk decision could not be saved. No requests were removed from the queue.")
+        return
+    
+    # Update session state
+    st.session_state.processed_count += len(decisions)
+    if decision == 'Approved':
+        st.session_state.approved_count += len(decisions)
+    
+    # Reload data once for the whole batch
+    load_session_data()
+    
+    st.success(f"✅ {len(decisions)} requests {decision.lower()}.")
+    if skipped_ids:
+        st.warning(f"⏳ Skipped {len(skipped_ids)} requests picked up by other reviewers: {', '.join(skipped_ids)}")
+    else:
+        st.balloons()
+        st.rerun()
+
+
+def release_lease():
+    """Release the request this session is holding, if any"""
+    if st.session_state.get('leased_request'):
+        st.session_state.data_manager.release_request(
+            st.session_state.reviewer_id, st.session_state.leased_request
+        )
+        st.session_state.leased_request = None
+
+
 def process_decision(request, decision, ai_result):
     """Process and save the decision"""
     
+    # Only the lease holder may decide - prevents duplicate decisions
+    if not st.session_state.data_manager.heartbeat_request(request['request_id'], st.session_state.reviewer_id):
+        st.error(f"⚠️ Your lease on {request['request_id']} expired and another reviewer picked it up. "
+                 "No decision was recorded.")
+        st.session_state.pending_decision = None
+        st.session_state.current_ai_result = None
+        st.session_state.selected_request = None
+        st.session_state.leased_request = None
+        return
+    
     # Create decision record
     decision_data = {
         'request_id': request['request_id'],
@@ -873,8 +1481,9 @@ def process_decision(request, decision, ai_result):
         details=f"Email sent to vendor, request {decision.lower()}"
     )
     
-    # Remove from pending requests
+    # Remove from pending requests (this also drops the queue entry and its lease)
     st.session_state.data_manager.remove_request(request['request_id'])
+    st.session_state.leased_request = None
     
     # Update session state
     st.session_state.processed_count += 1
@@ -882,9 +1491,7 @@ def process_decision(request, decision, ai_result):
         st.session_state.approved_count += 1
     
     # Reload data
-    st.session_state.requests_df = st.session_state.data_manager.load_requests()
-    st.session_state.decisions_df = st.session_state.data_manager.load_decisions()
-    st.session_state.audit_log_df = st.session_state.data_manager.load_audit_log()
+    load_session_data()
     
     # Clear pending decision
     st.session_state.pending_decision = None
@@ -899,6 +1506,75 @@ def process_decision(request, decision, ai_result):
     st.rerun()
 
 
+DECISION_COLORS = {
+    'Approved': KEBOOLA_COLORS['success_green'],
+    'Rejected': KEBOOLA_COLORS['danger_red']
+}
+
+
+def build_decision_trend(decisions_df):
+    """Reports chart: daily decision counts per final decision"""
+    import plotly.express as px
+    
+    dates = pd.to_datetime(decisions_df['decision_date']).dt.date
+    daily_decisions = decisions_df.groupby([dates.rename('date'), 'final_decision']).size().reset_index(name='count')
+    
+    fig = px.line(
+        daily_decisions,
+        x='date',
+        y='count',
+        color='final_decision',
+        title="Daily Decision Trend",
+        color_discrete_map=DECISION_COLORS
+    )
+    fig.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color=KEBOOLA_COLORS['text_dark'])
+    )
+    return fig
+
+
+def build_amount_by_decision(decisions_df):
+    """Reports chart: invoice amount distribution per final decision"""
+    import plotly.express as px
+    
+    fig = px.box(
+        decisions_df,
+        x='final_decision',
+        y='invoice_amount',
+        color='final_decision',
+        title="",
+        color_discrete_map=DECISION_COLORS
+    )
+    fig.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color=KEBOOLA_COLORS['text_dark'])
+    )
+    return fig
+
+
+def build_confidence_histogram(decisions_df):
+    """Reports chart: confidence score distribution per final decision"""
+    import plotly.express as px
+    
+    fig = px.histogram(
+        decisions_df,
+        x='confidence_score',
+        color='final_decision',
+        nbins=20,
+        title="",
+        color_discrete_map=DECISION_COLORS
+    )
+    fig.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(color=KEBOOLA_COLORS['text_dark'])
+    )
+    return fig
+
+
 def render_reports():
     """Render the reports page"""
     load_custom_css()
@@ -923,18 +1599,20 @@ def render_reports():
     st.markdown("---")
     
     # Tabs
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "📋 All Pending Requests",
         "📜 Decision History",
         "📈 Analytics",
-        "🔍 Audit Log"
+        "🔍 Audit Log",
+        "🔎 Search"
     ])
     
     # Tab 1: All Pending Requests
     with tab1:
         st.markdown("### All Pending Requests")
         
-        if not st.session_state.requests_df.empty:
+        requests_df = get_requests_df()
+        if not requests_df.empty:
             # Filters
             col_f1, col_f2, col_f3 = st.columns(3)
             
@@ -949,29 +1627,45 @@ def render_reports():
                 amount_range = st.slider(
                     "Invoice Amount Range",
                     min_value=0,
-                    max_value=int(st.session_state.requests_df['invoice_amount'].max()),
-                    value=(0, int(st.session_state.requests_df['invoice_amount'].max()))
+                    max_value=int(requests_df['invoice_amount'].max()),
+                    value=(0, int(requests_df['invoice_amount'].max()))
                 )
             
             with col_f3:
                 vendor_filter = st.multiselect(
                     "Filter by Vendor",
-                    options=sorted(st.session_state.requests_df['vendor_name'].unique()),
-                    default=sorted(st.session_state.requests_df['vendor_name'].unique())
+                    options=sorted(requests_df['vendor_name'].unique()),
+                    default=sorted(requests_df['vendor_name'].unique())
                 )
             
-            # Apply filters
-            filtered_df = st.session_state.requests_df[
-                (st.session_state.requests_df['priority'].isin(priority_filter)) &
-                (st.session_state.requests_df['invoice_amount'] >= amount_range[0]) &
-                (st.session_state.requests_df['invoice_amount'] <= amount_range[1]) &
-                (st.session_state.requests_df['vendor_name'].isin(vendor_filter))
-            ]
+            flag_filter = st.multiselect(
+                "Only requests flagged 🔴 on",
+                options=list(FACTOR_KEYS_BY_NAME)
+            )
             
-            st.dataframe(filtered_df, use_container_width=True, hide_index=True)
+            # Apply filters (statuses are positional: same rows as requests_df)
+            statuses = get_queue_factor_status()
+            mask = (
+                (requests_df['priority'].isin(priority_filter)) &
+                (requests_df['invoice_amount'] >= amount_range[0]) &
+                (requests_df['invoice_amount'] <= amount_range[1]) &
+                (requests_df['vendor_name'].isin(vendor_filter))
+            ).to_numpy()
+            if flag_filter:
+                flag_columns = [f'{FACTOR_KEYS_BY_NAME[name]}_level' for name in flag_filter]
+                mask &= statuses[flag_columns].eq(2).any(axis=1).to_numpy()
+            filtered_df = requests_df[mask]
+            
+            # Colored status badges per factor, plus the number of red factors
+            filtered_status = statuses[mask]
+            display_df = filtered_df.copy()
+            display_df.insert(1, 'Red Flags', red_flag_counts(filtered_status))
+            for key, rule in FACTOR_STATUS_RULES.items():
+                display_df[rule['short_name']] = factor_badges(filtered_status, key)
+            st.dataframe(display_df, use_container_width=True, hide_index=True)
             
             # Download button
-            csv = filtered_df.to_csv(index=False)
+            csv = st.session_state.data_manager.mask_export(filtered_df, 'requests').to_csv(index=False)
             st.download_button(
                 label="📥 Download CSV",
                 data=csv,
@@ -985,7 +1679,7 @@ def render_reports():
     with tab2:
         st.markdown("### Decision History")
         
-        if not st.session_state.decisions_df.empty:
+        if not get_decisions_df().empty:
             # Filters
             col_f1, col_f2, col_f3 = st.columns(3)
             
@@ -1005,13 +1699,11 @@ def render_reports():
             with col_f3:
                 min_confidence = st.slider("Min Confidence Score", 0.0, 1.0, 0.0)
             
-            # Apply filters
-            filtered_decisions = st.session_state.decisions_df.copy()
-            filtered_decisions['decision_date'] = pd.to_datetime(filtered_decisions['decision_date'])
+            # Apply filters - only partitions inside the window are read
+            filtered_decisions = st.session_state.data_manager.load_decisions(start=cutoff_date)
             
             filtered_decisions = filtered_decisions[
                 (filtered_decisions['final_decision'].isin(decision_filter)) &
-                (filtered_decisions['decision_date'] >= cutoff_date) &
                 (filtered_decisions['confidence_score'] >= min_confidence)
             ]
             
@@ -1032,31 +1724,12 @@ def render_reports():
     with tab3:
         st.markdown("### Analytics Dashboard")
         
-        if not st.session_state.decisions_df.empty:
-            decisions_df = st.session_state.decisions_df.copy()
-            decisions_df['decision_date'] = pd.to_datetime(decisions_df['decision_date'])
-            decisions_df['date'] = decisions_df['decision_date'].dt.date
+        decisions_df = get_decisions_df()
+        if not decisions_df.empty:
             
             # Chart 1: Decisions over time
             st.markdown("#### Decisions Over Time")
-            daily_decisions = decisions_df.groupby(['date', 'final_decision']).size().reset_index(name='count')
-            
-            fig = px.line(
-                daily_decisions,
-                x='date',
-                y='count',
-                color='final_decision',
-                title="Daily Decision Trend",
-                color_discrete_map={
-                    'Approved': KEBOOLA_COLORS['success_green'],
-                    'Rejected': KEBOOLA_COLORS['danger_red']
-                }
-            )
-            fig.update_layout(
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font=dict(color=KEBOOLA_COLORS['text_dark'])
-            )
+            fig = get_cached_figure('reports_trend', build_decision_trend, decisions_df)
             st.plotly_chart(fig, use_container_width=True)
             
             # Chart 2: Amount by Decision Type
@@ -1064,42 +1737,12 @@ def render_reports():
             
             with col_chart1:
                 st.markdown("#### Amount Distribution by Decision")
-                fig = px.box(
-                    decisions_df,
-                    x='final_decision',
-                    y='invoice_amount',
-                    color='final_decision',
-                    title="",
-                    color_discrete_map={
-                        'Approved': KEBOOLA_COLORS['success_green'],
-                        'Rejected': KEBOOLA_COLORS['danger_red']
-                    }
-                )
-                fig.update_layout(
-                    plot_bgcolor='white',
-                    paper_bgcolor='white',
-                    font=dict(color=KEBOOLA_COLORS['text_dark'])
-                )
+                fig = get_cached_figure('reports_amounts', build_amount_by_decision, decisions_df)
                 st.plotly_chart(fig, use_container_width=True)
             
             with col_chart2:
                 st.markdown("#### Confidence Score Distribution")
-                fig = px.histogram(
-                    decisions_df,
-                    x='confidence_score',
-                    color='final_decision',
-                    nbins=20,
-                    title="",
-                    color_discrete_map={
-                        'Approved': KEBOOLA_COLORS['success_green'],
-                        'Rejected': KEBOOLA_COLORS['danger_red']
-                    }
-                )
-                fig.update_layout(
-                    plot_bgcolor='white',
-                    paper_bgcolor='white',
-                    font=dict(color=KEBOOLA_COLORS['text_dark'])
-                )
+                fig = get_cached_figure('reports_confidence', build_confidence_histogram, decisions_df)
                 st.plotly_chart(fig, use_container_width=True)
             
             # Summary Statistics
@@ -1121,6 +1764,24 @@ def render_reports():
             with stat_col4:
                 approval_rate = (len(decisions_df[decisions_df['final_decision'] == 'Approved']) / len(decisions_df)) * 100
                 st.metric("Approval Rate", f"{approval_rate:.1f}%")
+            
+            # Vendor Risk Profiles
+            st.markdown("#### Vendor Risk Profiles")
+            st.caption(f"Decision history per vendor; a decision counts half every {VENDOR_PROFILE_HALF_LIFE_DAYS} days")
+            profiles = st.session_state.data_manager.sync_vendor_profiles().frame()
+            profiles_df = pd.DataFrame({
+                'Vendor': profiles.index,
+                'Recent Decisions': profiles['decisions'].round(1).to_numpy(),
+                'Approval Rate (%)': (profiles['approval_rate'] * 100).round(0).to_numpy(),
+                'Rejected': profiles['rejected'].round(1).to_numpy(),
+                'Requested ($)': profiles['exposure'].round(0).to_numpy(),
+                'Avg Amount ($)': profiles['avg_amount'].round(0).to_numpy(),
+                'Requests / 30 Days': profiles['requests_per_30_days'].round(1).to_numpy(),
+                'Avg Extension (days)': profiles['avg_extension_days'].round(1).to_numpy(),
+                'Extension Days / 30 Days': profiles['extension_days_per_30_days'].round(1).to_numpy(),
+                'Last Decision': pd.to_datetime(profiles['last_decision']).dt.strftime('%Y-%m-%d').to_numpy()
+            })
+            st.dataframe(profiles_df, use_container_width=True, hide_index=True)
         
         else:
             st.info("No analytics data available yet")
@@ -1129,36 +1790,51 @@ def render_reports():
     with tab4:
         st.markdown("### Audit Log")
         
-        if not st.session_state.audit_log_df.empty:
+        known_actions, known_users = st.session_state.data_manager.get_audit_filter_options()
+        
+        if known_actions:
             # Filters
-            col_f1, col_f2 = st.columns(2)
+            col_f1, col_f2, col_f3 = st.columns(3)
             
             with col_f1:
-                action_types = st.session_state.audit_log_df['action'].unique()
                 action_filter = st.multiselect(
                     "Filter by Action",
-                    options=sorted(action_types),
-                    default=sorted(action_types)
+                    options=sorted(known_actions),
+                    default=sorted(known_actions)
                 )
             
             with col_f2:
-                users = st.session_state.audit_log_df['user'].unique()
                 user_filter = st.multiselect(
                     "Filter by User",
-                    options=sorted(users),
-                    default=sorted(users)
+                    options=sorted(known_users),
+                    default=sorted(known_users)
+                )
+            
+            with col_f3:
+                audit_days_back = st.slider("Days back", 1, 365, AUDIT_DEFAULT_WINDOW_DAYS, key='audit_days_back')
+            
+            # Apply filters - the recent window is already in session, older
+            # ranges only open archived segments whose manifest entry can match
+            if audit_days_back <= AUDIT_DEFAULT_WINDOW_DAYS:
+                audit_df = get_audit_log_df()
+            else:
+                audit_df = st.session_state.data_manager.load_audit_log(
+                    start=datetime.now() - timedelta(days=audit_days_back),
+                    actions=action_filter,
+                    users=user_filter
                 )
             
-            # Apply filters
-            filtered_audit = st.session_state.audit_log_df[
-                (st.session_state.audit_log_df['action'].isin(action_filter)) &
-                (st.session_state.audit_log_df['user'].isin(user_filter))
+            audit_cutoff = datetime.now() - timedelta(days=audit_days_back)
+            filtered_audit = audit_df[
+                (audit_df['timestamp'] >= audit_cutoff) &
+                (audit_df['action'].isin(action_filter)) &
+                (audit_df['user'].isin(user_filter))
             ]
             
             st.dataframe(filtered_audit, use_container_width=True, hide_index=True)
             
             # Download button
-            csv = filtered_audit.to_csv(index=False)
+            csv = st.session_state.data_manager.mask_export(filtered_audit, 'audit').to_csv(index=False)
             st.download_button(
                 label="📥 Download CSV",
                 data=csv,
@@ -1167,110 +1843,253 @@ def render_reports():
             )
         else:
             st.info("No audit log entries to display")
+    
+    # Tab 5: Full-Text Search
+    with tab5:
+        st.markdown("### Search Requests & Audit Log")
+        st.markdown("*Searches request reasons, vendor names and audit details. Use \"quotes\" for exact phrases.*")
+        
+        col_s1, col_s2 = st.columns([3, 1])
+        
+        with col_s1:
+            search_text = st.text_input(
+                "Search",
+                placeholder='e.g. "supply chain" or REQ-1015',
+                label_visibility="collapsed"
+            )
+        
+        with col_s2:
+            source_labels = {'Requests': 'request', 'Audit Log': 'audit'}
+            source_filter = st.multiselect(
+                "Sources",
+                options=list(source_labels.keys()),
+                default=list(source_labels.keys()),
+                label_visibility="collapsed"
+            )
+        
+        if search_text:
+            results_df, elapsed_ms = st.session_state.data_manager.search(
+                search_text,
+                sources=[source_labels[label] for label in source_filter]
+            )
+            
+            if not results_df.empty:
+                pending_ids = set(get_requests_df()['request_id'])
+                results_df['status'] = [
+                    'Pending' if request_id in pending_ids else ('Processed' if source == 'request' else '')
+                    for source, request_id in zip(results_df['source'], results_df['request_id'])
+                ]
+                st.caption(f"{len(results_df)} results in {elapsed_ms:.1f} ms")
+                st.dataframe(
+                    results_df[['source', 'request_id', 'status', 'vendor_name', 'snippet', 'timestamp']],
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.info(f"No matches for \"{search_text}\" ({elapsed_ms:.1f} ms)")
 
 
 def get_governance_compliance_data():
-    """Generate mock AI governance compliance data"""
+    """AI governance compliance data (C2 from the risk audit, C15 from PII masking, C22 from data profiling)"""
     return {
-        "C2": {
-            "status": "Compliant",
-            "last_checked": datetime.now() - timedelta(hours=2),
-            "findings": [
-                "Risk classification model properly implemented using weighted scoring system",
-                "All invoice amounts categorized correctly (Low: <$20k, Medium: $20k-$50k, High: >$50k)",
-                "Risk thresholds aligned with business requirements and regulatory guidelines",
-                "Six decision factors weighted appropriately (Amount: 25%, Extension: 20%, Vendor: 20%, Payment: 15%, Cash Flow: 15%, Priority: 5%)",
-                "Risk score calculation validated against 1,247 historical cases with 94% accuracy",
-                "Confidence scoring mechanism includes vendor reliability and payment history metrics"
-            ],
-            "metrics": {
-                "Model Accuracy": "94%",
-                "Coverage": "100%",
-                "Validation Cases": "1,247",
-                "Last Updated": "2 hours ago"
-            },
-            "technical_details": {
-                "Risk Model Type": "Weighted Scoring System",
-                "Decision Thresholds": "Auto-approve: >80% confidence, <40% risk | Auto-reject: <60% confidence, >70% risk",
-                "Features Used": "6 (Amount, Extension Days, Vendor Reliability, Payment History, Cash Flow, Priority)",
-                "Escalation Logic": "High amounts (>$50k) with moderate risk escalate to human review"
-            },
-            "compliance_evidence": [
-                "Model documentation completed and approved by compliance team",
-                "Threshold validation completed on 2024-10-15",
-                "Risk assessment methodology aligned with EU AI Act requirements",
-                "Regular bias testing conducted quarterly (last: 2024-09-30)"
-            ]
+        "C2": get_risk_audit_compliance(),
+        "C15": get_pii_compliance(),
+        "C22": get_profiling_compliance()
+    }
+
+
+def get_risk_audit_compliance():
+    """C2 card from the risk-classification audit (recomputed only when history or engine settings change)"""
+    ai_engine = st.session_state.ai_engine
+    audit = st.session_state.data_manager.get_risk_audit(ai_engine)
+    if audit is None:
+        return {
+            "status": "Non-Compliant",
+            "last_checked": datetime.now(),
+            "findings": ["⚠️ Risk classification audit could not run; see the server log"],
+            "metrics": {"Validation Cases": "0"}
+        }
+    
+    def percent(rate):
+        return "n/a" if rate is None else f"{rate * 100:.0f}%"
+    
+    low, high = RISK_THRESHOLDS['amount']['low'], RISK_THRESHOLDS['amount']['high']
+    weights = ", ".join(f"{name.replace('_', ' ').title()}: {weight * 100:.0f}%"
+                        for name, weight in ai_engine.weights.items())
+    findings = [
+        f"Risk score re-computed for {audit['cases']:,} historical cases with the current weights and policy",
+        f"Invoice amounts tiered by RISK_THRESHOLDS (Low: <${low / 1000:,.0f}k, "
+        f"Medium: ${low / 1000:,.0f}k-${high / 1000:,.0f}k, High: >=${high / 1000:,.0f}k)",
+        f"Six decision factors weighted ({weights})"
+    ]
+    if audit['accuracy'] is None:
+        findings.append("⚠️ No automatic decisions to validate against recorded outcomes")
+    elif audit['accuracy'] < RISK_AUDIT_MIN_ACCURACY:
+        examples = f" (e.g. {', '.join(audit['mismatches'])})" if audit['mismatches'] else ""
+        findings.append(f"⚠️ Automatic decisions match the final outcome in {percent(audit['accuracy'])} of "
+                        f"{audit['auto_cases']:,} cases, below {percent(RISK_AUDIT_MIN_ACCURACY)}{examples}")
+    else:
+        findings.append(f"Automatic decisions match the final outcome in {percent(audit['accuracy'])} of "
+                        f"{audit['auto_cases']:,} cases")
+    if audit['cases'] and audit['reproducibility'] < RISK_AUDIT_MIN_REPRODUCIBILITY:
+        findings.append(f"⚠️ Only {percent(audit['reproducibility'])} of re-scored decisions match the recorded "
+                        f"AI decision: settings changed since those decisions were made")
+    elif audit['cases']:
+        findings.append(f"{percent(audit['reproducibility'])} of re-scored decisions match the recorded AI decision")
+    if audit['status'] == 'Insufficient Data':
+        findings.insert(0, f"⚠️ Insufficient data: only {audit['cases']:,} of {audit['decisions_total']:,} "
+                           f"decisions ({percent(audit['coverage'])}) have archived request features, below "
+                           f"the {percent(RISK_AUDIT_MIN_COVERAGE)} needed for a verdict")
+    elif audit['cases'] < audit['decisions_total']:
+        findings.append(f"⚠️ {audit['decisions_total'] - audit['cases']:,} decisions have no archived request "
+                        f"features and could not be re-scored")
+    findings.append(f"{percent(audit['escalation_rate'])} of historical cases escalate to human review")
+    
+    versions = audit['data_versions']
+    return {
+        "status": audit['status'],
+        "last_checked": audit['audited_at'],
+        "findings": findings,
+        "metrics": {
+            "Model Accuracy": percent(audit['accuracy']),
+            "Coverage": percent(audit['coverage']),
+            "Validation Cases": f"{audit['cases']:,}",
+            "Reproducibility": percent(audit['reproducibility'])
         },
-        "C15": {
-            "status": "Warning",
-            "last_checked": datetime.now() - timedelta(hours=5),
-            "findings": [
-                "PII detection active and masking vendor email addresses and phone numbers",
-                "GDPR Article 22 compliance: Human oversight integrated for all automated decisions",
-                "Data minimization principle applied - only necessary fields collected",
-                "Right to explanation implemented through detailed AI reasoning display",
-                "⚠️ Warning: Manual review required for cross-border payments (GDPR Article 44-50)",
-                "Audit trail maintained for all decisions with timestamp and user information"
-            ],
-            "metrics": {
-                "PII Fields Masked": "3",
-                "GDPR Compliance Score": "87%",
-                "Human Review Rate": "100%",
-                "Last Updated": "5 hours ago"
-            },
-            "technical_details": {
-                "AI System Classification": "Limited Risk System (EU AI Act Article 52)",
-                "Transparency Level": "High - Full explainability provided",
-                "Human Oversight": "Mandatory human review for all final decisions",
-                "Data Retention": "7 years (aligned with financial regulations)"
-            },
-            "compliance_evidence": [
-                "GDPR Data Protection Impact Assessment completed (2024-08-01)",
-                "EU AI Act conformity assessment in progress",
-                "Human-in-the-loop workflow verified and documented",
-                "Transparency notices displayed to all users",
-                "Data Processing Agreement with vendors in place"
-            ],
-            "action_items": [
-                "Review cross-border payment policy documentation",
-                "Complete EU AI Act conformity assessment by 2025-01-15",
-                "Update data transfer impact assessment for non-EU vendors"
-            ]
+        "technical_details": {
+            "Risk Model Type": "Weighted Scoring System",
+            "Decision Policy": f"{ai_engine.policy.name} ({len(ai_engine.policy.rules)} rules, decision_policy.json)",
+            "Execution": f"Batch re-score of the archived history in {audit['elapsed_ms']:.1f} ms (risk_audit.py)",
+            "Update Frequency": (f"Saved to the data directory and recomputed when the decisions, archive or engine "
+                                 f"settings change (audited at decisions v{versions['decisions']}, "
+                                 f"archive v{versions['archive']})")
         },
-        "C22": {
-            "status": "Compliant",
-            "last_checked": datetime.now() - timedelta(minutes=30),
-            "findings": [
-                "Profiling rules executed successfully on all incoming requests",
-                "All data quality checks passed with 100% success rate",
-                "No anomalies detected in recent batch (last 100 requests)",
-                "Vendor reliability scores validated against external credit ratings",
-                "Payment history calculations verified with accounting system data",
-                "Extension period validation confirms no requests exceed 30-day maximum",
-                "Cash flow impact assessments properly categorized based on company liquidity position"
-            ],
-            "metrics": {
-                "Rules Executed": "12",
-                "Success Rate": "100%",
-                "Requests Profiled": "1,543",
-                "Last Updated": "30 minutes ago"
-            },
-            "technical_details": {
-                "Profiling Scope": "All incoming invoice extension requests",
-                "Validation Rules": "12 automated checks covering data completeness, consistency, and accuracy",
-                "Data Sources": "Internal ERP, External Credit Bureau, Payment Gateway",
-                "Update Frequency": "Real-time for new requests, daily batch for historical data"
-            },
-            "compliance_evidence": [
-                "Profiling rules documented and version-controlled in Git repository",
-                "Data lineage tracking implemented for all profiled fields",
-                "Automated testing suite with 98% code coverage",
-                "Performance monitoring shows <100ms average profiling time",
-                "Error handling and logging mechanisms validated",
-                "Data quality metrics published to business intelligence dashboard"
-            ]
+        "compliance_evidence": [
+            "Model documentation completed and approved by compliance team",
+            "Risk assessment methodology aligned with EU AI Act requirements",
+            "Regular bias testing conducted quarterly (last: 2024-09-30)"
+        ],
+        "results_table": audit['tiers']
+    }
+
+
+def get_pii_compliance():
+    """C15 card from the PII masking totals and a scan of the stored text (re-run when requests or audit change)"""
+    data_manager = st.session_state.data_manager
+    scan = data_manager.get_pii_scan()
+    if scan is None:
+        return {
+            "status": "Non-Compliant",
+            "last_checked": datetime.now(),
+            "findings": ["⚠️ PII scan could not run; see the server log"],
+            "metrics": {"Rows Scanned": "0"}
+        }
+    
+    totals = data_manager.get_masking_totals()
+    masked = int(totals['Values Masked'].sum())
+    findings = [
+        f"PII masking active on ingest, audit writes and exports: {masked:,} value(s) masked since the server started"
+    ]
+    for table, label, note in [
+        ("requests", "pending requests", "masking on ingest was bypassed"),
+        ("audit", "audit entries", "written before masking; exports mask them")
+    ]:
+        report = scan[table]
+        if report['values_masked']:
+            found = ", ".join(f"{count} {pii_type}" for pii_type, count in report['matches'].items() if count)
+            findings.append(f"⚠️ Unmasked PII in {report['rows_with_pii']:,} of {report['rows']:,} {label} "
+                            f"({found}): {note}")
+    if not scan['pii_found']:
+        findings.append(f"No unmasked email addresses, phone numbers, IBANs or card numbers in "
+                        f"{scan['rows_scanned']:,} stored request and audit rows")
+    findings += [
+        "GDPR Article 22 compliance: Human oversight integrated for all automated decisions",
+        "Data minimization principle applied - only necessary fields collected",
+        "Right to explanation implemented through detailed AI reasoning display",
+        "⚠️ Warning: Manual review required for cross-border payments (GDPR Article 44-50)",
+        "Audit trail maintained for all decisions with timestamp and user information"
+    ]
+    
+    versions = scan['data_versions']
+    return {
+        # Unmasked request text means the ingest stage was skipped; the cross-border item keeps it at Warning otherwise
+        "status": "Non-Compliant" if scan['requests']['values_masked'] else "Warning",
+        "last_checked": scan['scanned_at'],
+        "findings": findings,
+        "metrics": {
+            "PII Values Masked": f"{masked:,}",
+            "Unmasked PII Found": f"{scan['pii_found']:,}",
+            "Rows Scanned": f"{scan['rows_scanned']:,}",
+            "Scan Throughput": f"{scan['rows_per_second']:,.0f} rows/s"
+        },
+        "technical_details": {
+            "AI System Classification": "Limited Risk System (EU AI Act Article 52)",
+            "PII Detection": "Email addresses, phone numbers, IBANs and card numbers (pii_masking.py)",
+            "Masked Columns": ", ".join(f"{table} {', '.join(columns)}" for table, columns in PII_TEXT_COLUMNS.items()),
+            "Execution": "Arrow RE2 prefilter, then one precompiled regex per distinct value",
+            "Update Frequency": (f"Scan re-run when the requests or audit version changes "
+                                 f"(scanned at requests v{versions['requests']}, audit v{versions['audit']})"),
+            "Data Retention": "7 years (aligned with financial regulations)"
+        },
+        "compliance_evidence": [
+            "GDPR Data Protection Impact Assessment completed (2024-08-01)",
+            "EU AI Act conformity assessment in progress",
+            "Human-in-the-loop workflow verified and documented",
+            "Transparency notices displayed to all users",
+            "Data Processing Agreement with vendors in place"
+        ],
+        "action_items": [
+            "Review cross-border payment policy documentation",
+            "Complete EU AI Act conformity assessment by 2025-01-15",
+            "Update data transfer impact assessment for non-EU vendors"
+        ],
+        "results_table": totals
+    }
+
+
+def get_profiling_compliance():
+    """C22 card from the data-quality profile (re-run only when requests or decisions change)"""
+    profile = st.session_state.data_manager.get_data_profile()
+    if profile is None:
+        return {
+            "status": "Non-Compliant",
+            "last_checked": datetime.now(),
+            "findings": ["⚠️ Data profiling could not run; see the server log"],
+            "metrics": {"Rules Executed": "0"}
         }
+    
+    results = profile['results']
+    findings = [
+        f"{profile['rules_passed']} of {profile['rules_executed']} profiling rules passed on "
+        f"{profile['requests_profiled']:,} pending requests and {profile['decisions_profiled']:,} decisions"
+    ]
+    for rule in results[results['Failed'] > 0].to_dict('records'):
+        examples = f" (e.g. {rule['Examples']})" if rule['Examples'] else ""
+        findings.append(f"⚠️ {rule['Rule']} {rule['Check']}: {rule['Failed']:,} of {rule['Rows Checked']:,} "
+                        f"{rule['Table']} rows fail{examples}")
+    if not profile['failed_checks']:
+        findings.append("No completeness, range, enum, referential or uniqueness violations found")
+    
+    kinds = results['Kind'].value_counts()
+    versions = profile['data_versions']
+    return {
+        "status": profile['status'],
+        "last_checked": profile['profiled_at'],
+        "findings": findings,
+        "metrics": {
+            "Rules Executed": f"{profile['rules_executed']}",
+            "Success Rate": f"{profile['rules_passed'] / profile['rules_executed'] * 100:.0f}%",
+            "Rows Profiled": f"{profile['rows_profiled']:,}",
+            "Profiling Time": f"{profile['elapsed_ms']:.1f} ms"
+        },
+        "technical_details": {
+            "Profiling Scope": "All pending requests and the full decision history",
+            "Validation Rules": ", ".join(f"{count} {kind}" for kind, count in kinds.items()),
+            "Execution": "Vectorized column checks (data_profiling.py), one pass per rule",
+            "Update Frequency": (f"Re-run when the requests or decisions version changes "
+                                 f"(profiled at requests v{versions['requests']}, decisions v{versions['decisions']})")
+        },
+        "results_table": results
     }
 
 
@@ -1298,7 +2117,8 @@ def render_ai_governance():
     
     # Count statuses
     compliant_count = sum(1 for rule in compliance_data.values() if rule['status'] == 'Compliant')
-    warning_count = sum(1 for rule in compliance_data.values() if rule['status'] == 'Warning')
+    # Rules without enough data for a verdict need attention too
+    warning_count = sum(1 for rule in compliance_data.values() if rule['status'] in ('Warning', 'Insufficient Data'))
     non_compliant_count = sum(1 for rule in compliance_data.values() if rule['status'] == 'Non-Compliant')
     total_rules = len(compliance_data)
     
@@ -1362,6 +2182,9 @@ def render_ai_governance():
         elif rule_data['status'] == 'Warning':
             status_color = KEBOOLA_COLORS['warning_yellow']
             status_icon = "⚠️"
+        elif rule_data['status'] == 'Insufficient Data':
+            status_color = KEBOOLA_COLORS['text_light']
+            status_icon = "❔"
         else:
             status_color = KEBOOLA_COLORS['danger_red']
             status_icon = "❌"
@@ -1398,6 +2221,12 @@ def render_ai_governance():
                 else:
                     st.success(f"✓ {finding}")
             
+            # Per-check results if present
+            if 'results_table' in rule_data:
+                st.markdown("---")
+                st.markdown("**🧾 Check Results**")
+                st.dataframe(rule_data['results_table'], use_container_width=True, hide_index=True)
+            
             # Technical details if present
             if 'technical_details' in rule_data:
                 st.markdown("---")
@@ -1420,15 +2249,158 @@ def render_ai_governance():
                     st.info(f"• {action}")
 
 
+def reset_whatif_controls():
+    """Put every simulator control back to the values in config.py"""
+    for key in list(st.session_state.keys()):
+        if key.startswith('whatif_'):
+            del st.session_state[key]
+
+
+def render_whatif_simulator():
+    """Render the What-If Simulator page"""
+    load_custom_css()
+    
+    # Header
+    st.markdown(render_header_with_logo(), unsafe_allow_html=True)
+    st.markdown("## 🧪 What-If Threshold Simulator")
+    st.markdown("""
+    Replay every decided and pending request under candidate decision thresholds and feature weights,
+    and compare the outcome with the current configuration. Nothing is saved - apply settings you like
+    by editing `DECISION_RULES` / `FEATURE_WEIGHTS` in `config.py`.
+    """)
+    
+    if 'simulator' not in st.session_state:
+        st.session_state.simulator = WhatIfSimulator(
+            st.session_state.data_manager, st.session_state.ai_engine
+        )
+    simulator = st.session_state.simulator
+    simulator.refresh()
+    
+    if simulator.population.empty:
+        st.info("No requests to simulate yet.")
+        return
+    
+    col_rules, col_weights = st.columns(2)
+    
+    with col_rules:
+        st.markdown("#### 🎯 Decision Thresholds")
+        rules = {}
+        for name in st.session_state.ai_engine.policy.parameters:
+            label = name.replace('_', ' ').capitalize()
+            value = DECISION_RULES[name]
+            if value > 1:
+                rules[name] = st.number_input(label, min_value=0.0, value=float(value),
+                                              step=1000.0, key=f"whatif_rule_{name}")
+            else:
+                rules[name] = st.slider(label, 0.0, 1.0, float(value), 0.01, key=f"whatif_rule_{name}")
+    
+    with col_weights:
+        st.markdown("#### ⚖️ Feature Weights")
+        weights = {
+            name: st.slider(name.replace('_', ' ').capitalize(), 0.0, 1.0, float(value), 0.01,
+                            key=f"whatif_weight_{name}")
+            for name, value in FEATURE_WEIGHTS.items()
+        }
+        st.caption(f"Sum of weights: {sum(weights.values()):.2f} (current configuration: "
+                   f"{sum(FEATURE_WEIGHTS.values()):.2f})")
+    
+    col_scope, col_reset = st.columns([3, 1])
+    with col_scope:
+        scope = st.radio("Population", list(SIMULATION_SCOPES), horizontal=True, key="whatif_scope")
+    with col_reset:
+        st.button("↩️ Reset to config.py", on_click=reset_whatif_controls, use_container_width=True)
+    
+    result = simulator.simulate(weights, rules, scope)
+    summary = result['summary']
+    
+    st.markdown("---")
+    st.markdown("### 📊 Outcome")
+    
+    metric_cols = st.columns(len(DECISION_LABELS) + 1)
+    for col, label in zip(metric_cols, DECISION_LABELS):
+        with col:
+            st.metric(
+                label,
+                f"{summary.loc[label, 'What-If Count']:,}",
+                f"{summary.loc[label, 'Count Change']:+,} (${summary.loc[label, 'Exposure Change']:+,.0f})",
+                delta_color="off"
+            )
+    with metric_cols[-1]:
+        st.metric("Decisions Changed", f"{result['changed']:,}", f"of {result['rows']:,} requests", delta_color="off")
+    
+    if result['history_rows']:
+        st.markdown(
+            f"**Agreement with final (human) decisions** on {result['history_rows']:,} past requests: "
+            f"current {result['current_agreement']:.1%} → what-if {result['whatif_agreement']:.1%}"
+        )
+    if simulator.missing_history:
+        replayed = simulator.decisions_total - simulator.missing_history
+        coverage_note = (f"History coverage: {replayed:,} of {simulator.decisions_total:,} past decisions "
+                         f"({replayed / simulator.decisions_total:.0%}) are replayed. The other "
+                         f"{simulator.missing_history:,} were made before request features were archived "
+                         f"(e.g. migrated from the legacy decisions file), so agreement figures cover the "
+                         f"replayed decisions only.")
+        if replayed < simulator.missing_history:
+            st.warning(coverage_note)
+        else:
+            st.caption(coverage_note)
+    
+    col_chart, col_table = st.columns(2)
+    with col_chart:
+        chart_df = pd.DataFrame({
+            'Decision': DECISION_LABELS * 2,
+            'Setting': ['Current'] * len(DECISION_LABELS) + ['What-If'] * len(DECISION_LABELS),
+            'Exposure': list(summary['Current Exposure']) + list(summary['What-If Exposure'])
+        })
+        import plotly.express as px
+        fig = px.bar(
+            chart_df,
+            x='Decision',
+            y='Exposure',
+            color='Setting',
+            barmode='group',
+            title="Invoice Exposure by Decision",
+            color_discrete_map={'Current': KEBOOLA_COLORS['text_light'], 'What-If': KEBOOLA_COLORS['primary_blue']}
+        )
+        fig.update_layout(
+            height=350,
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            font=dict(color=KEBOOLA_COLORS['text_dark'])
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col_table:
+        st.markdown("**Decision shifts** (rows: current, columns: what-if)")
+        st.dataframe(result['transitions'], use_container_width=True)
+        st.dataframe(
+            summary.style.format({
+                'Current Exposure': '${:,.0f}',
+                'What-If Exposure': '${:,.0f}',
+                'Exposure Change': '${:+,.0f}',
+                'Count Change': '{:+,}'
+            }),
+            use_container_width=True
+        )
+    
+    st.caption(f"⚡ Re-evaluated {result['rows']:,} requests in {result['elapsed_ms']:.1f} ms "
+               f"(normalized features cached until the data changes)")
+
+
 def main():
     """Main application entry point"""
     
     # Initialize session state
     initialize_session_state()
+    sync_session_data()
     
     # Render sidebar and get selected page
     page = render_sidebar()
     
+    # Leaving the review page hands the current request back to the queue
+    if page != "📋 Review Requests":
+        release_lease()
+    
     # Render selected page
     if page == "🏠 Dashboard":
         render_dashboard()
@@ -1438,6 +2410,18 @@ def main():
         render_reports()
     elif page == "🔍 AI Governance":
         render_ai_governance()
+    elif page == "🧪 What-If Simulator":
+        render_whatif_simulator()
+    
+    # Live pages are rerun by the data watcher when other writers change data.
+    # Registered after rendering: tables are read (and ingested) on first
+    # access, so only now does data_version cover this run's own writes
+    ctx = get_script_run_ctx() if live_refresh_available() else None
+    if ctx is not None:
+        if page in LIVE_REFRESH_PAGES:
+            st.session_state.data_watcher.register(ctx.session_id, st.session_state.data_version)
+        else:
+            st.session_state.data_watcher.unregister(ctx.session_id)
     
     # Footer
     st.markdown("---")
@@ -0,0 +1,150 @@
+"""
+Model Metrics for Invoice Payment Manager
+Streaming confusion matrix and binned AUC over the decision history
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from config import DECISION_PARTITION_FORMAT, METRICS_SCORE_BINS
+
+
+# Counter layout per day: [TP, FP, FN, TN] followed by the confidence histogram
+# of finally-approved requests, then that of finally-rejected ones.
+# "Positive" means Approved: predicted = ai_decision, actual = final_decision.
+TP, FP, FN, TN = range(4)
+
+
+def partition_stat(path):
+    """(size, mtime_ns) of a partition file, used to detect changes"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class DecisionMetrics:
+    """
+    Daily aggregates of engine vs final decisions
+
+    Each day holds a fixed-size counter vector, so a metric over any time
+    window is a sum of at most one vector per day - independent of how many
+    decisions the history holds. Aggregates are kept per monthly partition:
+    decisions recorded through record() update them in place, and partitions
+    changed by anyone else (detected by size/mtime) are re-aggregated alone.
+    """
+
+    def __init__(self, bins=METRICS_SCORE_BINS):
+        self.bins = bins
+        self.width = 4 + 2 * bins
+        self.partition_days = {}   # month_key -> {day: counter vector}
+        self.partition_stats = {}  # month_key -> (size, mtime_ns) last aggregated
+
+    def _aggregate(self, decisions_df):
+        """Counter vectors per day for a frame of decisions"""
+        if decisions_df.empty:
+            return {}
+        days = pd.to_datetime(decisions_df['decision_date']).dt.strftime('%Y-%m-%d').to_numpy()
+        predicted = decisions_df['ai_decision'].astype(str).eq('Approved').to_numpy()
+        actual = decisions_df['final_decision'].astype(str).eq('Approved').to_numpy()
+        scores = pd.to_numeric(decisions_df['confidence_score'], errors='coerce').fillna(0.0).clip(0.0, 1.0)
+        score_bins = np.minimum((scores.to_numpy() * self.bins).astype(int), self.bins - 1)
+
+        cells = np.where(predicted, np.where(actual, TP, FP), np.where(actual, FN, TN))
+        histogram_columns = 4 + score_bins + np.where(actual, 0, self.bins)
+
+        day_keys, day_index = np.unique(days, return_inverse=True)
+        counters = np.zeros((len(day_keys), self.width), dtype=np.int64)
+        np.add.at(counters, (day_index, cells), 1)
+        np.add.at(counters, (day_index, histogram_columns), 1)
+        return dict(zip(day_keys, counters))
+
+    def sync(self, partitions):
+        """
+        Bring aggregates up to date with the partitions on disk
+
+        Args:
+            partitions: {month_key: path} of decision partitions
+        """
+        for month_key in set(self.partition_days) - set(partitions):
+            del self.partition_days[month_key]
+            del self.partition_stats[month_key]
+
+        for month_key, path in partitions.items():
+            try:
+                stat = partition_stat(path)
+            except FileNotFoundError:
+                continue
+            if self.partition_stats.get(month_key) == stat:
+                continue
+            self.partition_days[month_key] = self._aggregate(pd.read_csv(path))
+            self.partition_stats[month_key] = stat
+
+    def record(self, decisions_df, partitions, previous_stats):
+        """
+        Fold newly written decisions into the aggregates (streaming update)
+
+        Only a partition that was unchanged since it was aggregated, up to
+        this write, is updated in place. Others (not aggregated yet, or
+        appended to by another session in between) are left for the next
+        sync(), which reads them whole.
+
+        Args:
+            decisions_df: Decisions just appended to their partitions
+            partitions: {month_key: path} of decision partitions
+            previous_stats: {month_key: partition_stat()} taken before the write
+        """
+        month_keys = pd.to_datetime(decisions_df['decision_date']).dt.strftime(DECISION_PARTITION_FORMAT)
+        for month_key, month_df in decisions_df.groupby(month_keys):
+            if month_key not in partitions or month_key not in self.partition_stats:
+                continue
+            if previous_stats.get(month_key) != self.partition_stats[month_key]:
+                continue
+            days = self.partition_days[month_key]
+            for day, counter in self._aggregate(month_df).items():
+                days[day] = days[day] + counter if day in days else counter
+            self.partition_stats[month_key] = partition_stat(partitions[month_key])
+
+    def summary(self, start=None):
+        """
+        Precision, recall, F1, accuracy and AUC over decisions since start
+
+        The positive class is Approved. AUC uses confidence_score as the
+        ranking score, estimated from the binned histograms (ties within a
+        bin count one half).
+
+        Args:
+            start: Inclusive lower bound on decision date (None = all history)
+
+        Returns:
+            Dict of metrics (None where undefined) and the confusion counts
+        """
+        start_day = pd.Timestamp(start).strftime('%Y-%m-%d') if start is not None else None
+        total = np.zeros(self.width, dtype=np.int64)
+        for days in self.partition_days.values():
+            for day, counter in days.items():
+                if start_day is None or day >= start_day:
+                    total += counter
+
+        tp, fp, fn, tn = (int(value) for value in total[:4])
+        decisions = tp + fp + fn + tn
+        precision = tp / (tp + fp) if tp + fp else None
+        recall = tp / (tp + fn) if tp + fn else None
+        f1 = 2 * precision * recall / (precision + recall) if precision and recall else None
+
+        positives = total[4:4 + self.bins].astype(float)
+        negatives = total[4 + self.bins:].astype(float)
+        if positives.sum() and negatives.sum():
+            negatives_below = np.concatenate([[0.0], np.cumsum(negatives)[:-1]])
+            auc = float((positives * (negatives_below + 0.5 * negatives)).sum()
+                        / (positives.sum() * negatives.sum()))
+        else:
+            auc = None
+
+        return {
+            'decisions': decisions,
+            'precision': precision,
+            'recall': recall,
+            'f1': f1,
+            'accuracy': (tp + tn) / decisions if decisions else None,
+            'auc': auc,
+            'confusion': {'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn}
+        }
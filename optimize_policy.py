@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Decision Policy Optimizer
+Searches FEATURE_WEIGHTS and DECISION_RULES for the settings that best match
+the final (human) decisions recorded in the decision history.
+
+Candidates come from OPTIMIZER_SEARCH_SPACE in config.py and are scored in
+parallel worker processes over the stored normalized feature matrix, so the
+engine's per-request path is never run.
+
+Run: python3 optimize_policy.py [--objective cost] [--samples 20000] [--workers 4]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from config import (
+    FEATURE_WEIGHTS, DECISION_RULES, DECISION_LABELS, OPTIMIZER_SEARCH_SPACE, DECISION_COST_MATRIX
+)
+from decision_policy import CompiledPolicy
+from ai_decision_engine import AIDecisionEngine
+from data_manager import DataManager
+from whatif_simulator import WhatIfSimulator
+
+
+WEIGHT_NAMES = list(OPTIMIZER_SEARCH_SPACE['weights'])
+RULE_NAMES = list(OPTIMIZER_SEARCH_SPACE['rules'])
+DIMENSIONS = ([OPTIMIZER_SEARCH_SPACE['weights'][name] for name in WEIGHT_NAMES]
+              + [OPTIMIZER_SEARCH_SPACE['rules'][name] for name in RULE_NAMES])
+
+# Worker-process state, set once per process by _init_worker
+_worker = {}
+
+
+def cost_matrix_array(cost_matrix=DECISION_COST_MATRIX):
+    """DECISION_COST_MATRIX as an array indexed [engine decision, final decision]"""
+    costs = np.zeros((len(DECISION_LABELS), len(DECISION_LABELS)))
+    for engine_code, engine_label in enumerate(DECISION_LABELS):
+        for final_code, final_label in enumerate(DECISION_LABELS):
+            costs[engine_code, final_code] = cost_matrix.get(engine_label, {}).get(final_label, 0.0)
+    return costs
+
+
+def candidate_settings(candidate):
+    """Map a tuple of grid indexes to (weights, rules); weights are rescaled to sum to 1"""
+    values = [dimension[index] for dimension, index in zip(DIMENSIONS, candidate)]
+    raw_weights = dict(zip(WEIGHT_NAMES, values[:len(WEIGHT_NAMES)]))
+    total = sum(raw_weights.values()) or 1.0
+    weights = {**FEATURE_WEIGHTS, **{name: value / total for name, value in raw_weights.items()}}
+    rules = {**DECISION_RULES, **dict(zip(RULE_NAMES, values[len(WEIGHT_NAMES):]))}
+    return weights, rules
+
+
+def score_codes(engine_codes, final_codes, costs):
+    """Agreement, average cost and decision mix for one candidate"""
+    n_labels = len(DECISION_LABELS)
+    confusion = np.bincount(engine_codes * n_labels + final_codes,
+                            minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+    total = confusion.sum()
+    return {
+        'agreement': float(np.trace(confusion) / total),
+        'avg_cost': float((confusion * costs).sum() / total),
+        'approve_rate': float(confusion[DECISION_LABELS.index('Approved')].sum() / total),
+        'reject_rate': float(confusion[DECISION_LABELS.index('Rejected')].sum() / total),
+        'escalate_rate': float(confusion[DECISION_LABELS.index('Escalate')].sum() / total)
+    }
+
+
+def _init_worker(spec, feature_matrix, policy_fields, final_codes, costs):
+    """Receive the feature matrix once per worker process"""
+    policy = CompiledPolicy(spec, DECISION_RULES)
+    _worker.update({
+        'engine': AIDecisionEngine(policy=policy),
+        'feature_matrix': feature_matrix,
+        'policy_fields': policy_fields,
+        'final_codes': final_codes,
+        'costs': costs
+    })
+
+
+def _evaluate(weights, rules, cached_risk=None):
+    """Decision codes for one candidate (risk can be reused between candidates)"""
+    engine = _worker['engine']
+    risk = cached_risk if cached_risk is not None else engine.risk_from_matrix(
+        _worker['feature_matrix'], weights
+    )
+    policy = engine.policy.with_params(rules)
+    rule_codes = policy.evaluate_codes({**_worker['policy_fields'], 'risk': risk})
+    rule_to_label = np.array([DECISION_LABELS.index(decision) for decision in policy.decisions])
+    return rule_to_label[rule_codes], risk
+
+
+def _evaluate_chunk(candidates):
+    """Score a chunk of candidates; chunks are sorted so equal weights share one risk vector"""
+    results = []
+    last_weights, risk = None, None
+    for candidate in candidates:
+        weights, rules = candidate_settings(candidate)
+        weight_key = candidate[:len(WEIGHT_NAMES)]
+        engine_codes, risk = _evaluate(weights, rules, risk if weight_key == last_weights else None)
+        last_weights = weight_key
+        results.append((candidate, score_codes(engine_codes, _worker['final_codes'], _worker['costs'])))
+    return results
+
+
+def generate_candidates(samples, seed, full_grid=False):
+    """Every grid point, or a reproducible random sample of distinct grid points"""
+    grid_size = int(np.prod([len(dimension) for dimension in DIMENSIONS]))
+    if full_grid or samples >= grid_size:
+        return list(itertools.product(*[range(len(dimension)) for dimension in DIMENSIONS])), grid_size
+
+    rng = np.random.default_rng(seed)
+    candidates = set()
+    while len(candidates) < samples:
+        draws = np.column_stack([rng.integers(0, len(dimension), samples) for dimension in DIMENSIONS])
+        candidates.update(map(tuple, draws.tolist()))
+    return sorted(candidates)[:samples], grid_size
+
+
+def load_history(data_manager, ai_engine):
+    """Cached feature matrix of every replayable past decision with its final decision"""
+    simulator = WhatIfSimulator(data_manager, ai_engine)
+    simulator.refresh(force=True)
+    history = simulator.final_codes >= 0
+    policy_fields = {name: values[history] for name, values in simulator.policy_fields.items()}
+    return (simulator.feature_matrix[history], policy_fields,
+            simulator.final_codes[history], simulator.missing_history)
+
+
+def optimize(feature_matrix, policy_fields, final_codes, spec, candidates, workers, objective,
+             costs=None):
+    """
+    Score all candidates in parallel
+
+    Returns:
+        List of (candidate, metrics) sorted best first
+    """
+    costs = cost_matrix_array() if costs is None else costs
+    chunk_size = max(1, len(candidates) // (workers * 8))
+    chunks = [candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+
+    init_args = (spec, feature_matrix, policy_fields, final_codes, costs)
+    if workers == 1:
+        _init_worker(*init_args)
+        results = [result for chunk in chunks for result in _evaluate_chunk(chunk)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as executor:
+            results = [result for chunk_results in executor.map(_evaluate_chunk, chunks)
+                       for result in chunk_results]
+
+    if objective == 'agreement':
+        results.sort(key=lambda item: (-item[1]['agreement'], item[1]['avg_cost']))
+    else:
+        results.sort(key=lambda item: (item[1]['avg_cost'], -item[1]['agreement']))
+    return results
+
+
+def format_metrics(metrics):
+    return (f"agreement {metrics['agreement']:.1%}  avg cost {metrics['avg_cost']:.3f}  "
+            f"approve {metrics['approve_rate']:.0%} / reject {metrics['reject_rate']:.0%} / "
+            f"escalate {metrics['escalate_rate']:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--objective', choices=['cost', 'agreement'], default='cost',
+                        help='minimize DECISION_COST_MATRIX cost or maximize agreement')
+    parser.add_argument('--samples', type=int, default=20000, help='random grid points to evaluate')
+    parser.add_argument('--full-grid', action='store_true', help='evaluate every grid point')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--top', type=int, default=5, help='candidates to list')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', default='optimized_config.json', help='where to write the best candidate')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("  Decision Policy Optimizer")
+    print("=" * 60)
+
+    data_manager = DataManager()
+    ai_engine = AIDecisionEngine()
+    feature_matrix, policy_fields, final_codes, missing = load_history(data_manager, ai_engine)
+    if len(final_codes) == 0:
+        print("❌ No replayable decisions yet (request features are archived as requests are decided)")
+        return 1
+    print(f"History: {len(final_codes):,} decisions with archived features"
+          + (f" ({missing:,} older decisions skipped)" if missing else ""))
+
+    costs = cost_matrix_array()
+    _init_worker(ai_engine.policy.spec, feature_matrix, policy_fields, final_codes, costs)
+    current_codes, _ = _evaluate(FEATURE_WEIGHTS, DECISION_RULES)
+    current = score_codes(current_codes, final_codes, costs)
+    print(f"Current config:  {format_metrics(current)}")
+
+    candidates, grid_size = generate_candidates(args.samples, args.seed, args.full_grid)
+    print(f"Evaluating {len(candidates):,} of {grid_size:,} grid points on {args.workers} worker(s)...")
+    start = time.perf_counter()
+    results = optimize(feature_matrix, policy_fields, final_codes, ai_engine.policy.spec,
+                       candidates, args.workers, args.objective, costs)
+    elapsed = time.perf_counter() - start
+    print(f"Done in {elapsed:.1f}s ({len(candidates) / elapsed:,.0f} candidates/s, "
+          f"{len(candidates) * len(final_codes) / elapsed:,.0f} decisions/s)")
+
+    print()
+    print(f"Top {args.top} by {args.objective}:")
+    for rank, (candidate, metrics) in enumerate(results[:args.top], start=1):
+        print(f"{rank:>3}. {format_metrics(metrics)}")
+
+    best_candidate, best_metrics = results[0]
+    weights, rules = candidate_settings(best_candidate)
+    output = {
+        'objective': args.objective,
+        'history_rows': int(len(final_codes)),
+        'evaluated': len(candidates),
+        'current': {'metrics': current},
+        'candidate': {
+            'FEATURE_WEIGHTS': {name: round(value, 4) for name, value in weights.items()},
+            'DECISION_RULES': rules,
+            'metrics': best_metrics
+        }
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+
+    print()
+    print("Best candidate (review before copying into config.py):")
+    print(f"FEATURE_WEIGHTS = {json.dumps(output['candidate']['FEATURE_WEIGHTS'], indent=4)}")
+    print(f"DECISION_RULES = {json.dumps(rules, indent=4)}")
+    print(f"\n✅ Written to {args.output}")
+    if len(final_codes) < 500:
+        print("⚠️  Small history - treat the candidate as a hint, not a tuned setting")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Pending Queue Store for Invoice Payment Manager
+Binary (Arrow IPC) mirror of the pending requests CSV, memory-mapped on load
+"""
+
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+import pandas as pd
+from config import REQUESTS_ARROW, REQUESTS_CSV, REQUEST_COLUMNS
+
+
+# Low-cardinality text columns stored once per distinct value
+DICTIONARY_COLUMNS = ['vendor_name', 'reason', 'priority', 'cash_flow_impact']
+
+# Schema metadata key recording which CSV version the mirror was built from
+SOURCE_STAMP_KEY = b'source_stamp'
+
+
+class PendingStore:
+    """
+    Arrow IPC file holding the pending requests
+
+    The CSV stays the editable source of truth; this file is rewritten
+    alongside it and rebuilt whenever the CSV changes outside the app.
+    Loading maps the file read-only: numeric and date columns become
+    pandas columns over the mapped pages (no parse, no copy), and
+    dictionary-encoded text becomes categoricals, so every session and
+    process shares one copy in the OS page cache.
+    """
+
+    def __init__(self, path=REQUESTS_ARROW, source_path=REQUESTS_CSV):
+        self.path = path
+        self.source_path = source_path
+
+    def _source_stamp(self):
+        """Size and mtime of the CSV, or None if it does not exist"""
+        try:
+            stat = os.stat(self.source_path)
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+    def is_current(self):
+        """True if the mirror exists and was built from the CSV as it is now"""
+        stamp = self._source_stamp()
+        if stamp is None or not os.path.exists(self.path):
+            return False
+        try:
+            with pa.memory_map(self.path, 'r') as source:
+                metadata = pa.ipc.open_file(source).schema.metadata or {}
+        except (OSError, pa.ArrowInvalid):
+            return False
+        return metadata.get(SOURCE_STAMP_KEY) == stamp
+
+    def write(self, df):
+        """
+        Rewrite the mirror from a requests DataFrame (call after writing the CSV)
+
+        The file is replaced atomically, so sessions still reading the old
+        mapping keep a consistent snapshot.
+        """
+        table = pa.Table.from_pandas(df.reindex(columns=REQUEST_COLUMNS), preserve_index=False)
+        for name in DICTIONARY_COLUMNS:
+            index = table.schema.get_field_index(name)
+            if pa.types.is_string(table.schema.field(index).type):
+                table = table.set_column(index, name, pc.dictionary_encode(table.column(name)))
+        table = table.replace_schema_metadata({SOURCE_STAMP_KEY: self._source_stamp() or b''})
+
+        tmp_path = f"{self.path}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, self.path)
+
+    def read(self):
+        """Map the mirror and expose it as a DataFrame without copying column data"""
+        table = pa.ipc.open_file(pa.memory_map(self.path, 'r')).read_all()
+        # Plain text (request_id) stays Arrow-backed instead of becoming Python objects
+        return table.to_pandas(
+            split_blocks=True,
+            self_destruct=False,
+            types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get
+        )
+
+    def load(self):
+        """Read the mirror, rebuilding it from the CSV first if it is stale"""
+        if not self.is_current():
+            df = pd.read_csv(self.source_path, parse_dates=['original_due_date', 'submission_date'])
+            self.write(df)
+        return self.read()
@@ -0,0 +1,258 @@
+"""
+PII Masking for Invoice Payment Manager
+Detects and masks personal data in free-text columns (governance rule C15)
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# PII type -> pattern. All patterns are compiled once into a single
+# alternation; at a given position the earlier alternative wins, so card
+# numbers are tried before the (shorter) phone pattern. Masked output never
+# matches again, which makes masking idempotent.
+PII_PATTERNS = {
+    'email': r'(?<![A-Za-z0-9._%+-])[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}',
+    'iban': r'\b[A-Z]{2}\d{2}(?:[ ]?[A-Z0-9]{4}){3,7}(?:[ ]?[A-Z0-9]{1,3})?\b',
+    'card_number': r'\b\d{4}(?:[ -]?\d{4}){2}[ -]?\d{1,7}\b',  # Luhn-checked in _masked
+    'phone': (r'(?<![\w-])(?:\+\d{1,3}[ .-]?(?:\(\d{1,4}\)[ .-]?)?\d{2,4}(?:[ .-]?\d{2,4}){1,3}'
+              r'|(?:\(\d{3}\)[ .-]?|\d{3}[ .-])\d{3}[ .-]?\d{4})(?![\w-])'),
+}
+
+PII_TYPES = list(PII_PATTERNS)
+PII_REGEX = re.compile('|'.join(f'(?P<{pii_type}>{pattern})' for pii_type, pattern in PII_PATTERNS.items()))
+# Looser pattern matching every string that any PII pattern can match. It is
+# run by Arrow's RE2 kernel (linear time, no per-value Python call); only
+# the values it selects go through PII_REGEX.
+PII_PREFILTER = r'[A-Za-z0-9._%+-]@[A-Za-z0-9-]|\+\d|\d{3}[ .-]?\d{4}|[A-Z]{2}\d{2} ?[A-Z0-9]{4}'
+
+# Free-text columns masked per table
+PII_TEXT_COLUMNS = {
+    'requests': ['reason'],
+    'audit': ['details'],
+}
+
+MASKING_STAGE_COLUMNS = ['Stage', 'Passes', 'Rows Scanned', 'Rows With PII', 'Values Masked'] + \
+    [f'{pii_type} masked' for pii_type in PII_TYPES] + ['Rows/s']
+
+
+def _last_digits(text, n):
+    return re.sub(r'\D', '', text)[-n:]
+
+
+def _is_card_number(digits):
+    """
+    Whether a 13-19 digit string can be a payment card number: issuer
+    prefix of a card network (3-6, or Mastercard's 2221-2720) and a valid
+    Luhn checksum
+    """
+    if not (digits[0] in '3456' or 2221 <= int(digits[:4]) <= 2720):
+        return False
+    total = 0
+    for position, digit in enumerate(reversed(digits)):
+        value = int(digit) * (2 if position % 2 else 1)
+        total += value - 9 if value > 9 else value
+    return total % 10 == 0
+
+
+def _masked(match):
+    """
+    Replacement for one match: type marker plus enough of the value to tell instances apart
+
+    Digit runs shaped like card numbers that are not card numbers (invoice,
+    PO or batch references failing _is_card_number) are returned unchanged.
+    """
+    pii_type, value = match.lastgroup, match.group()
+    if pii_type == 'email':
+        local, domain = value.split('@', 1)
+        return f"{local[0]}***@{domain}"
+    if pii_type == 'phone':
+        return f"[PHONE ***{_last_digits(value, 2)}]"
+    if pii_type == 'iban':
+        return f"[IBAN ****{re.sub(r'[^A-Z0-9]', '', value)[-4:]}]"
+    digits = _last_digits(value, 19)
+    if not _is_card_number(digits):
+        return value
+    return f"[CARD ****{digits[-4:]}]"
+
+
+def mask_text(text, counts=None):
+    """
+    Mask PII in one string
+
+    Args:
+        text: Text to mask (non-strings are returned unchanged)
+        counts: Optional Counter incremented per PII type found
+
+    Returns:
+        Masked text
+    """
+    if not isinstance(text, str):
+        return text
+    if counts is None:
+        return PII_REGEX.sub(_masked, text)
+
+    def replace(match):
+        masked = _masked(match)
+        if masked != match.group():
+            counts[match.lastgroup] += 1
+        return masked
+    return PII_REGEX.sub(replace, text)
+
+
+def _mask_distinct(values):
+    """
+    Mask an array of strings one by one
+
+    Returns:
+        Tuple of (masked object array, per-value match counts as an
+        (n_values, n_types) int array)
+    """
+    masked = np.array(values, dtype=object)
+    per_value = np.zeros((len(masked), len(PII_TYPES)), dtype=np.int64)
+    for i, value in enumerate(masked):
+        counts = Counter()
+        masked[i] = mask_text(value, counts)
+        per_value[i] = [counts[pii_type] for pii_type in PII_TYPES]
+    return masked, per_value
+
+
+def _prefilter(values):
+    """Which of the values may contain PII (boolean array, never misses a match)"""
+    try:
+        text = pa.array(values, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        text = pa.array(np.asarray(values).astype(str), type=pa.string())
+    return pc.match_substring_regex(text, PII_PREFILTER).fill_null(False).to_numpy(zero_copy_only=False)
+
+
+def mask_series(series):
+    """
+    Mask PII in a text column
+
+    Each distinct value is handled once: categoricals by category, other
+    text columns after factorizing. Distinct values go through the
+    PII_PREFILTER kernel, and only those it selects through PII_REGEX.
+
+    Args:
+        series: Text column (object or categorical)
+
+    Returns:
+        Tuple of (masked Series on the same index, per-type match counts
+        dict, number of rows that contained PII)
+    """
+    nothing = (series, dict.fromkeys(PII_TYPES, 0), 0)
+    categorical = isinstance(series.dtype, pd.CategoricalDtype)
+    if categorical:
+        codes, uniques = series.cat.codes.to_numpy(), np.asarray(series.cat.categories, dtype=object)
+    elif series.dtype == object:
+        codes, uniques = pd.factorize(series)
+        uniques = np.asarray(uniques, dtype=object)
+    else:
+        return nothing
+
+    candidate = _prefilter(uniques)
+    if not candidate.any():
+        return nothing
+    masked = uniques.copy()
+    masked[candidate], per_value = _mask_distinct(uniques[candidate])
+    found = per_value.sum(axis=1) > 0
+    if not found.any():
+        return nothing
+
+    occurrences = np.bincount(codes[codes >= 0], minlength=len(uniques))[candidate]
+    matches = (per_value * occurrences[:, None]).sum(axis=0)
+    present = codes >= 0
+    if categorical:
+        # Two categories can mask to the same text, so re-factorize
+        new_codes, new_uniques = pd.factorize(masked)
+        values = pd.Categorical.from_codes(np.where(present, new_codes[np.maximum(codes, 0)], -1), new_uniques)
+    else:
+        values = np.where(present, masked[np.maximum(codes, 0)], series.to_numpy())
+    result = pd.Series(values, index=series.index, name=series.name)
+    return result, dict(zip(PII_TYPES, matches.tolist())), int(occurrences[found].sum())
+
+
+def mask_frame(df, columns):
+    """
+    Mask PII in the given text columns of a frame
+
+    Args:
+        df: DataFrame to mask (not modified)
+        columns: Text columns to mask; missing ones are skipped
+
+    Returns:
+        Tuple of (masked DataFrame, report dict with 'rows', 'rows_with_pii',
+        'values_masked', per-type 'matches', 'columns', 'elapsed_ms' and
+        'rows_per_second'); the frame is returned as is when nothing matched
+    """
+    start = time.perf_counter()
+    matches = Counter(dict.fromkeys(PII_TYPES, 0))
+    rows_with_pii = 0
+    masked_columns = {}
+    columns = [column for column in columns if column in df]
+    for column in columns:
+        masked, column_matches, column_rows = mask_series(df[column])
+        if column_rows:
+            masked_columns[column] = masked
+            matches.update(column_matches)
+            rows_with_pii += column_rows
+    if masked_columns:
+        df = df.assign(**masked_columns)
+    elapsed = time.perf_counter() - start
+    return df, {
+        'rows': len(df),
+        'rows_with_pii': rows_with_pii,
+        'values_masked': sum(matches.values()),
+        'matches': dict(matches),
+        'columns': columns,
+        'elapsed_ms': elapsed * 1000,
+        'rows_per_second': len(df) / elapsed if elapsed > 0 else 0.0
+    }
+
+
+class MaskingLog:
+    """Running totals of masking passes per stage (ingest, audit, export), shared across sessions"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+
+    def record(self, stage, rows, matches, rows_with_pii, seconds):
+        """Add one masking pass to the stage's totals"""
+        with self._lock:
+            totals = self.stages.setdefault(stage, {
+                'passes': 0, 'rows': 0, 'rows_with_pii': 0, 'matches': Counter(), 'seconds': 0.0
+            })
+            totals['passes'] += 1
+            totals['rows'] += rows
+            totals['rows_with_pii'] += rows_with_pii
+            totals['matches'].update(matches)
+            totals['seconds'] += seconds
+
+    def record_report(self, stage, report):
+        """Add a mask_frame() report to the stage's totals"""
+        self.record(stage, report['rows'], report['matches'], report['rows_with_pii'],
+                    report['elapsed_ms'] / 1000)
+
+    def values_masked(self):
+        with self._lock:
+            return sum(sum(totals['matches'].values()) for totals in self.stages.values())
+
+    def frame(self):
+        """Totals as a DataFrame with MASKING_STAGE_COLUMNS, one row per stage"""
+        with self._lock:
+            rows = [
+                [stage, totals['passes'], totals['rows'], totals['rows_with_pii'],
+                 sum(totals['matches'].values())] +
+                [totals['matches'][pii_type] for pii_type in PII_TYPES] +
+                [round(totals['rows'] / totals['seconds']) if totals['seconds'] > 0 else 0]
+                for stage, totals in self.stages.items()
+            ]
+        return pd.DataFrame(rows, columns=MASKING_STAGE_COLUMNS)
@@ -0,0 +1,203 @@
+"""
+Risk Classification Audit for Invoice Payment Manager
+Re-scores the decision history and checks it against recorded outcomes (governance rule C2)
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config import (
+    RISK_THRESHOLDS, RISK_AUDIT_MIN_ACCURACY, RISK_AUDIT_MIN_REPRODUCIBILITY, RISK_AUDIT_MIN_COVERAGE,
+    DECISION_LABELS
+)
+from factor_status import factor_levels
+
+
+AMOUNT_TIERS = [
+    f"Low (< ${RISK_THRESHOLDS['amount']['low']:,})",
+    f"Medium (${RISK_THRESHOLDS['amount']['low']:,} - ${RISK_THRESHOLDS['amount']['high']:,})",
+    f"High (>= ${RISK_THRESHOLDS['amount']['high']:,})"
+]
+
+RISK_AUDIT_COLUMNS = ['Amount Tier', 'Cases', 'Exposure', 'Avg Risk', 'Avg Confidence', 'Escalated',
+                      'Auto Accuracy', 'Matches Recorded AI', 'Approved (Actual)', 'Approved (Re-scored)']
+
+
+APPROVED, ESCALATE = DECISION_LABELS.index('Approved'), DECISION_LABELS.index('Escalate')
+
+
+def _label_codes(values):
+    """Index of each decision in DECISION_LABELS, -1 for missing or unknown values"""
+    return pd.Categorical(values, categories=DECISION_LABELS).codes.astype(np.int64)
+
+
+def config_fingerprint(ai_engine):
+    """Digest of everything that changes a re-scored decision: weights, thresholds and policy rules"""
+    settings = {
+        'weights': ai_engine.weights,
+        'params': ai_engine.policy.params,
+        'policy': ai_engine.policy.describe(),
+        'risk_thresholds': RISK_THRESHOLDS
+    }
+    return hashlib.blake2b(json.dumps(settings, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+def _rate(numerator, denominator):
+    """Share as a float, None when there is nothing to divide"""
+    return float(numerator / denominator) if denominator else None
+
+
+def audit_status(report):
+    """
+    Compliance status of an audit report against the configured thresholds
+
+    Below RISK_AUDIT_MIN_COVERAGE the re-scored cases do not represent the
+    history, so no verdict is given ('Insufficient Data'). Otherwise low
+    accuracy is Non-Compliant, and low reproducibility or any decision that
+    could not be re-scored is a Warning.
+    """
+    coverage = report['coverage']
+    if not report['cases'] or coverage is None or coverage < RISK_AUDIT_MIN_COVERAGE:
+        return 'Insufficient Data'
+    if report['accuracy'] is not None and report['accuracy'] < RISK_AUDIT_MIN_ACCURACY:
+        return 'Non-Compliant'
+    if report['reproducibility'] < RISK_AUDIT_MIN_REPRODUCIBILITY or report['cases'] < report['decisions_total']:
+        return 'Warning'
+    return 'Compliant'
+
+
+def audit_history(history_df, ai_engine, decisions_total=None):
+    """
+    Re-score decided requests and compare with what was recorded
+
+    Args:
+        history_df: Archived requests joined with their decision (REQUEST_COLUMNS
+            plus ai_decision and final_decision)
+        ai_engine: AIDecisionEngine whose current settings are audited
+        decisions_total: Decisions in the history, to report how many could
+            not be re-scored (defaults to len(history_df))
+
+    Returns:
+        Dict with 'tiers' (DataFrame with RISK_AUDIT_COLUMNS, one row per
+        amount tier plus 'All'), 'confusion' (re-scored decision x final
+        outcome), case counts, 'accuracy' (re-scored automatic decisions
+        matching the final outcome), 'escalation_rate', 'reproducibility'
+        (re-scored decisions matching the recorded AI decision), 'coverage',
+        'mismatches' (example request ids), 'status' (see audit_status),
+        'elapsed_ms' and 'audited_at'
+    """
+    start = time.perf_counter()
+    cases = len(history_df)
+    decisions_total = cases if decisions_total is None else decisions_total
+
+    scores = ai_engine.score_batch(history_df)
+    # Decisions as indexes into DECISION_LABELS (-1 for anything else), so comparisons are integer ops
+    rescored = _label_codes(scores['decision'])
+    final = _label_codes(history_df['final_decision'])
+    recorded = _label_codes(history_df['ai_decision'])
+    amount = pd.to_numeric(history_df['invoice_amount'], errors='coerce').fillna(0.0).to_numpy()
+    tiers = factor_levels('amount', history_df['invoice_amount'])
+
+    auto = rescored != ESCALATE
+    correct = auto & (rescored == final)
+    reproduced = rescored == recorded
+
+    # Per-tier sums in one bincount each
+    def per_tier(weights=None):
+        return np.bincount(tiers, weights=weights, minlength=len(AMOUNT_TIERS)).astype(float)
+
+    tier_cases, tier_auto = per_tier(), per_tier(auto)
+    columns = {
+        'Cases': tier_cases,
+        'Exposure': per_tier(amount),
+        'Risk': per_tier(scores['risk_score'].to_numpy()),
+        'Confidence': per_tier(scores['confidence_score'].to_numpy()),
+        'Escalated': per_tier(~auto),
+        'Auto': tier_auto,
+        'Correct': per_tier(correct),
+        'Reproduced': per_tier(reproduced),
+        'Actual Approved': per_tier(final == APPROVED),
+        'Re-scored Approved': per_tier(rescored == APPROVED)
+    }
+    rows = []
+    for index, tier in enumerate(AMOUNT_TIERS + ['All']):
+        def total(name):
+            return columns[name].sum() if tier == 'All' else columns[name][index]
+        n = total('Cases')
+        rows.append([
+            tier, int(n), total('Exposure'),
+            _rate(total('Risk'), n), _rate(total('Confidence'), n), _rate(total('Escalated'), n),
+            _rate(total('Correct'), total('Auto')), _rate(total('Reproduced'), n),
+            _rate(total('Actual Approved'), n), _rate(total('Re-scored Approved'), n)
+        ])
+    tier_table = pd.DataFrame(rows, columns=RISK_AUDIT_COLUMNS)
+
+    # Final outcomes are Approved or Rejected, the first two labels
+    n_labels, outcome_labels = len(DECISION_LABELS), DECISION_LABELS[:2]
+    decided = (rescored >= 0) & (final >= 0) & (final < len(outcome_labels))
+    confusion = pd.DataFrame(
+        np.bincount(rescored[decided] * len(outcome_labels) + final[decided],
+                    minlength=n_labels * len(outcome_labels)).reshape(n_labels, len(outcome_labels)),
+        index=[f"Re-scored: {label}" for label in DECISION_LABELS],
+        columns=[f"Final: {label}" for label in outcome_labels]
+    )
+
+    report = {
+        'tiers': tier_table,
+        'confusion': confusion,
+        'cases': cases,
+        'decisions_total': decisions_total,
+        'coverage': _rate(cases, decisions_total),
+        'auto_cases': int(auto.sum()),
+        'accuracy': _rate(correct.sum(), auto.sum()),
+        'escalation_rate': _rate((~auto).sum(), cases),
+        'reproducibility': _rate(reproduced.sum(), cases),
+        'mismatches': history_df['request_id'].astype(str).to_numpy()[auto & ~correct][:5].tolist(),
+        'audited_at': datetime.now()
+    }
+    report['status'] = audit_status(report)
+    report['elapsed_ms'] = (time.perf_counter() - start) * 1000
+    return report
+
+
+def _json_value(value):
+    """JSON form of numpy scalars (and, as a fallback, anything else as text)"""
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def save_report(path, report):
+    """Write a report (with its 'key') as JSON, replacing the previous one atomically"""
+    serializable = {
+        **report,
+        'tiers': report['tiers'].to_dict('split'),
+        'confusion': report['confusion'].to_dict('split'),
+        'audited_at': report['audited_at'].isoformat()
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(serializable, f, default=_json_value)
+    os.replace(tmp_path, path)
+
+
+def load_report(path, key):
+    """
+    Report saved by save_report, if it was computed for this key
+
+    Returns:
+        The report dict, or None when the file is missing, unreadable or stale
+    """
+    try:
+        with open(path) as f:
+            report = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if report.get('key') != key:
+        return None
+    report['tiers'] = pd.DataFrame(**report['tiers'])
+    report['confusion'] = pd.DataFrame(**report['confusion'])
+    report['audited_at'] = datetime.fromisoformat(report['audited_at'])
+    return report
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Scoring Service for Invoice Payment Manager
+Standalone HTTP API around AIDecisionEngine for upstream systems (e.g. the ERP)
+
+Endpoints:
+    POST /score         one request object          -> one result
+    POST /score/batch   {"requests": [...]} or [...] -> {"results": [...]}
+    GET  /metrics       latency percentiles, batch and queue statistics
+    GET  /health        liveness check
+
+Requests carry the REQUEST_COLUMNS fields; results hold request_id, decision,
+confidence_score and risk_score, computed exactly as in the review app.
+
+Run: python3 scoring_service.py [--host 127.0.0.1] [--port 8502] [--workers 4]
+"""
+
+import argparse
+import json
+import math
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+from config import (
+    SCORING_HOST, SCORING_PORT, SCORING_WORKERS, SCORING_MAX_BATCH_ROWS, SCORING_MAX_WAIT_MS,
+    SCORING_QUEUE_SIZE, SCORING_KEEPALIVE_SECONDS, SCORING_MAX_BODY_BYTES, SCORING_LATENCY_WINDOW
+)
+from ai_decision_engine import AIDecisionEngine
+
+
+# Field -> (type, default); None = required
+REQUEST_FIELDS = {
+    'request_id': (str, ''),
+    'vendor_name': (str, ''),
+    'invoice_amount': (float, None),
+    'requested_extension_days': (int, None),
+    'vendor_reliability_score': (float, None),
+    'payment_history_score': (float, None),
+    'cash_flow_impact': (str, 'Medium'),
+    'priority': (str, 'Medium')
+}
+
+
+def parse_request(payload):
+    """
+    Validate one scoring request
+
+    Returns:
+        Dict with every REQUEST_FIELDS key, typed
+
+    Raises:
+        ValueError: if the payload is not an object, a required field is
+            missing or a value cannot be converted
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("each request must be a JSON object")
+    record = {}
+    for name, (kind, default) in REQUEST_FIELDS.items():
+        value = payload.get(name)
+        if value is None:
+            if default is None:
+                raise ValueError(f"missing field: {name}")
+            value = default
+        try:
+            record[name] = kind(float(value)) if kind is int else kind(value)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"invalid value for {name}: {value!r}")
+        if kind is float and not math.isfinite(record[name]):
+            raise ValueError(f"invalid value for {name}: {value!r}")
+    return record
+
+
+class LatencyStats:
+    """Request counts and a sliding window of latencies per endpoint"""
+
+    def __init__(self, window=SCORING_LATENCY_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._counts = {}
+        self._errors = {}
+
+    def record(self, endpoint, latency_ms, error=False):
+        with self._lock:
+            if endpoint not in self._latencies:
+                self._latencies[endpoint] = deque(maxlen=self.window)
+                self._counts[endpoint] = 0
+                self._errors[endpoint] = 0
+            self._latencies[endpoint].append(latency_ms)
+            self._counts[endpoint] += 1
+            self._errors[endpoint] += int(error)
+
+    def summary(self):
+        with self._lock:
+            snapshot = {endpoint: (np.array(latencies), self._counts[endpoint], self._errors[endpoint])
+                        for endpoint, latencies in self._latencies.items()}
+        summary = {}
+        for endpoint, (latencies, count, errors) in snapshot.items():
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+            summary[endpoint] = {
+                'requests': count,
+                'errors': errors,
+                'p50_ms': round(float(p50), 3),
+                'p95_ms': round(float(p95), 3),
+                'p99_ms': round(float(p99), 3),
+                'max_ms': round(float(latencies.max()), 3) if len(latencies) else 0.0
+            }
+        return summary
+
+
+class MicroBatcher:
+    """
+    Collects concurrent scoring calls into micro-batches for a pool of threads
+
+    One worker at a time collects: it takes the oldest waiting job, then
+    keeps taking jobs until the batch holds max_batch_rows rows or
+    max_wait_ms has passed since the first one, and scores the batch with a
+    single score_records call while the next worker collects. Callers that
+    arrive together therefore share the numpy overhead of one call, at the
+    cost of at most max_wait_ms extra latency; with max_wait_ms=0 a batch
+    only takes what is already queued. A job is never split, so a large
+    /score/batch call may exceed max_batch_rows on its own.
+
+    The queue is bounded: when it is full, submit() raises queue.Full and
+    the caller answers 503 instead of piling up work.
+    """
+
+    def __init__(self, engine, workers=SCORING_WORKERS, max_batch_rows=SCORING_MAX_BATCH_ROWS,
+                 queue_size=SCORING_QUEUE_SIZE, max_wait_ms=SCORING_MAX_WAIT_MS):
+        self.engine = engine
+        self.workers = workers
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self._collect_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.batched_rows = 0
+        self.full_batches = 0
+        self.size_histogram = {}  # power-of-two bucket -> batches
+        self._recent_sizes = deque(maxlen=SCORING_LATENCY_WINDOW)
+        self._threads = [threading.Thread(target=self._work, name=f'scoring-{i}', daemon=True)
+                         for i in range(workers)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, records):
+        """
+        Queue validated records for scoring
+
+        Returns:
+            Future resolving to a list of result dicts, one per record
+
+        Raises:
+            queue.Full: if the service is saturated
+        """
+        future = Future()
+        self.jobs.put_nowait((records, future))
+        return future
+
+    def score(self, record, timeout=None):
+        """Score one validated record, batched with whatever arrives alongside it"""
+        return self.submit([record]).result(timeout)[0]
+
+    def _work(self):
+        while True:
+            batch, rows = self._collect()
+            self._score(batch, rows)
+
+    def _collect(self):
+        """Next micro-batch: (jobs, total rows)"""
+        with self._collect_lock:
+            batch = [self.jobs.get()]
+            rows = len(batch[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_batch_rows:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        job = self.jobs.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                batch.append(job)
+                rows += len(job[0])
+        return batch, rows
+
+    def _score(self, batch, rows):
+        try:
+            records = [record for job_records, _ in batch for record in job_records]
+            scores = self.engine.score_records(records)
+            results = [
+                {'request_id': record['request_id'], 'decision': decision,
+                 'confidence_score': confidence, 'risk_score': risk}
+                for record, decision, confidence, risk in zip(
+                    records, scores['decision'].tolist(), scores['confidence_score'].tolist(),
+                    scores['risk_score'].tolist()
+                )
+            ]
+            offset = 0
+            for job_records, future in batch:
+                future.set_result(results[offset:offset + len(job_records)])
+                offset += len(job_records)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        bucket = 1 << (rows.bit_length() - 1)
+        with self._lock:
+            self.batches += 1
+            self.batched_rows += rows
+            self.full_batches += int(rows >= self.max_batch_rows)
+            self.size_histogram[bucket] = self.size_histogram.get(bucket, 0) + 1
+            self._recent_sizes.append(rows)
+
+    def summary(self):
+        with self._lock:
+            batches, rows, full = self.batches, self.batched_rows, self.full_batches
+            histogram = sorted(self.size_histogram.items())
+            recent = np.array(self._recent_sizes)
+        p50, p95 = np.percentile(recent, [50, 95]) if len(recent) else (0.0, 0.0)
+        return {
+            'workers': self.workers,
+            'max_batch_rows': self.max_batch_rows,
+            'max_wait_ms': self.max_wait * 1000,
+            'queued_jobs': self.jobs.qsize(),
+            'batches': batches,
+            'rows': rows,
+            'avg_batch_rows': round(rows / batches, 2) if batches else 0.0,
+            'p50_batch_rows': float(p50),
+            'p95_batch_rows': float(p95),
+            'full_batches': full,
+            # "4-7": batches of 4 to 7 rows
+            'batch_rows_histogram': {
+                (f"{bucket}-{2 * bucket - 1}" if bucket > 1 else "1"): count for bucket, count in histogram
+            }
+        }
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler: connections stay open between requests (keep-alive)"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'InvoiceScoring/1.0'
+    timeout = SCORING_KEEPALIVE_SECONDS
+    # Headers and body go out in separate writes; with Nagle enabled the body
+    # waits for the client's delayed ACK (~40 ms) on every keep-alive request
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        """Per-request logging would dominate the latency; only errors are printed"""
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > SCORING_MAX_BODY_BYTES:
+            raise ValueError(f"request body larger than {SCORING_MAX_BODY_BYTES} bytes")
+        try:
+            return json.loads(self.rfile.read(length) or b'null')
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON: {e}")
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/metrics':
+            self._send_json(200, {
+                'uptime_seconds': round(time.time() - self.server.started_at, 1),
+                'endpoints': self.server.latency.summary(),
+                'batching': self.server.batcher.summary()
+            })
+        else:
+            self._send_json(404, {'error': f"unknown path: {self.path}"})
+
+    def do_POST(self):
+        if self.path not in ('/score', '/score/batch'):
+            self._send_json(404, {'error': f"unknown path: {self.path}"})
+            return
+        start = time.perf_counter()
+        status, payload = self._score(self.path == '/score/batch')
+        self._send_json(status, payload)
+        self.server.latency.record(self.path, (time.perf_counter() - start) * 1000, error=status != 200)
+
+    def _score(self, batch):
+        """(status, response payload) for a scoring request"""
+        try:
+            body = self._read_json()
+            if batch:
+                items = body.get('requests') if isinstance(body, dict) else body
+                if not isinstance(items, list):
+                    raise ValueError('expected {"requests": [...]} or a JSON array')
+            else:
+                items = [body]
+            records = [parse_request(item) for item in items]
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        if not records:
+            return 200, {'results': []}
+
+        try:
+            results = self.server.batcher.submit(records).result()
+        except queue.Full:
+            return 503, {'error': 'scoring queue is full, retry later'}
+        except Exception as e:
+            print(f"Error scoring requests: {e}")
+            return 500, {'error': 'scoring failed'}
+        return 200, ({'results': results} if batch else results[0])
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """
+    One thread per open connection; scoring itself runs on the batcher's
+    bounded worker pool, so connection count does not multiply CPU work
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, engine=None, workers=SCORING_WORKERS, max_batch_rows=SCORING_MAX_BATCH_ROWS,
+                 queue_size=SCORING_QUEUE_SIZE, max_wait_ms=SCORING_MAX_WAIT_MS):
+        super().__init__(address, ScoringRequestHandler)
+        self.batcher = MicroBatcher(engine or AIDecisionEngine(), workers, max_batch_rows, queue_size, max_wait_ms)
+        self.latency = LatencyStats()
+        self.started_at = time.time()
+        self.batcher.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=SCORING_HOST)
+    parser.add_argument('--port', type=int, default=SCORING_PORT)
+    parser.add_argument('--workers', type=int, default=SCORING_WORKERS, help='scoring threads')
+    parser.add_argument('--max-batch-rows', type=int, default=SCORING_MAX_BATCH_ROWS)
+    parser.add_argument('--max-wait-ms', type=float, default=SCORING_MAX_WAIT_MS,
+                        help='how long a micro-batch waits for more requests')
+    args = parser.parse_args()
+
+    server = ScoringServer((args.host, args.port), workers=args.workers, max_batch_rows=args.max_batch_rows,
+                           max_wait_ms=args.max_wait_ms)
+    print(f"✅ Scoring service listening on http://{args.host}:{args.port} "
+          f"({args.workers} workers, batches up to {args.max_batch_rows} rows / {args.max_wait_ms:g} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
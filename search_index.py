@@ -0,0 +1,204 @@
+"""
+Full-Text Search Index for Invoice Payment Manager
+SQLite FTS5 index over request ids, reasons, vendor names and audit details
+"""
+
+import re
+import sqlite3
+import time
+from contextlib import closing
+import pandas as pd
+from config import SEARCH_INDEX_DB, SEARCH_RESULT_LIMIT
+
+
+SEARCH_COLUMNS = [
+    "source", "request_id", "vendor_name", "reason", "details", "timestamp", "snippet"
+]
+
+# Request ids per DELETE ... IN (...), well under SQLite's bound-parameter limit
+DELETE_CHUNK = 500
+
+QUOTED_PHRASE = re.compile(r'"([^"]+)"')
+WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(text):
+    """
+    Convert free text into a safe FTS5 MATCH expression
+
+    Quoted text is kept as a phrase, remaining words are ANDed together and
+    the last bare word is prefix-matched so results appear while typing.
+    """
+    phrases = [
+        '"' + ' '.join(WORD.findall(phrase)) + '"'
+        for phrase in QUOTED_PHRASE.findall(text)
+        if WORD.findall(phrase)
+    ]
+    words = WORD.findall(QUOTED_PHRASE.sub(' ', text))
+    terms = phrases + [f'"{word}"' for word in words]
+    if words:
+        terms[-1] = terms[-1] + '*'
+    return ' '.join(terms)
+
+
+class SearchIndex:
+    """Incrementally maintained inverted index backed by SQLite FTS5"""
+
+    def __init__(self, path=SEARCH_INDEX_DB):
+        """Open (or create) the index database"""
+        self.path = path
+        self.available = True
+        try:
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+                        source UNINDEXED, request_id,
+                        vendor_name, reason, details,
+                        timestamp UNINDEXED,
+                        tokenize = 'unicode61'
+                    )
+                """)
+                # request_id -> FTS rowid, so re-indexing a request is a keyed delete
+                conn.execute("CREATE TABLE IF NOT EXISTS request_docs (request_id TEXT PRIMARY KEY, doc_rowid INTEGER)")
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5 - search is disabled, the app still works
+            print(f"Search index unavailable: {e}")
+            self.available = False
+
+    def _connect(self):
+        """Open a short-lived connection (safe across Streamlit script threads)"""
+        return closing(sqlite3.connect(self.path, timeout=10))
+
+    def is_built(self):
+        """True once the initial backfill has completed"""
+        if not self.available:
+            return False
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'built'").fetchone()
+        return row is not None
+
+    def rebuild(self, requests_df, audit_df):
+        """Drop and backfill the whole index from current data (one transaction)"""
+        if not self.available:
+            return
+        with self._connect() as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM documents")
+            conn.execute("DELETE FROM request_docs")
+            conn.execute("DELETE FROM meta")
+            # The index is empty: plain bulk inserts, nothing to replace
+            self._insert_requests(conn, self._request_rows(requests_df))
+            conn.executemany("INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?)", self._audit_rows(audit_df))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('built', ?)",
+                         (time.strftime('%Y-%m-%d %H:%M:%S'),))
+
+    @staticmethod
+    def _request_rows(requests_df):
+        """Document rows for requests, the last one kept per request_id"""
+        if requests_df is None or requests_df.empty:
+            return []
+        columns = ['request_id', 'vendor_name', 'reason', 'submission_date']
+        df = requests_df[columns].astype(object)
+        df = df.where(df.notna(), '').astype(str)
+        df = df.drop_duplicates('request_id', keep='last')
+        return [
+            ('request', row.request_id, row.vendor_name, row.reason, '', row.submission_date)
+            for row in df.itertuples(index=False)
+        ]
+
+    @staticmethod
+    def _audit_rows(audit_df):
+        if audit_df is None or len(audit_df) == 0:
+            return []
+        audit_df = pd.DataFrame(audit_df)
+        return [
+            ('audit', '' if pd.isna(row.request_id) else str(row.request_id), '', '',
+             f"{row.action} - {row.details}", str(row.timestamp))
+            for row in audit_df[['request_id', 'action', 'details', 'timestamp']].itertuples(index=False)
+        ]
+
+    @staticmethod
+    def _insert_requests(conn, rows):
+        """
+        Bulk insert request documents and their request_id -> rowid entries
+
+        Rowids are assigned explicitly after the current maximum, so both
+        tables are filled with executemany; the caller holds the write lock.
+        """
+        if not rows:
+            return
+        first = conn.execute("SELECT COALESCE(MAX(rowid), 0) + 1 FROM documents").fetchone()[0]
+        conn.executemany("INSERT INTO documents (rowid, source, request_id, vendor_name, reason, details, timestamp) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         [(first + i,) + row for i, row in enumerate(rows)])
+        conn.executemany("INSERT OR REPLACE INTO request_docs VALUES (?, ?)",
+                         [(row[1], first + i) for i, row in enumerate(rows)])
+
+    def index_requests(self, requests_df):
+        """Insert or replace request documents keyed by request_id"""
+        if not self.available:
+            return
+        rows = self._request_rows(requests_df)
+        if not rows:
+            return
+        request_ids = [row[1] for row in rows]
+        with self._connect() as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for start in range(0, len(request_ids), DELETE_CHUNK):
+                chunk = request_ids[start:start + DELETE_CHUNK]
+                conn.execute(
+                    "DELETE FROM documents WHERE rowid IN (SELECT doc_rowid FROM request_docs "
+                    f"WHERE request_id IN ({', '.join('?' for _ in chunk)}))",
+                    chunk
+                )
+            self._insert_requests(conn, rows)
+
+    def index_audit_entries(self, audit_df):
+        """Append audit documents (the audit log is append-only)"""
+        if not self.available:
+            return
+        rows = self._audit_rows(audit_df)
+        if not rows:
+            return
+        with self._connect() as conn, conn:
+            conn.executemany("INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def search(self, text, sources=None, limit=SEARCH_RESULT_LIMIT):
+        """
+        Run a ranked full-text query
+
+        Args:
+            text: Free-text query ("quoted phrases" supported)
+            sources: Optional list of sources to keep ('request', 'audit')
+            limit: Maximum number of results
+
+        Returns:
+            Tuple of (DataFrame with SEARCH_COLUMNS, elapsed milliseconds)
+        """
+        match = build_match_query(text or '')
+        if not self.available or not match:
+            return pd.DataFrame(columns=SEARCH_COLUMNS), 0.0
+
+        sql = """
+            SELECT source, request_id, vendor_name, reason, details, timestamp,
+                   snippet(documents, -1, '[', ']', '…', 12)
+            FROM documents
+            WHERE documents MATCH ?
+        """
+        params = [match]
+        if sources:
+            sql += f" AND source IN ({', '.join('?' for _ in sources)})"
+            params.extend(sources)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(int(limit))
+
+        start_time = time.perf_counter()
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"Error searching index: {e}")
+            rows = []
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        return pd.DataFrame(rows, columns=SEARCH_COLUMNS), elapsed_ms
@@ -3,14 +3,16 @@ Custom Styling and UI Components for Invoice Payment Manager
 Provides CSS injection and styled HTML components
 """
 
+from functools import lru_cache
 import streamlit as st
 from config import KEBOOLA_COLORS
 
 
-def load_custom_css():
-    """Inject custom CSS styling into the Streamlit app"""
+@lru_cache(maxsize=None)
+def get_custom_css():
+    """App stylesheet, formatted once per process (it only depends on KEBOOLA_COLORS)"""
     
-    css = f"""
+    return f"""
     <style>
         /* Force Light Theme */
         .stApp {{
@@ -313,8 +315,11 @@ def load_custom_css():
         }}
     </style>
     """
-    
-    st.markdown(css, unsafe_allow_html=True)
+
+
+def load_custom_css():
+    """Inject custom CSS styling into the Streamlit app"""
+    st.markdown(get_custom_css(), unsafe_allow_html=True)
 
 
 def render_metric_card(title, value, delta=None, icon="📊"):
@@ -0,0 +1,236 @@
+"""
+Vendor Risk Profiles for Invoice Payment Manager
+Exponentially decayed per-vendor statistics over the decision history
+"""
+
+import math
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from config import DECISION_PARTITION_FORMAT, VENDOR_PROFILE_HALF_LIFE_DAYS
+from model_metrics import partition_stat
+
+
+# Decayed sums kept per vendor, in this order; extension_known counts the
+# decisions whose requested extension was found for extension_days
+PROFILE_STATS = ['decisions', 'approved', 'rejected', 'exposure', 'approved_exposure',
+                 'extension_known', 'extension_days']
+
+# Decision times are measured in seconds since this instant
+EPOCH = datetime(2020, 1, 1)
+
+
+class VendorProfiles:
+    """
+    Rolling decision statistics per vendor, decayed with a half-life
+
+    A set of sums is kept against a reference time r: a decision made at
+    time t is stored with weight exp(decay * (t - r)). Scaling the sums by
+    exp(-decay * (now - r)) gives the decayed totals as of now: a decision
+    counts 1 today, 0.5 after one half-life, 0.25 after two. The reference
+    is the latest decision in the set, so weights never exceed 1 (nothing
+    overflows, however short the half-life or however long the history).
+    Two sets are added after rescaling the one with the earlier reference.
+
+    Sums are kept per monthly partition, as in DecisionMetrics. Decisions
+    recorded through record() are folded in incrementally when nobody else
+    wrote to their partition in between, and partitions changed by anyone
+    else (detected by size/mtime) are re-aggregated alone. Vendor totals
+    are kept up to date, so lookup() is a dictionary read and a few
+    multiplications.
+
+    Decisions do not carry the extension that was requested; it is joined
+    on request_id through the extension_days callable given at construction
+    (request ids -> requested days, NaN where unknown).
+    """
+
+    def __init__(self, half_life_days=VENDOR_PROFILE_HALF_LIFE_DAYS, extension_days=None):
+        self.half_life_days = half_life_days
+        self.extension_days = extension_days
+        self.decay = math.log(2) / (half_life_days * 86400.0)  # per second
+        self.partition_sums = {}   # month_key -> (reference, {vendor: (sums array, last decision seconds)})
+        self.partition_stats = {}  # month_key -> (size, mtime_ns) last aggregated
+        self.totals = {}           # vendor -> sums array over all partitions, against self.reference
+        self.reference = -math.inf  # seconds since EPOCH the totals are weighted against
+        self.last_seen = {}        # vendor -> seconds since EPOCH of the latest decision
+
+    def _aggregate(self, decisions_df):
+        """
+        Weighted sums and latest decision time per vendor for a frame of decisions
+
+        Returns:
+            Tuple of (reference seconds, {vendor: (sums array, latest seconds)})
+        """
+        if decisions_df.empty:
+            return -math.inf, {}
+        seconds = ((pd.to_datetime(decisions_df['decision_date']) - EPOCH).dt.total_seconds()).to_numpy()
+        reference = float(seconds.max())
+        weights = np.exp(self.decay * (seconds - reference))
+        final = decisions_df['final_decision'].astype(str)
+        approved = final.eq('Approved').to_numpy()
+        rejected = final.eq('Rejected').to_numpy()
+        amounts = pd.to_numeric(decisions_df['invoice_amount'], errors='coerce').fillna(0.0).to_numpy()
+        if self.extension_days is None:
+            days = np.full(len(decisions_df), np.nan)
+        else:
+            days = np.asarray(self.extension_days(decisions_df['request_id']), dtype=float)
+        known = ~np.isnan(days)
+
+        sums = pd.DataFrame(
+            np.column_stack([weights, weights * approved, weights * rejected,
+                             weights * amounts, weights * amounts * approved,
+                             weights * known, weights * np.where(known, days, 0.0)]),
+            columns=PROFILE_STATS
+        )
+        vendors = decisions_df['vendor_name'].astype(str).to_numpy()
+        vendor_sums = sums.groupby(vendors, sort=False).sum()
+        latest = pd.Series(seconds).groupby(vendors, sort=False).max()
+        return reference, {
+            vendor: (row, latest[vendor])
+            for vendor, row in zip(vendor_sums.index, vendor_sums.to_numpy())
+        }
+
+    def _merge(self, target, target_reference, sums, reference):
+        """
+        Add one set of per-vendor sums into another (in place)
+
+        Returns:
+            Reference of the merged set: the later of the two
+        """
+        if not sums:
+            return target_reference
+        merged_reference = max(target_reference, reference)
+        if merged_reference > target_reference:
+            factor = math.exp(self.decay * (target_reference - merged_reference))
+            for vendor, (row, latest) in target.items():
+                target[vendor] = (row * factor, latest)
+        factor = math.exp(self.decay * (reference - merged_reference))
+        for vendor, (row, latest) in sums.items():
+            if vendor in target:
+                target[vendor] = (target[vendor][0] + row * factor, max(target[vendor][1], latest))
+            else:
+                target[vendor] = (row * factor, latest)
+        return merged_reference
+
+    def _rebuild_totals(self):
+        self.totals, self.last_seen, self.reference = {}, {}, -math.inf
+        for reference, sums in self.partition_sums.values():
+            self._add_to_totals(reference, sums)
+
+    def _add_to_totals(self, reference, sums):
+        totals = {vendor: (row, self.last_seen[vendor]) for vendor, row in self.totals.items()}
+        self.reference = self._merge(totals, self.reference, sums, reference)
+        self.totals = {vendor: row for vendor, (row, _) in totals.items()}
+        self.last_seen = {vendor: latest for vendor, (_, latest) in totals.items()}
+
+    def sync(self, partitions):
+        """
+        Bring profiles up to date with the partitions on disk
+
+        Args:
+            partitions: {month_key: path} of decision partitions
+        """
+        changed = False
+        for month_key in set(self.partition_sums) - set(partitions):
+            del self.partition_sums[month_key]
+            del self.partition_stats[month_key]
+            changed = True
+
+        for month_key, path in partitions.items():
+            try:
+                stat = partition_stat(path)
+            except FileNotFoundError:
+                continue
+            if self.partition_stats.get(month_key) == stat:
+                continue
+            self.partition_sums[month_key] = self._aggregate(pd.read_csv(path))
+            self.partition_stats[month_key] = stat
+            changed = True
+
+        if changed:
+            self._rebuild_totals()
+
+    def record(self, decisions_df, partitions, previous_stats):
+        """
+        Fold newly written decisions into the profiles (incremental update)
+
+        Only a partition that was unchanged since it was aggregated, up to
+        this write, is updated in place. Others are left for the next
+        sync(), which reads them whole.
+
+        Args:
+            decisions_df: Decisions just appended to their partitions
+            partitions: {month_key: path} of decision partitions
+            previous_stats: {month_key: partition_stat()} taken before the write
+        """
+        month_keys = pd.to_datetime(decisions_df['decision_date']).dt.strftime(DECISION_PARTITION_FORMAT)
+        for month_key, month_df in decisions_df.groupby(month_keys):
+            if month_key not in partitions or month_key not in self.partition_stats:
+                continue
+            if previous_stats.get(month_key) != self.partition_stats[month_key]:
+                continue
+            reference, new_sums = self._aggregate(month_df)
+            partition_reference, sums = self.partition_sums[month_key]
+            self.partition_sums[month_key] = (self._merge(sums, partition_reference, new_sums, reference), sums)
+            self._add_to_totals(reference, new_sums)
+            self.partition_stats[month_key] = partition_stat(partitions[month_key])
+
+    def _scale(self, now=None):
+        """Factor turning the reference-weighted totals into totals decayed to now"""
+        now = datetime.now() if now is None else now
+        return math.exp(-self.decay * ((now - EPOCH).total_seconds() - self.reference))
+
+    def lookup(self, vendor_name, now=None):
+        """
+        Decayed profile of one vendor
+
+        Args:
+            vendor_name: Vendor as written in the decision history
+            now: Time the profile is decayed to (default: now)
+
+        Returns:
+            Dict with the decayed PROFILE_STATS, approval_rate, avg_amount,
+            requests_per_30_days (a steady-rate estimate: the decayed count
+            times the decay rate), avg_extension_days,
+            extension_days_per_30_days (the same estimate for requested
+            extension days) and last_decision; None for unknown vendors
+        """
+        row = self.totals.get(str(vendor_name))
+        if row is None:
+            return None
+        profile = dict(zip(PROFILE_STATS, (row * self._scale(now)).tolist()))
+        decisions = profile['decisions']
+        profile['approval_rate'] = profile['approved'] / decisions if decisions else None
+        profile['avg_amount'] = profile['exposure'] / decisions if decisions else None
+        profile['requests_per_30_days'] = decisions * self.decay * 30 * 86400
+        known = profile['extension_known']
+        profile['avg_extension_days'] = profile['extension_days'] / known if known else None
+        profile['extension_days_per_30_days'] = (profile['avg_extension_days'] * profile['requests_per_30_days']
+                                                 if known else None)
+        profile['last_decision'] = EPOCH + timedelta(seconds=float(self.last_seen[str(vendor_name)]))
+        return profile
+
+    def frame(self, now=None):
+        """
+        Decayed profiles of every vendor
+
+        Returns:
+            DataFrame indexed by vendor with the lookup() fields, most active first
+        """
+        if not self.totals:
+            return pd.DataFrame(columns=PROFILE_STATS + ['approval_rate', 'avg_amount', 'requests_per_30_days',
+                                                         'avg_extension_days', 'extension_days_per_30_days',
+                                                         'last_decision'])
+        profiles = pd.DataFrame(np.vstack(list(self.totals.values())) * self._scale(now),
+                                index=list(self.totals), columns=PROFILE_STATS)
+        decisions = profiles['decisions'].where(profiles['decisions'] > 0)
+        profiles['approval_rate'] = profiles['approved'] / decisions
+        profiles['avg_amount'] = profiles['exposure'] / decisions
+        profiles['requests_per_30_days'] = profiles['decisions'] * self.decay * 30 * 86400
+        profiles['avg_extension_days'] = (profiles['extension_days']
+                                          / profiles['extension_known'].where(profiles['extension_known'] > 0))
+        profiles['extension_days_per_30_days'] = profiles['avg_extension_days'] * profiles['requests_per_30_days']
+        profiles['last_decision'] = EPOCH + pd.to_timedelta(
+            [self.last_seen[vendor] for vendor in profiles.index], unit='s'
+        )
+        return profiles.sort_values('decisions', ascending=False)
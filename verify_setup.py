@@ -6,6 +6,7 @@ Run this to verify your installation is complete and ready to use.
 
 import sys
 import os
+import json
 from pathlib import Path
 
 def print_header(text):
@@ -34,7 +35,26 @@ def verify_files():
         'main_simple.py',
         'config.py',
         'data_manager.py',
+        'audit_store.py',
+        'search_index.py',
+        'work_queue.py',
+        'auto_disposition.py',
+        'ingest_screening.py',
+        'data_profiling.py',
+        'pii_masking.py',
+        'risk_audit.py',
         'ai_decision_engine.py',
+        'factor_status.py',
+        'vendor_profiles.py',
+        'decision_policy.py',
+        'decision_policy.json',
+        'whatif_simulator.py',
+        'model_metrics.py',
+        'feature_store.py',
+        'pending_store.py',
+        'change_log.py',
+        'data_watcher.py',
+        'scoring_service.py',
         'email_generator.py',
         'styles.py',
         'requirements.txt',
@@ -49,17 +69,35 @@ def verify_files():
     
     return len(missing) == 0, missing
 
+def decision_partition_files():
+    """List decision history files (monthly partitions, or the legacy single file)"""
+    if os.path.isdir('data/decisions'):
+        partitions = sorted(Path('data/decisions').glob('*.csv'))
+        if partitions:
+            return partitions
+    return []
+
 def verify_data_files():
     """Check if data directory and CSV files exist"""
     if not os.path.exists('data'):
         return False, "Data directory not found"
     
-    csv_files = ['invoice_requests.csv', 'decisions.csv', 'audit_log.csv']
+    csv_files = ['invoice_requests.csv']
     missing = []
     for file in csv_files:
         if not os.path.exists(f'data/{file}'):
             missing.append(file)
     
+    # Decisions live in monthly partitions (data/decisions/YYYY-MM.csv);
+    # a legacy data/decisions.csv is migrated on first launch
+    if not decision_partition_files() and not os.path.exists('data/decisions.csv'):
+        missing.append('decisions')
+    
+    # The audit log lives in rotated segments (data/audit/); a legacy
+    # data/audit_log.csv is migrated on first launch
+    if not os.path.exists('data/audit/manifest.json') and not os.path.exists('data/audit_log.csv'):
+        missing.append('audit log')
+    
     if missing:
         return False, f"Missing: {', '.join(missing)}"
     return True, "All CSV files present"
@@ -89,13 +127,19 @@ def verify_csv_data():
             lines = len(f.readlines())
             requests_count = lines - 1  # Minus header
         
-        with open('data/decisions.csv', 'r') as f:
-            lines = len(f.readlines())
-            decisions_count = lines - 1
+        decision_files = decision_partition_files() or [Path('data/decisions.csv')]
+        decisions_count = 0
+        for path in decision_files:
+            with open(path, 'r') as f:
+                decisions_count += len(f.readlines()) - 1
         
-        with open('data/audit_log.csv', 'r') as f:
-            lines = len(f.readlines())
-            audit_count = lines - 1
+        if os.path.exists('data/audit/manifest.json'):
+            with open('data/audit/manifest.json', 'r') as f:
+                manifest = json.load(f)
+            audit_count = manifest['active']['rows'] + sum(seg['rows'] for seg in manifest['segments'])
+        else:
+            with open('data/audit_log.csv', 'r') as f:
+                audit_count = len(f.readlines()) - 1
         
         return True, (requests_count, decisions_count, audit_count)
     except Exception as e:
@@ -130,13 +174,30 @@ def main():
     
     if print_check(
         files_ok,
-        "All 9 core files present",
+        "All 28 core files present",
         f"Missing files: {', '.join(missing)}"
     ):
         print("   ✓ main_simple.py")
         print("   ✓ config.py")
         print("   ✓ data_manager.py")
+        print("   ✓ audit_store.py")
+        print("   ✓ search_index.py")
+        print("   ✓ work_queue.py")
+        print("   ✓ auto_disposition.py")
+        print("   ✓ ingest_screening.py")
+        print("   ✓ data_profiling.py")
         print("   ✓ ai_decision_engine.py")
+        print("   ✓ factor_status.py")
+        print("   ✓ vendor_profiles.py")
+        print("   ✓ decision_policy.py")
+        print("   ✓ decision_policy.json")
+        print("   ✓ whatif_simulator.py")
+        print("   ✓ model_metrics.py")
+        print("   ✓ feature_store.py")
+        print("   ✓ pending_store.py")
+        print("   ✓ change_log.py")
+        print("   ✓ data_watcher.py")
+        print("   ✓ scoring_service.py")
         print("   ✓ email_generator.py")
         print("   ✓ styles.py")
         print("   ✓ requirements.txt")
@@ -159,8 +220,8 @@ def main():
         if csv_ok:
             requests, decisions, audit = counts
             print(f"   ✓ invoice_requests.csv ({requests} records)")
-            print(f"   ✓ decisions.csv ({decisions} records)")
-            print(f"   ✓ audit_log.csv ({audit} records)")
+            print(f"   ✓ decisions ({decisions} records)")
+            print(f"   ✓ audit log ({audit} records)")
         else:
             print(f"   ⚠️  CSV files exist but may be empty or corrupted")
     else:
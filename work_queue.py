@@ -0,0 +1,274 @@
+"""
+Review Work Queue for Invoice Payment Manager
+Persistent priority queue of pending requests with TTL-leased claims
+"""
+
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+import pandas as pd
+from config import REVIEW_QUEUE_DB, REVIEW_QUEUE_ORDERS, REVIEW_LEASE_TTL_SECONDS
+
+
+PRIORITY_RANK = {"High": 0, "Medium": 1, "Low": 2}
+
+# Row is free to take (no lease, or lease expired) or already held by the reviewer.
+# Parameters: (now, reviewer)
+AVAILABLE_TO_REVIEWER = (
+    "claimed_by IS NULL OR lease_expires IS NULL OR lease_expires < ? OR claimed_by = ?"
+)
+
+
+def format_request_label(request_id, vendor_name, amount):
+    """Selector label for a request (built once at enqueue time)"""
+    return f"{request_id} - {vendor_name} (${amount:,.2f})"
+
+
+class ReviewQueue:
+    """
+    Pending requests ordered by a configurable key
+
+    Each ordering key is an indexed column (all ascending, "most urgent first"),
+    so taking the next request is an O(log n) index seek rather than a sort.
+
+    A claim is a lease: it stays valid until lease_expires (epoch seconds) and
+    must be renewed by heartbeats. Expired leases are free for anyone to take.
+    """
+
+    def __init__(self, path=REVIEW_QUEUE_DB):
+        """Open (or create) the queue database"""
+        self.path = path
+        with self._connect() as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS review_queue (
+                    request_id TEXT PRIMARY KEY,
+                    label TEXT NOT NULL,
+                    due_key REAL,
+                    risk_key REAL,
+                    amount_key REAL,
+                    priority_key REAL,
+                    claimed_by TEXT,
+                    claimed_at TEXT,
+                    lease_expires REAL
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(review_queue)")}
+            if 'lease_expires' not in columns:
+                conn.execute("ALTER TABLE review_queue ADD COLUMN lease_expires REAL")
+            for column in REVIEW_QUEUE_ORDERS.values():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_queue_{column} "
+                             f"ON review_queue ({column}, request_id)")
+
+    def _connect(self):
+        """Open a short-lived connection in autocommit mode"""
+        return closing(sqlite3.connect(self.path, timeout=10, isolation_level=None))
+
+    def _order_column(self, order):
+        if order not in REVIEW_QUEUE_ORDERS:
+            raise ValueError(f"Unknown queue order: {order}")
+        return REVIEW_QUEUE_ORDERS[order]
+
+    def sync(self, requests_df, risk_scorer):
+        """
+        Make the queue mirror the pending requests
+
+        Only requests not yet queued are scored and inserted; requests that
+        left the pending file are dropped.
+
+        Args:
+            requests_df: Pending requests DataFrame
+            risk_scorer: Callable(request_dict) -> risk score in [0, 1]
+
+        Returns:
+            List of request_ids that were newly queued
+        """
+        pending_ids = set(requests_df['request_id'].astype(str)) if not requests_df.empty else set()
+
+        with self._connect() as conn:
+            queued_ids = {row[0] for row in conn.execute("SELECT request_id FROM review_queue")}
+
+            new_rows = []
+            if not requests_df.empty:
+                new_df = requests_df[~requests_df['request_id'].astype(str).isin(queued_ids)]
+                due_days = pd.to_datetime(new_df['original_due_date']).map(pd.Timestamp.toordinal)
+                for (_, request), due_day in zip(new_df.iterrows(), due_days):
+                    request_dict = request.to_dict()
+                    new_rows.append((
+                        str(request_dict['request_id']),
+                        format_request_label(request_dict['request_id'], request_dict['vendor_name'],
+                                             float(request_dict['invoice_amount'])),
+                        float(due_day),
+                        -float(risk_scorer(request_dict)),
+                        -float(request_dict['invoice_amount']),
+                        float(PRIORITY_RANK.get(request_dict.get('priority'), 1)),
+                    ))
+
+            stale_ids = [(request_id,) for request_id in queued_ids - pending_ids]
+
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("DELETE FROM review_queue WHERE request_id = ?", stale_ids)
+            conn.executemany(
+                "INSERT OR IGNORE INTO review_queue "
+                "(request_id, label, due_key, risk_key, amount_key, priority_key) VALUES (?, ?, ?, ?, ?, ?)",
+                new_rows
+            )
+            conn.execute("COMMIT")
+        return [row[0] for row in new_rows]
+
+    def queued_ids(self):
+        """request_ids currently in the queue"""
+        with self._connect() as conn:
+            return {row[0] for row in conn.execute("SELECT request_id FROM review_queue")}
+
+    def list_ordered(self, order, reviewer=None):
+        """
+        Queue contents in priority order
+
+        Returns:
+            List of (request_id, label, claimed_by) tuples. Items under a live
+            lease held by another reviewer are excluded when a reviewer is given.
+        """
+        column = self._order_column(order)
+        sql = "SELECT request_id, label, claimed_by FROM review_queue"
+        params = []
+        if reviewer is not None:
+            sql += f" WHERE {AVAILABLE_TO_REVIEWER}"
+            params.extend([time.time(), reviewer])
+        sql += f" ORDER BY {column}, request_id"
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def claim(self, request_id, reviewer, ttl=REVIEW_LEASE_TTL_SECONDS):
+        """
+        Atomically lease a specific request to a reviewer
+
+        Succeeds if the request is unclaimed, its lease has expired, or the
+        reviewer already holds it (which renews the lease). Any other lease the
+        reviewer holds is released, so each reviewer holds at most one request.
+
+        Returns:
+            True if the reviewer now holds the lease
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute(
+                f"UPDATE review_queue SET claimed_by = ?, claimed_at = ?, lease_expires = ? "
+                f"WHERE request_id = ? AND ({AVAILABLE_TO_REVIEWER})",
+                (reviewer, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), now + ttl,
+                 str(request_id), now, reviewer)
+            )
+            claimed = cursor.rowcount == 1
+            if claimed:
+                conn.execute(
+                    "UPDATE review_queue SET claimed_by = NULL, claimed_at = NULL, lease_expires = NULL "
+                    "WHERE claimed_by = ? AND request_id != ?",
+                    (reviewer, str(request_id))
+                )
+            conn.execute("COMMIT")
+        return claimed
+
+    def heartbeat(self, request_id, reviewer, ttl=REVIEW_LEASE_TTL_SECONDS):
+        """
+        Extend a lease the reviewer still holds
+
+        Returns:
+            False if the lease was lost (expired and taken by someone else,
+            or the request has already been decided)
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE review_queue SET claimed_by = ?, lease_expires = ? "
+                f"WHERE request_id = ? AND ({AVAILABLE_TO_REVIEWER})",
+                (reviewer, now + ttl, str(request_id), now, reviewer)
+            )
+            return cursor.rowcount == 1
+
+    def claim_next(self, reviewer, order, ttl=REVIEW_LEASE_TTL_SECONDS):
+        """
+        Atomically lease the best available request to a reviewer
+
+        The reviewer's current lease is released first, so "next" moves on
+        rather than handing back the same request.
+
+        Returns:
+            request_id of the claimed request, or None if nothing is available
+        """
+        column = self._order_column(order)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            current = conn.execute("SELECT request_id FROM review_queue WHERE claimed_by = ?",
+                                   (reviewer,)).fetchone()
+            conn.execute(
+                "UPDATE review_queue SET claimed_by = NULL, claimed_at = NULL, lease_expires = NULL "
+                "WHERE claimed_by = ?",
+                (reviewer,)
+            )
+            row = conn.execute(
+                f"SELECT request_id FROM review_queue "
+                f"WHERE (claimed_by IS NULL OR lease_expires IS NULL OR lease_expires < ?) "
+                f"AND request_id != ? ORDER BY {column}, request_id LIMIT 1",
+                (now, current[0] if current else '')
+            ).fetchone()
+            if row is None and current:
+                # Nothing else is available - keep the current request
+                row = current
+            if row:
+                conn.execute(
+                    "UPDATE review_queue SET claimed_by = ?, claimed_at = ?, lease_expires = ? "
+                    "WHERE request_id = ?",
+                    (reviewer, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), now + ttl, row[0])
+                )
+            conn.execute("COMMIT")
+        return row[0] if row else None
+
+    def claim_batch(self, request_ids, reviewer, ttl=REVIEW_LEASE_TTL_SECONDS):
+        """
+        Atomically lease several requests to one reviewer (bulk review)
+
+        Returns:
+            List of request_ids the reviewer now holds; requests leased by
+            someone else are skipped
+        """
+        now = time.time()
+        claimed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        claimed = []
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for request_id in request_ids:
+                cursor = conn.execute(
+                    f"UPDATE review_queue SET claimed_by = ?, claimed_at = ?, lease_expires = ? "
+                    f"WHERE request_id = ? AND ({AVAILABLE_TO_REVIEWER})",
+                    (reviewer, claimed_at, now + ttl, str(request_id), now, reviewer)
+                )
+                if cursor.rowcount == 1:
+                    claimed.append(request_id)
+            conn.execute("COMMIT")
+        return claimed
+
+    def release(self, reviewer, request_id=None):
+        """Release the reviewer's lease (optionally only on one request)"""
+        sql = ("UPDATE review_queue SET claimed_by = NULL, claimed_at = NULL, lease_expires = NULL "
+               "WHERE claimed_by = ?")
+        params = [reviewer]
+        if request_id is not None:
+            sql += " AND request_id = ?"
+            params.append(str(request_id))
+        with self._connect() as conn:
+            conn.execute(sql, params)
+
+    def complete(self, request_id):
+        """Remove a decided request from the queue (its lease goes with it)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM review_queue WHERE request_id = ?", (str(request_id),))
+
+    def complete_batch(self, request_ids):
+        """Remove several decided requests in one transaction"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("DELETE FROM review_queue WHERE request_id = ?",
+                             [(str(request_id),) for request_id in request_ids])
+            conn.execute("COMMIT")